@@ -1,5 +1,23 @@
+from .cached_storage import CachedStorage
+from .columnar_timeseries_storage import ColumnarTimeseriesStorage
+from .delta_history_storage import DeltaHistoryStorage
+from .expiry import ExpiringStorage
+from .log_storage import LogStorage
 from .pickle_storage import PickleStorage
+from .remote_storage import RemoteStorage
+from .snapshot_file import SnapshotFile
+from .sqlite_storage import SqliteStorage
+from .tiered_storage import TieredStorage
 
 __all__ = [
+    "CachedStorage",
+    "ColumnarTimeseriesStorage",
+    "DeltaHistoryStorage",
+    "ExpiringStorage",
+    "LogStorage",
     "PickleStorage",
+    "RemoteStorage",
+    "SnapshotFile",
+    "SqliteStorage",
+    "TieredStorage",
 ]
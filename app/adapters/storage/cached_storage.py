@@ -0,0 +1,244 @@
+import threading
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .lru import CacheStats, LRUCache
+from .projection import excluded_fields
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+
+
+class CachedStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    Read-through cache in front of any storage.
+
+    Entities read by ID are kept per projection, and ``get_many`` results and
+    ``find`` pages per query, in LRUs bounded by ``max_entries`` whose entries
+    expire after ``ttl_seconds``. Writes go to the wrapped storage first and then
+    refresh the written entity and drop the cached queries, so the process always
+    reads its own writes; writes from other processes are seen once the entries
+    expire. The caches are shared by the event loop and worker threads, so they
+    are locked, and reads overtaken by a write are returned but not cached.
+    """
+
+    def __init__(
+        self,
+        storage: StoragePort[TModel, TCreate, TUpdate, TFilter],
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+    ) -> None:
+        self.__storage = storage
+        self.__entities: LRUCache[TModel] = LRUCache(
+            max_entries, ttl_seconds=ttl_seconds
+        )
+        self.__queries: LRUCache[list[TModel] | Page[TModel]] = LRUCache(
+            max_entries, ttl_seconds=ttl_seconds
+        )
+        # Projections entities were cached with, to invalidate every variant
+        self.__projections: set[frozenset[str]] = {frozenset()}
+        self.__lock = threading.Lock()
+        # Incremented by each write, so reads started before it are not cached
+        self.__generation = 0
+        self.entity_cache_stats = self.__entities.stats
+        self.query_cache_stats = self.__queries.stats
+
+    @property
+    def __model(self) -> type[TModel]:
+        return self.__orig_class__.__args__[0]  # type: ignore
+
+    @property
+    def storage(self) -> StoragePort[TModel, TCreate, TUpdate, TFilter]:
+        return self.__storage
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Combined counters of the entity and query caches."""
+        stats = CacheStats()
+        for part in (self.entity_cache_stats, self.query_cache_stats):
+            stats.hits += part.hits
+            stats.misses += part.misses
+            stats.evictions += part.evictions
+            stats.expirations += part.expirations
+        return stats
+
+    def __cache(
+        self, entities: list[TModel], excluded: frozenset[str], generation: int
+    ) -> None:
+        with self.__lock:
+            if generation != self.__generation:
+                return
+            self.__projections.add(excluded)
+            for entity in entities:
+                # Entries are counted rather than sized, so each one weighs 1
+                self.__entities.put((entity.id, excluded), entity, 1)
+
+    def __cache_query(
+        self, key: Any, found: list[TModel] | Page[TModel], generation: int
+    ) -> None:
+        with self.__lock:
+            if generation == self.__generation:
+                self.__queries.put(key, found, 1)
+
+    def __get(self, cache: LRUCache, key: Any) -> tuple[Any, int]:
+        """The cached value, or None, and the generation to cache a read with."""
+        with self.__lock:
+            return cache.get(key), self.__generation
+
+    def __invalidate(self, entity_id: Any, entity: TModel | None = None) -> None:
+        with self.__lock:
+            self.__generation += 1
+            for excluded in self.__projections:
+                self.__entities.discard((entity_id, excluded))
+            if entity is not None:
+                self.__entities.put((entity.id, frozenset()), entity, 1)
+            self.__queries.clear()
+
+    def __invalidate_many(self, entities: list[TModel]) -> None:
+        for entity in entities:
+            self.__invalidate(entity.id, entity)
+
+    async def create_one(self, entity: TCreate) -> TModel:
+        created = await self.__storage.create_one(entity)
+        self.__invalidate(created.id, created)
+        return created
+
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        stored = await self.__storage.upsert_one(entity, key=key)
+        self.__invalidate(stored.id, stored)
+        return stored
+
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        created = await self.__storage.create_many(entities)
+        self.__invalidate_many(created)
+        return created
+
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        stored = await self.__storage.upsert_many(entities, key=key)
+        self.__invalidate_many(stored)
+        return stored
+
+    async def get_one(
+        self,
+        entity_id: Any,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        excluded = excluded_fields(self.__model, include, exclude)
+        entity, generation = self.__get(self.__entities, (entity_id, excluded))
+        if entity is not None:
+            return entity
+
+        entity = await self.__storage.get_one(
+            entity_id, include=include, exclude=exclude
+        )
+        if entity is not None:
+            self.__cache([entity], excluded, generation)
+        return entity
+
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[Any],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        with self.__lock:
+            generation = self.__generation
+            found = {
+                entity_id: entity
+                for entity_id in entity_ids
+                if (entity := self.__entities.get((entity_id, excluded))) is not None
+            }
+
+        if missing := [entity_id for entity_id in entity_ids if entity_id not in found]:
+            fetched = await self.__storage.get_many_by_ids(
+                missing, include=include, exclude=exclude
+            )
+            self.__cache(fetched, excluded, generation)
+            found.update((entity.id, entity) for entity in fetched)
+
+        return [found[entity_id] for entity_id in entity_ids if entity_id in found]
+
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        key = (
+            filter_dict.model_dump_json() if filter_dict is not None else None,
+            skip,
+            limit,
+            excluded,
+        )
+        entities, generation = self.__get(self.__queries, key)
+        if entities is not None:
+            return list(entities)
+
+        entities = await self.__storage.get_many(
+            filter_dict, skip=skip, limit=limit, include=include, exclude=exclude
+        )
+        self.__cache_query(key, entities, generation)
+        return list(entities)
+
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        key = ("find", query.model_dump_json(), excluded)
+        found, generation = self.__get(self.__queries, key)
+        if found is None:
+            found = await self.__storage.find(query, include=include, exclude=exclude)
+            self.__cache_query(key, found, generation)
+        return Page(items=list(found.items), next_cursor=found.next_cursor)
+
+    async def update_one(self, entity_id: Any, entity: TUpdate) -> TModel | None:
+        updated = await self.__storage.update_one(entity_id, entity)
+        self.__invalidate(entity_id, updated)
+        return updated
+
+    async def delete_one(self, entity_id: Any) -> bool:
+        deleted = await self.__storage.delete_one(entity_id)
+        self.__invalidate(entity_id)
+        return deleted
+
+    async def delete_many(
+        self, entity_ids: list[Any], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        deleted = await self.__storage.delete_many(entity_ids, where=where)
+        for entity_id in entity_ids:
+            self.__invalidate(entity_id)
+        return deleted
+
+    def clear(self) -> None:
+        """Drops every cached entity and query."""
+        with self.__lock:
+            self.__generation += 1
+            self.__entities.clear()
+            self.__queries.clear()
+
+    async def close(self) -> None:
+        self.clear()
+        await self.__storage.close()
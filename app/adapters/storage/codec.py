@@ -0,0 +1,125 @@
+import json
+import time
+import zlib
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Encoded data: magic, serializer tag, compressor tag, compressed payload
+MAGIC = b"RCD"
+
+
+class _Format(NamedTuple):
+    tag: int
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+SERIALIZERS: dict[str, _Format] = {
+    "json": _Format(
+        ord("j"),
+        lambda value: json.dumps(value, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+}
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = _Format(ord("m"), msgpack.packb, msgpack.unpackb)
+
+COMPRESSORS: dict[str, _Format] = {
+    "zlib": _Format(ord("z"), zlib.compress, zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _Format(
+        ord("s"),
+        zstandard.ZstdCompressor(level=3).compress,
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+class CodecStats:
+    """Time spent and bytes produced by each codec operation."""
+
+    def __init__(self) -> None:
+        self.__stats: dict[str, dict[str, float]] = {}
+
+    def record(
+        self, operation: str, seconds: float, raw_bytes: int, encoded_bytes: int
+    ) -> None:
+        stats = self.__stats.setdefault(
+            operation, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["calls"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["last_raw_bytes"] = raw_bytes
+        stats["last_encoded_bytes"] = encoded_bytes
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {operation: dict(stats) for operation, stats in self.__stats.items()}
+
+
+class Codec:
+    """
+    Compact binary encoding of plain records (dicts, lists and scalars).
+
+    msgpack and zstd are used when installed, with the ``fast-codec`` extra,
+    otherwise JSON and zlib. The header records the formats used, so data is
+    decoded whatever the encoder defaults are, as long as its formats are installed.
+    """
+
+    def __init__(
+        self, serializer: str | None = None, compressor: str | None = None
+    ) -> None:
+        self.serializer = serializer or ("msgpack" if msgpack else "json")
+        self.compressor = compressor or ("zstd" if zstandard else "zlib")
+        if self.serializer not in SERIALIZERS:
+            raise ValueError(f"Unavailable serializer: {self.serializer}")
+        if self.compressor not in COMPRESSORS:
+            raise ValueError(f"Unavailable compressor: {self.compressor}")
+        self.stats = CodecStats()
+
+    @staticmethod
+    def is_encoded(data: bytes) -> bool:
+        return data.startswith(MAGIC)
+
+    def encode(self, value: Any) -> bytes:
+        start = time.perf_counter()
+        serializer = SERIALIZERS[self.serializer]
+        compressor = COMPRESSORS[self.compressor]
+
+        raw = serializer.encode(value)
+        data = MAGIC + bytes([serializer.tag, compressor.tag]) + compressor.encode(raw)
+
+        self.stats.record("encode", time.perf_counter() - start, len(raw), len(data))
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        start = time.perf_counter()
+        if not self.is_encoded(data):
+            raise ValueError("Data was not encoded by this codec")
+
+        serializer_tag, compressor_tag = data[len(MAGIC) : len(MAGIC) + 2]
+        serializer = self.__find(SERIALIZERS, serializer_tag)
+        compressor = self.__find(COMPRESSORS, compressor_tag)
+
+        raw = compressor.decode(data[len(MAGIC) + 2 :])
+        value = serializer.decode(raw)
+
+        self.stats.record("decode", time.perf_counter() - start, len(raw), len(data))
+        return value
+
+    @staticmethod
+    def __find(formats: dict[str, _Format], tag: int) -> _Format:
+        for format_ in formats.values():
+            if format_.tag == tag:
+                return format_
+        raise ValueError(f"Data uses an unavailable format: {chr(tag)!r}")
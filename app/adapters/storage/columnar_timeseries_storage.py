@@ -0,0 +1,119 @@
+import logging
+import os
+import shutil
+import struct
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from app.domain.entities import TimeseriesDataPoint
+from app.domain.ports import TimeseriesPort
+
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+
+# Column file header: number of points
+HEADER = struct.Struct("<I")
+# Dates are stored as proleptic Gregorian ordinals, values as 64-bit integers
+COLUMN_TYPECODE = "q"
+
+
+class ColumnarTimeseriesStorage(TimeseriesPort):
+    """
+    Timeseries kept as columns, one file per entity and metric.
+
+    Each file holds the dates column followed by the values column as packed
+    integer arrays, so a series is read back with two ``frombytes`` calls and
+    writing one metric never rewrites the others.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__logger = logger
+        self.__executor = StorageExecutor(name=f"timeseries-storage-{path.name}")
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    def __file(self, entity_id: Any, metric: str) -> Path:
+        return self.__path / str(entity_id) / f"{metric}.col"
+
+    def __write_column(
+        self, entity_id: Any, metric: str, points: list[TimeseriesDataPoint]
+    ) -> None:
+        dates = array(
+            COLUMN_TYPECODE, (date.fromisoformat(p.date).toordinal() for p in points)
+        )
+        values = array(COLUMN_TYPECODE, (p.value for p in points))
+
+        file = self.__file(entity_id, metric)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = file.with_suffix(".tmp")
+        with temp_file.open("wb") as f:
+            f.write(HEADER.pack(len(points)))
+            f.write(dates.tobytes())
+            f.write(values.tobytes())
+        os.replace(temp_file, file)
+
+    def __read_column(
+        self, entity_id: Any, metric: str
+    ) -> list[TimeseriesDataPoint] | None:
+        file = self.__file(entity_id, metric)
+        if not file.exists():
+            return None
+
+        raw = file.read_bytes()
+        (count,) = HEADER.unpack_from(raw)
+        dates, values = array(COLUMN_TYPECODE), array(COLUMN_TYPECODE)
+        size = count * dates.itemsize
+        dates.frombytes(raw[HEADER.size : HEADER.size + size])
+        values.frombytes(raw[HEADER.size + size : HEADER.size + 2 * size])
+
+        # Points were validated when written
+        return [
+            TimeseriesDataPoint.model_construct(
+                date=date.fromordinal(day).isoformat(), value=value
+            )
+            for day, value in zip(dates, values)
+        ]
+
+    def __write(
+        self, entity_id: Any, series: dict[str, list[TimeseriesDataPoint]]
+    ) -> None:
+        for metric, points in series.items():
+            self.__write_column(entity_id, metric, points)
+
+    def __read_many(
+        self, entity_ids: list[Any], metrics: list[str]
+    ) -> dict[Any, dict[str, list[TimeseriesDataPoint]]]:
+        result: dict[Any, dict[str, list[TimeseriesDataPoint]]] = {}
+        for entity_id in entity_ids:
+            for metric in metrics:
+                if (points := self.__read_column(entity_id, metric)) is not None:
+                    result.setdefault(entity_id, {})[metric] = points
+        return result
+
+    def __delete(self, entity_id: Any) -> None:
+        shutil.rmtree(self.__path / str(entity_id), ignore_errors=True)
+
+    @measure_loop_blocking
+    async def write(
+        self, entity_id: Any, series: dict[str, list[TimeseriesDataPoint]]
+    ) -> None:
+        await self.__executor.run(self.__write, entity_id, series)
+
+    @measure_loop_blocking
+    async def read_many(
+        self, entity_ids: list[Any], metrics: list[str]
+    ) -> dict[Any, dict[str, list[TimeseriesDataPoint]]]:
+        return await self.__executor.run(self.__read_many, entity_ids, metrics)
+
+    @measure_loop_blocking
+    async def delete(self, entity_id: Any) -> None:
+        await self.__executor.run(self.__delete, entity_id)
+
+    async def close(self) -> None:
+        self.__executor.shutdown()
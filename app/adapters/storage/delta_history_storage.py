@@ -0,0 +1,207 @@
+import bisect
+import json
+import logging
+import os
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import quote
+
+from app.domain.ports import HistoryPort
+
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+
+
+class _Version(NamedTuple):
+    at: datetime
+    offset: int
+    keyframe: bool
+
+
+def _diff(previous: dict[str, Any], values: dict[str, Any]) -> dict[str, Any]:
+    """Changes from previous to values; removed timeseries points map to None."""
+    delta = {}
+    for field, value in values.items():
+        old = previous.get(field)
+        if isinstance(value, dict):
+            old = old if isinstance(old, dict) else {}
+            changes = {date: v for date, v in value.items() if old.get(date) != v}
+            changes.update({date: None for date in old.keys() - value.keys()})
+            if changes:
+                delta[field] = changes
+        elif field not in previous or value != old:
+            delta[field] = value
+    return delta
+
+
+def _apply(state: dict[str, Any], delta: dict[str, Any]) -> None:
+    for field, value in delta.items():
+        if isinstance(value, dict):
+            series = dict(state.get(field) or {})
+            for date, point in value.items():
+                if point is None:
+                    series.pop(date, None)
+                else:
+                    series[date] = point
+            state[field] = series
+        else:
+            state[field] = value
+
+
+class DeltaHistoryStorage(HistoryPort):
+    """
+    History kept as one append-only JSON lines file per key.
+
+    Each version stores only its changes from the previous one: changed scalars
+    and the timeseries points added, changed or removed. Every
+    ``keyframe_interval`` versions the full values are stored instead, so reading
+    a version replays at most that many lines. Version dates and offsets are
+    indexed in memory on first use of a key, and the index catches up with lines
+    appended by other processes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        keyframe_interval: int = 50,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__keyframe_interval = keyframe_interval
+        self.__logger = logger
+        self.__executor = StorageExecutor(name=f"history-storage-{path.name}")
+        self.__versions: dict[str, list[_Version]] = {}
+        # Offset up to which the file of each key was indexed
+        self.__indexed: dict[str, int] = {}
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    def __file(self, key: str) -> Path:
+        return self.__path / f"{quote(key, safe='')}.jsonl"
+
+    def __lines(
+        self, key: str, start: int, end: int | None = None
+    ) -> Iterator[tuple[int, int, dict]]:
+        """Yields (offset, end offset, record) of the complete lines in the range."""
+        file = self.__file(key)
+        if not file.exists():
+            return
+
+        with file.open("rb") as f:
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start)
+
+        offset = start
+        for line in data.splitlines(keepends=True):
+            line_end = offset + len(line)
+            if not line.endswith(b"\n"):
+                # Being appended, or torn by a crash
+                return
+            try:
+                yield offset, line_end, json.loads(line)
+            except ValueError:
+                self.__logger.warning(f"Skipping invalid record at {offset} of {file}")
+            offset = line_end
+
+    def __index(self, key: str) -> list[_Version]:
+        versions = self.__versions.setdefault(key, [])
+        start = self.__indexed.get(key, 0)
+        for offset, end, record in self.__lines(key, start):
+            versions.append(
+                _Version(datetime.fromisoformat(record["at"]), offset, record["key"])
+            )
+            start = end
+        self.__indexed[key] = start
+        return versions
+
+    def __state(self, key: str, versions: list[_Version], last: int) -> dict[str, Any]:
+        """Replays the values of version ``last`` from the keyframe before it."""
+        first = last
+        while first > 0 and not versions[first].keyframe:
+            first -= 1
+        end = versions[last + 1].offset if last + 1 < len(versions) else None
+
+        state: dict[str, Any] = {}
+        for _, _, record in self.__lines(key, versions[first].offset, end):
+            _apply(state, record["values"])
+        return state
+
+    def __record(self, key: str, values: dict[str, Any], at: datetime) -> None:
+        versions = self.__index(key)
+        previous = self.__state(key, versions, len(versions) - 1) if versions else {}
+        last_keyframe = next(
+            (i for i in range(len(versions) - 1, -1, -1) if versions[i].keyframe), None
+        )
+
+        if last_keyframe is None or len(versions) - last_keyframe >= (
+            self.__keyframe_interval
+        ):
+            _apply(previous, _diff(previous, values))
+            record = {"at": at.isoformat(), "key": True, "values": previous}
+        elif delta := _diff(previous, values):
+            record = {"at": at.isoformat(), "key": False, "values": delta}
+        else:
+            # Unchanged values add no version
+            return
+
+        file = self.__file(key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with file.open("a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size and os.pread(f.fileno(), 1, size - 1) != b"\n":
+                # Keeps a line torn by a crash apart from the new one
+                line = b"\n" + line
+            f.write(line)
+        self.__index(key)
+
+    def __as_of(self, key: str, at: datetime) -> dict[str, Any] | None:
+        versions = self.__index(key)
+        last = bisect.bisect_right([v.at for v in versions], at) - 1
+        if last < 0:
+            return None
+        return self.__state(key, versions, last)
+
+    def __trend(
+        self, key: str, field: str, start: datetime | None, end: datetime | None
+    ) -> list[tuple[datetime, Any]]:
+        state: dict[str, Any] = {}
+        trend = []
+        for _, _, record in self.__lines(key, 0):
+            at = datetime.fromisoformat(record["at"])
+            if end is not None and at > end:
+                break
+            if field not in record["values"]:
+                continue
+
+            before = state.get(field)
+            if record["key"]:
+                # Keyframes hold whole timeseries, not changes to merge
+                state.pop(field, None)
+            _apply(state, {field: record["values"][field]})
+            if (start is None or at >= start) and state[field] != before:
+                trend.append((at, state[field]))
+        return trend
+
+    @measure_loop_blocking
+    async def record(self, key: str, values: dict[str, Any], at: datetime) -> None:
+        await self.__executor.run(self.__record, key, values, at)
+
+    @measure_loop_blocking
+    async def as_of(self, key: str, at: datetime) -> dict[str, Any] | None:
+        return await self.__executor.run(self.__as_of, key, at)
+
+    @measure_loop_blocking
+    async def trend(
+        self,
+        key: str,
+        field: str,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[datetime, Any]]:
+        return await self.__executor.run(self.__trend, key, field, start, end)
+
+    async def close(self) -> None:
+        self.__executor.shutdown()
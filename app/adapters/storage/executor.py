@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class StorageExecutor:
+    """
+    Single worker thread running the blocking work of one storage adapter.
+
+    Running file I/O and (de)serialization there keeps it off the event loop, and
+    having a single worker serializes it, so adapters shared by several event loops
+    (e.g. ``asyncio.run`` in ``run.io_bound`` threads) never touch files concurrently.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def submit(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> None:
+        self.__executor.submit(func, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=True)
+
+
+class LoopBlockingStats:
+    """Time each storage operation kept the event loop busy, awaits excluded."""
+
+    def __init__(self) -> None:
+        self.__stats: dict[str, dict[str, float]] = {}
+
+    def record(self, operation: str, seconds: float) -> None:
+        stats = self.__stats.setdefault(
+            operation, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["calls"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {operation: dict(stats) for operation, stats in self.__stats.items()}
+
+
+class _Measured:
+    def __init__(
+        self, coro: Coroutine[Any, Any, T], on_done: Callable[[float], None]
+    ) -> None:
+        self.__coro = coro
+        self.__on_done = on_done
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        iterator = self.__coro.__await__()
+        blocking = 0.0
+        value, error = None, None
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    if error is None:
+                        signal = iterator.send(value)
+                    else:
+                        signal = iterator.throw(error)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    blocking += time.perf_counter() - start
+
+                value, error = None, None
+                try:
+                    value = yield signal
+                except GeneratorExit:
+                    iterator.close()
+                    raise
+                except BaseException as exc:
+                    error = exc
+        finally:
+            self.__on_done(blocking)
+
+
+def measure_loop_blocking(
+    method: Callable[..., Coroutine[Any, Any, T]],
+) -> Callable[..., Awaitable[T]]:
+    """Records in ``self.loop_blocking_stats`` the loop time spent by each call."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        on_done = functools.partial(self.loop_blocking_stats.record, method.__name__)
+        return await _Measured(method(self, *args, **kwargs), on_done)
+
+    return wrapper
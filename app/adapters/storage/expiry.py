@@ -0,0 +1,264 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort, TimeseriesPort
+from app.domain.query import Condition, Page, Query
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+
+
+class ExpiryIndex:
+    """
+    Entity IDs ordered by expiry time in a heap.
+
+    Changing or removing an expiry leaves the old heap entry in place; entries
+    that no longer match the current expiry are skipped when popped, and the heap
+    is rebuilt once they outnumber the live ones.
+    """
+
+    def __init__(self) -> None:
+        self.__heap: list[tuple[datetime, Any]] = []
+        self.__expiries: dict[Any, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self.__expiries)
+
+    def set(self, entity_id: Any, expires_at: datetime | None) -> None:
+        if expires_at is None:
+            self.remove(entity_id)
+            return
+        if self.__expiries.get(entity_id) == expires_at:
+            return
+
+        self.__expiries[entity_id] = expires_at
+        heapq.heappush(self.__heap, (expires_at, entity_id))
+        if len(self.__heap) > 2 * len(self.__expiries) + 64:
+            self.__heap = [(at, id) for id, at in self.__expiries.items()]
+            heapq.heapify(self.__heap)
+
+    def remove(self, entity_id: Any) -> None:
+        self.__expiries.pop(entity_id, None)
+
+    def get(self, entity_id: Any) -> datetime | None:
+        return self.__expiries.get(entity_id)
+
+    def pop_due(self, now: datetime, limit: int) -> list[Any]:
+        """Removes and returns up to ``limit`` IDs expired at ``now``, oldest first."""
+        due = []
+        while self.__heap and len(due) < limit and self.__heap[0][0] <= now:
+            expires_at, entity_id = heapq.heappop(self.__heap)
+            if self.__expiries.get(entity_id) == expires_at:
+                del self.__expiries[entity_id]
+                due.append(entity_id)
+        return due
+
+
+class ExpiringStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    Storage wrapper that purges entities long expired.
+
+    Entities expire at their ``expires_at`` field and are purged once they have
+    been expired for ``retention_seconds``, along with their timeseries. Purge
+    times are kept in an ``ExpiryIndex``, built from a projected scan on the first
+    sweep and then maintained from the writes going through the wrapper, so a
+    sweep only visits the entities due. Once started, sweeps run every
+    ``sweep_interval_seconds`` in batches of ``batch_size``.
+    """
+
+    def __init__(
+        self,
+        storage: StoragePort[TModel, TCreate, TUpdate, TFilter],
+        *,
+        retention_seconds: float,
+        sweep_interval_seconds: float,
+        batch_size: int = 100,
+        timeseries_storage: TimeseriesPort | None = None,
+        field: str = "expires_at",
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__storage = storage
+        self.__retention = timedelta(seconds=retention_seconds)
+        self.__interval = sweep_interval_seconds
+        self.__batch_size = batch_size
+        self.__timeseries = timeseries_storage
+        self.__field = field
+        self.__logger = logger
+        self.__index = ExpiryIndex()
+        self.__indexed = False
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def storage(self) -> StoragePort[TModel, TCreate, TUpdate, TFilter]:
+        return self.__storage
+
+    def __purge_at(self, entity: TModel) -> datetime | None:
+        expires_at = getattr(entity, self.__field, None)
+        return None if expires_at is None else expires_at + self.__retention
+
+    def __track(self, entity: TModel | None) -> None:
+        if entity is not None:
+            self.__index.set(entity.id, self.__purge_at(entity))
+
+    async def __build_index(self) -> None:
+        skip = 0
+        while entities := await self.__storage.get_many(
+            None, skip=skip, limit=self.__batch_size, include={self.__field}
+        ):
+            for entity in entities:
+                # Entities written while scanning are already tracked
+                if self.__index.get(entity.id) is None:
+                    self.__track(entity)
+            skip += len(entities)
+        self.__indexed = True
+
+    async def __purge(self, entity_ids: list[Any]) -> int:
+        # Entities may have been refreshed by writes not seen by this wrapper,
+        # even while purging, so the storage deletes only those still expired
+        expired = {self.__field: Condition(lte=datetime.now() - self.__retention)}
+        deleted = await self.__storage.delete_many(entity_ids, where=expired)
+
+        kept = await self.__storage.get_many_by_ids(entity_ids, include={self.__field})
+        for entity in kept:
+            self.__track(entity)
+        if self.__timeseries is not None:
+            kept_ids = {entity.id for entity in kept}
+            for entity_id in entity_ids:
+                if entity_id not in kept_ids:
+                    await self.__timeseries.delete(entity_id)
+        return deleted
+
+    async def sweep(self) -> int:
+        """
+        Purges the entities due, batch by batch.
+
+        Returns:
+            int: The number of purged entities.
+        """
+        if not self.__indexed:
+            await self.__build_index()
+
+        purged = 0
+        while due := self.__index.pop_due(datetime.now(), self.__batch_size):
+            purged += await self.__purge(due)
+
+        if purged:
+            self.__logger.info(f"Purged {purged} expired entities")
+        return purged
+
+    async def __sweep_forever(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                self.__logger.exception("Sweeping expired entities failed")
+            await asyncio.sleep(self.__interval)
+
+    async def start(self) -> None:
+        """Starts sweeping in the background on the running event loop."""
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.create_task(self.__sweep_forever())
+
+    async def create_one(self, entity: TCreate) -> TModel:
+        created = await self.__storage.create_one(entity)
+        self.__track(created)
+        return created
+
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        stored = await self.__storage.upsert_one(entity, key=key)
+        self.__track(stored)
+        return stored
+
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        created = await self.__storage.create_many(entities)
+        for entity in created:
+            self.__track(entity)
+        return created
+
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        stored = await self.__storage.upsert_many(entities, key=key)
+        for entity in stored:
+            self.__track(entity)
+        return stored
+
+    async def get_one(
+        self,
+        entity_id: Any,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        return await self.__storage.get_one(entity_id, include=include, exclude=exclude)
+
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[Any],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        return await self.__storage.get_many_by_ids(
+            entity_ids, include=include, exclude=exclude
+        )
+
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        return await self.__storage.get_many(
+            filter_dict, skip=skip, limit=limit, include=include, exclude=exclude
+        )
+
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        return await self.__storage.find(query, include=include, exclude=exclude)
+
+    async def update_one(self, entity_id: Any, entity: TUpdate) -> TModel | None:
+        updated = await self.__storage.update_one(entity_id, entity)
+        self.__track(updated)
+        return updated
+
+    async def delete_one(self, entity_id: Any) -> bool:
+        deleted = await self.__storage.delete_one(entity_id)
+        self.__index.remove(entity_id)
+        return deleted
+
+    async def delete_many(
+        self, entity_ids: list[Any], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        deleted = await self.__storage.delete_many(entity_ids, where=where)
+        for entity_id in entity_ids:
+            self.__index.remove(entity_id)
+        # Entities kept by the conditions are tracked again
+        if where:
+            for entity in await self.__storage.get_many_by_ids(
+                entity_ids, include={self.__field}
+            ):
+                self.__track(entity)
+        return deleted
+
+    async def close(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+        await self.__storage.close()
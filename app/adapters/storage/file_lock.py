@@ -0,0 +1,65 @@
+import os
+import struct
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Lock file content: generation of the guarded file, bumped by every write
+GENERATION = struct.Struct("<Q")
+
+
+class FileLock:
+    """
+    Advisory lock shared by the processes using a file.
+
+    The lock is held on a sibling ``.lock`` file, which also stores the generation
+    of the guarded file. Writers bump it while holding the lock, so readers notice
+    writes from other processes with an 8-byte read and without locking. Where
+    ``fcntl`` is unavailable only the generation is tracked.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__path = path.with_name(path.name + ".lock")
+        self.__fd: int | None = None
+        self.__open_lock = threading.Lock()
+
+    def __open(self) -> int:
+        with self.__open_lock:
+            if self.__fd is None:
+                self.__path.parent.mkdir(parents=True, exist_ok=True)
+                self.__fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+            return self.__fd
+
+    @property
+    def generation(self) -> int:
+        data = os.pread(self.__open(), GENERATION.size, 0)
+        return GENERATION.unpack(data)[0] if len(data) == GENERATION.size else 0
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        fd = self.__open()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def bump(self) -> int:
+        """Increments the generation. Must be called holding the exclusive lock."""
+        generation = self.generation + 1
+        os.pwrite(self.__open(), GENERATION.pack(generation), 0)
+        return generation
+
+    def close(self) -> None:
+        with self.__open_lock:
+            if self.__fd is not None:
+                os.close(self.__fd)
+                self.__fd = None
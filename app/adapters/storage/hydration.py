@@ -0,0 +1,107 @@
+from collections.abc import Callable, Mapping
+from datetime import datetime
+from functools import cache
+from types import NoneType, UnionType
+from typing import Any, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+Converter = Callable[[Any], Any]
+
+_set = object.__setattr__
+
+
+@cache
+def _converter(annotation: Any) -> Converter | None:
+    """Builds the conversion of a stored value of the annotated type, if any."""
+    origin = get_origin(annotation)
+
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1:
+            return _converter(args[0])
+        return None
+
+    if origin is list:
+        (item,) = get_args(annotation)
+        if (convert_item := _converter(item)) is None:
+            return None
+        return lambda value: [convert_item(item) for item in value]
+
+    if origin is dict:
+        _, item = get_args(annotation)
+        if (convert_item := _converter(item)) is None:
+            return None
+        return lambda value: {key: convert_item(item) for key, item in value.items()}
+
+    if annotation is datetime:
+        # JSON-mode records keep datetimes as ISO strings
+        return lambda value: (
+            datetime.fromisoformat(value) if isinstance(value, str) else value
+        )
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: (
+            value if isinstance(value, annotation) else construct(annotation, value)
+        )
+
+    return None
+
+
+@cache
+def _plan(model: type[BaseModel]) -> tuple[tuple[str, Converter | None], ...]:
+    return tuple(
+        (name, _converter(field.annotation))
+        for name, field in model.model_fields.items()
+    )
+
+
+def construct(model: type[TModel], data: Mapping[str, Any]) -> TModel:
+    """
+    Builds a model from a trusted stored record without validating it.
+
+    Only the conversions JSON cannot represent are applied: ISO strings back into
+    datetimes and nested dicts back into models, recursively. Keys that are not
+    fields of the model, such as dumped computed fields, are ignored and missing
+    fields take their defaults.
+    """
+    plan = _plan(model)
+    values = {}
+    for name, convert in plan:
+        if name in data:
+            value = data[name]
+            values[name] = value if convert is None or value is None else convert(value)
+
+    if len(values) < len(plan) or model.__pydantic_post_init__:
+        return model.model_construct(_fields_set=set(values), **values)
+
+    # With every field present there are no defaults to fill, so the instance
+    # state is set directly, as model_construct does, at a fraction of its cost
+    instance = model.__new__(model)
+    _set(instance, "__dict__", values)
+    _set(instance, "__pydantic_fields_set__", set(values))
+    _set(instance, "__pydantic_extra__", None)
+    _set(instance, "__pydantic_private__", None)
+    return instance
+
+
+def hydrate(model: type[TModel], data: Mapping[str, Any], *, trusted: bool) -> TModel:
+    """Builds a model from a stored record, validating it unless it is trusted."""
+    if trusted:
+        return construct(model, data)
+    return model.model_validate(data)
+
+
+def shallow_dump(entity: BaseModel, *, exclude_unset: bool = False) -> dict[str, Any]:
+    """
+    Field values of a validated model, computed fields included, keeping nested
+    models as they are so that building another model from them does not
+    validate them again.
+    """
+    model = type(entity)
+    names = entity.model_fields_set if exclude_unset else model.model_fields
+    return {
+        name: getattr(entity, name) for name in [*names, *model.model_computed_fields]
+    }
@@ -0,0 +1,110 @@
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from typing import Any
+
+from app.domain.query import Condition
+
+
+class HashIndex:
+    """
+    Hash indexes mapping the values of some fields to the IDs holding them.
+
+    Adapters keep it up to date on every write, so equality and ``in`` filters on
+    indexed fields are dictionary lookups instead of scans over every entity.
+    """
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.__fields = tuple(fields)
+        self.__index: dict[str, dict[Hashable, set[int]]] = {f: {} for f in fields}
+        self.__values: dict[int, dict[str, Hashable]] = {}
+
+    def covers(self, field: str) -> bool:
+        return field in self.__index
+
+    def add(self, entity_id: int, values: Mapping[str, Any]) -> None:
+        """Indexes the entity, replacing the values indexed for it before."""
+        self.remove(entity_id)
+
+        indexed = {
+            field: values[field]
+            for field in self.__fields
+            if values.get(field) is not None
+        }
+        for field, value in indexed.items():
+            self.__index[field].setdefault(value, set()).add(entity_id)
+        self.__values[entity_id] = indexed
+
+    def remove(self, entity_id: int) -> None:
+        for field, value in self.__values.pop(entity_id, {}).items():
+            ids = self.__index[field][value]
+            ids.discard(entity_id)
+            if not ids:
+                del self.__index[field][value]
+
+    def lookup(self, field: str, values: Iterable[Hashable]) -> set[int]:
+        """Returns the IDs whose field equals any of the values."""
+        index = self.__index[field]
+        return set().union(*(index.get(value, ()) for value in values))
+
+    def narrow(self, where: Mapping[str, Condition]) -> set[int] | None:
+        """
+        Returns the IDs that may match the ``eq`` and ``in`` conditions on indexed
+        fields, or None when the conditions do not narrow on any of them.
+        """
+        ids: set[int] | None = None
+        for field, condition in where.items():
+            if not self.covers(field):
+                continue
+            if condition.eq is not None:
+                found = self.lookup(field, [condition.eq])
+                ids = found if ids is None else ids & found
+            if condition.in_ is not None:
+                found = self.lookup(field, condition.in_)
+                ids = found if ids is None else ids & found
+        return ids
+
+    def copy(self) -> "HashIndex":
+        """Returns a copy which can be changed without affecting this index."""
+        copy = HashIndex(self.__fields)
+        copy.__index = {
+            field: {value: set(ids) for value, ids in index.items()}
+            for field, index in self.__index.items()
+        }
+        copy.__values = dict(self.__values)
+        return copy
+
+    def clear(self) -> None:
+        for index in self.__index.values():
+            index.clear()
+        self.__values.clear()
+
+    def match(
+        self, filter_values: Mapping[str, Any], scan: Callable[[], Iterable[Any]]
+    ) -> list[int]:
+        """
+        Returns the sorted IDs of the entities matching any of the filter values.
+
+        A string value matches by equality and a list value by membership; other
+        values are ignored. Indexed fields are looked up, and only filters on
+        fields without an index fall back to a single pass over ``scan()``.
+        """
+        ids: set[int] = set()
+        scanned: list[tuple[str, list]] = []
+        for field, value in filter_values.items():
+            if isinstance(value, str):
+                value = [value]
+            elif not isinstance(value, list):
+                continue
+
+            if self.covers(field):
+                ids |= self.lookup(field, value)
+            else:
+                scanned.append((field, value))
+
+        if scanned:
+            for entity in scan():
+                if any(
+                    hasattr(entity, field) and getattr(entity, field) in values
+                    for field, values in scanned
+                ):
+                    ids.add(entity.id)
+        return sorted(ids)
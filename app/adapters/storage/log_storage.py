@@ -0,0 +1,535 @@
+import asyncio
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+from .hydration import hydrate, shallow_dump
+from .index import HashIndex
+from .lru import CacheStats, LRUCache
+from .projection import excluded_fields, project, projection_model
+from .query import find_in, matching_entities, page, queried_fields, resolve
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+T = TypeVar("T")
+
+# Record frame: payload length and CRC32 of the payload
+HEADER = struct.Struct(">II")
+
+PUT = "put"
+DELETE = "del"
+
+
+class LogStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    Append-only record log.
+
+    Every mutation appends one framed record and the in-memory index maps each
+    entity ID to the offset of its latest record, so writes cost O(record). When
+    dead records pass the compaction thresholds, the log is rewritten with only
+    live records, and the delete of the highest ID so that IDs are never reused,
+    in a background thread. Opening the storage replays the log and truncates a
+    torn record left by a crash.
+
+    Entities live on disk; with ``cache_max_bytes`` the recently used ones are also
+    kept in an LRU bounded by the size of their records, so memory stays flat
+    however many entities are stored.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        compaction_ratio: float = 0.5,
+        compaction_min_dead: int = 100,
+        indexed_fields: Sequence[str] = (),
+        trusted_hydration: bool = False,
+        cache_max_bytes: int | None = None,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__compaction_ratio = compaction_ratio
+        self.__compaction_min_dead = compaction_min_dead
+        self.__logger = logger
+        # Stored records were validated when written, so they may skip validation
+        self.__trusted = trusted_hydration
+
+        self.__lock = threading.Lock()
+        self.__executor = StorageExecutor(name=f"log-storage-{path.name}")
+        self.__compactor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"log-compactor-{path.name}"
+        )
+        self.__compaction: Future | None = None
+        self.__offsets: dict[int, int] = {}
+        self.__records = 0
+        self.__next_id = 1
+        self.__index = HashIndex(indexed_fields)
+        self.__cache: LRUCache[TModel] | None = (
+            LRUCache(cache_max_bytes) if cache_max_bytes else None
+        )
+        self.cache_stats = (
+            self.__cache.stats if self.__cache is not None else CacheStats()
+        )
+        # Replayed lazily on the executor thread by the first operation
+        self.__file: BinaryIO = None  # type: ignore
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @property
+    def __model(self) -> type[TModel]:
+        return self.__orig_class__.__args__[0]  # type: ignore
+
+    @property
+    def __dead(self) -> int:
+        return self.__records - len(self.__offsets)
+
+    @staticmethod
+    def __frame(op: str, entity_id: int, data: dict[str, Any] | None) -> bytes:
+        payload = pickle.dumps((op, entity_id, data), pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def __scan(file: BinaryIO, start: int) -> Iterator[tuple[int, bytes, tuple]]:
+        """Yields (offset, raw frame, record) from start until the end of valid data."""
+        offset = start
+        file.seek(start)
+        while header := file.read(HEADER.size):
+            if len(header) < HEADER.size:
+                return
+            length, checksum = HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return
+            yield offset, header + payload, pickle.loads(payload)
+            offset += HEADER.size + length
+
+    async def __run(self, func: Callable[..., T], *args: Any) -> T:
+        return await self.__executor.run(self.__opened, func, *args)
+
+    def __opened(self, func: Callable[..., T], *args: Any) -> T:
+        if self.__file is None:
+            self.__file = self.__open()
+        return func(*args)
+
+    def __open(self) -> BinaryIO:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        file = self.__path.open("a+b")
+
+        end = 0
+        for offset, frame, (op, entity_id, data) in self.__scan(file, 0):
+            self.__apply(op, entity_id, data, offset)
+            end = offset + len(frame)
+
+        if end < file.seek(0, os.SEEK_END):
+            self.__logger.warning(
+                f"Truncating torn record at offset {end} of {self.__path}"
+            )
+            file.truncate(end)
+        return file
+
+    def __apply(
+        self, op: str, entity_id: int, data: dict[str, Any] | None, offset: int
+    ) -> None:
+        self.__records += 1
+        self.__next_id = max(self.__next_id, entity_id + 1)
+        if op == PUT:
+            self.__offsets[entity_id] = offset
+            self.__index.add(entity_id, data)  # type: ignore
+        else:
+            self.__offsets.pop(entity_id, None)
+            self.__index.remove(entity_id)
+
+    def __append(
+        self, records: list[tuple[str, int, dict[str, Any] | None]]
+    ) -> list[int]:
+        """Appends the records in a single write and returns their frame sizes."""
+        frames = [self.__frame(*record) for record in records]
+        with self.__lock:
+            offset = self.__file.seek(0, os.SEEK_END)
+            self.__file.write(b"".join(frames))
+            self.__file.flush()
+            for (op, entity_id, data), frame in zip(records, frames):
+                self.__apply(op, entity_id, data, offset)
+                offset += len(frame)
+        self.__maybe_compact()
+        return [len(frame) for frame in frames]
+
+    def __read(
+        self,
+        entity_id: int,
+        excluded: frozenset[str] = frozenset(),
+        *,
+        cache: bool = True,
+    ) -> TModel | None:
+        if self.__cache is None:
+            record = self.__read_record(entity_id, excluded)
+            return record[0] if record else None
+
+        if (entity := self.__cache.get(entity_id)) is not None:
+            return project(entity, excluded)
+        if (record := self.__read_record(entity_id, excluded)) is None:
+            return None
+
+        entity, size = record
+        # Projected entities are incomplete and scans would flush the hot entries
+        if cache and not excluded:
+            self.__cache.put(entity_id, entity, size)
+        return entity
+
+    def __read_record(
+        self, entity_id: int, excluded: frozenset[str]
+    ) -> tuple[TModel, int] | None:
+        with self.__lock:
+            if (offset := self.__offsets.get(entity_id)) is None:
+                return None
+            fd = self.__file.fileno()
+            length, _ = HEADER.unpack(os.pread(fd, HEADER.size, offset))
+            payload = os.pread(fd, length, offset + HEADER.size)
+
+        _, _, data = pickle.loads(payload)
+        # Excluded fields are still unpickled but never validated
+        for field in excluded:
+            data.pop(field, None)
+        entity = hydrate(
+            projection_model(self.__model, excluded),
+            {**data, "id": entity_id},
+            trusted=self.__trusted,
+        )
+        return entity, HEADER.size + length
+
+    def __put(self, entity: TModel) -> TModel:
+        return self.__put_many([entity])[0]
+
+    def __put_many(self, entities: list[TModel]) -> list[TModel]:
+        sizes = self.__append(
+            [(PUT, entity.id, entity.model_dump(exclude={"id"})) for entity in entities]  # type: ignore
+        )
+        if self.__cache is not None:
+            for entity, size in zip(entities, sizes):
+                self.__cache.put(entity.id, entity, size)
+        return entities
+
+    def __entities(self) -> Iterator[TModel]:
+        for entity_id in list(self.__offsets):
+            if (entity := self.__read(entity_id, cache=False)) is not None:
+                yield entity
+
+    def __filter(
+        self, filter_dict: TFilter | None, excluded: frozenset[str]
+    ) -> Iterator[TModel]:
+        if not filter_dict:
+            ids = list(self.__offsets)
+        else:
+            ids = self.__index.match(filter_dict.model_dump(), self.__entities)
+
+        for entity_id in ids:
+            if (entity := self.__read(entity_id, excluded)) is not None:
+                yield entity
+
+    def __find_by(self, key: str, value: object) -> TModel | None:
+        if self.__index.covers(key):
+            ids = self.__index.lookup(key, [value])
+            return self.__read(min(ids)) if ids else None
+
+        return next(
+            (item for item in self.__entities() if getattr(item, key, None) == value),
+            None,
+        )
+
+    def __maybe_compact(self) -> None:
+        if self.__compaction is not None and not self.__compaction.done():
+            return
+        if self.__dead < self.__compaction_min_dead:
+            return
+        if self.__dead < self.__compaction_ratio * self.__records:
+            return
+
+        self.__compaction = self.__compactor.submit(self.__compact)
+        self.__compaction.add_done_callback(self.__on_compacted)
+
+    def __on_compacted(self, future: Future) -> None:
+        if error := future.exception():
+            self.__logger.error(f"Compaction of {self.__path} failed: {error!r}")
+
+    def __compact(self) -> None:
+        with self.__lock:
+            end = self.__file.seek(0, os.SEEK_END)
+            live = sorted(self.__offsets.items(), key=lambda item: item[1])
+            # Replays give IDs after the highest one seen, so the delete of the
+            # highest is kept for deleted IDs never to be given again
+            deleted_last = self.__next_id - 1 not in self.__offsets
+            last_id = self.__next_id - 1
+
+        target_path = self.__path.with_name(self.__path.name + ".compact")
+        offsets: dict[int, int] = {}
+        records = 0
+        with self.__path.open("rb") as source, target_path.open("wb") as target:
+            if last_id and deleted_last:
+                target.write(self.__frame(DELETE, last_id, None))
+                records += 1
+
+            # Live records are immutable once written, so they are copied unlocked
+            fd = source.fileno()
+            for entity_id, offset in live:
+                length, _ = HEADER.unpack(os.pread(fd, HEADER.size, offset))
+                offsets[entity_id] = target.tell()
+                target.write(os.pread(fd, HEADER.size + length, offset))
+                records += 1
+
+            # Records appended while copying are replayed under the lock
+            with self.__lock:
+                for _, frame, (op, entity_id, _) in self.__scan(source, end):
+                    if op == PUT:
+                        offsets[entity_id] = target.tell()
+                    else:
+                        offsets.pop(entity_id, None)
+                    target.write(frame)
+                    records += 1
+
+                target.flush()
+                os.fsync(target.fileno())
+                os.replace(target_path, self.__path)
+
+                self.__file.close()
+                self.__file = self.__path.open("a+b")
+                self.__offsets = offsets
+                self.__records = records
+
+        self.__logger.info(f"Compacted {self.__path} to {records} records")
+
+    def __create_one(self, entity: TCreate) -> TModel:
+        return self.__create_many([entity])[0]
+
+    def __create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return self.__put_many(
+            [
+                self.__model(id=self.__next_id + i, **shallow_dump(entity))
+                for i, entity in enumerate(entities)
+            ]
+        )
+
+    def __upsert_one(self, entity: TCreate, key: str) -> TModel:
+        return self.__upsert_many([entity], key)[0]
+
+    def __upsert_many(self, entities: list[TCreate], key: str) -> list[TModel]:
+        next_id = self.__next_id
+        # Entities of the batch are not in the log yet, so they are matched here
+        batch: dict[Any, TModel] = {}
+        result = []
+        for entity in entities:
+            new_entity = self.__model(**shallow_dump(entity))
+            value = getattr(new_entity, key)
+            existing = batch.get(value) or self.__find_by(key, value)
+
+            if existing is None:
+                new_entity = new_entity.model_copy(update={"id": next_id})
+                next_id += 1
+            else:
+                new_entity = new_entity.model_copy(
+                    update={
+                        "id": existing.id,
+                        "created_at": existing.created_at,
+                        "updated_at": datetime.now(),
+                    }
+                )
+            batch[value] = new_entity
+            result.append(new_entity)
+
+        return self.__put_many(result)
+
+    def __get_many_by_ids(
+        self, entity_ids: list[int], excluded: frozenset[str]
+    ) -> list[TModel]:
+        return [
+            entity
+            for entity_id in entity_ids
+            if (entity := self.__read(entity_id, excluded)) is not None
+        ]
+
+    def __get_many(
+        self,
+        filter_dict: TFilter | None,
+        skip: int,
+        limit: int,
+        excluded: frozenset[str],
+    ) -> list[TModel]:
+        result = []
+        for index, entity in enumerate(self.__filter(filter_dict, excluded)):
+            if index >= skip + limit:
+                break
+            if index >= skip:
+                result.append(entity)
+        return result
+
+    def __find(self, query: Query, excluded: frozenset[str]) -> Page[TModel]:
+        where = resolve(self.__model, query)
+        # Matching only needs the queried fields; the page is then read in full.
+        # Computed fields depend on others, so querying them reads every field.
+        queried = queried_fields(query)
+        scanned = (
+            excluded_fields(self.__model, queried, None)
+            if queried <= set(self.__model.model_fields)
+            else frozenset()
+        )
+        if (ids := self.__index.narrow(where)) is None:
+            ids = list(self.__offsets)
+        entities = (
+            entity
+            for entity_id in ids
+            if (entity := self.__read(entity_id, scanned, cache=False)) is not None
+        )
+
+        found = page(find_in(self.__model, entities, query, where), query, scanned)
+        return Page(
+            items=[
+                entity
+                for item in found.items
+                if (entity := self.__read(item.id, excluded)) is not None
+            ],
+            next_cursor=found.next_cursor,
+        )
+
+    def __update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        if (current := self.__read(entity_id)) is None:
+            return None
+
+        return self.__put(
+            self.__model.model_validate(
+                {
+                    **shallow_dump(current),
+                    **shallow_dump(entity, exclude_unset=True),
+                }
+            )
+        )
+
+    def __delete_one(self, entity_id: int) -> bool:
+        return self.__delete_many([entity_id]) > 0
+
+    def __delete_many(
+        self, entity_ids: list[int], where: dict[str, Condition] | None = None
+    ) -> int:
+        existing = [id for id in dict.fromkeys(entity_ids) if id in self.__offsets]
+        if where:
+            current = self.__get_many_by_ids(existing, frozenset())
+            existing = [
+                entity.id for entity in matching_entities(self.__model, current, where)
+            ]
+        if not existing:
+            return 0
+
+        self.__append([(DELETE, entity_id, None) for entity_id in existing])
+        if self.__cache is not None:
+            for entity_id in existing:
+                self.__cache.discard(entity_id)
+        return len(existing)
+
+    def __close(self) -> None:
+        with self.__lock:
+            self.__file.close()
+
+    async def compact(self) -> None:
+        """Rewrites the log keeping only live records."""
+        await self.__run(self.__compact)
+
+    @measure_loop_blocking
+    async def create_one(self, entity: TCreate) -> TModel:
+        return await self.__run(self.__create_one, entity)
+
+    @measure_loop_blocking
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        return await self.__run(self.__upsert_one, entity, key)
+
+    @measure_loop_blocking
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return await self.__run(self.__create_many, entities)
+
+    @measure_loop_blocking
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        return await self.__run(self.__upsert_many, entities, key)
+
+    @measure_loop_blocking
+    async def get_one(
+        self,
+        entity_id: int,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__read, entity_id, excluded)
+
+    @measure_loop_blocking
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many_by_ids, entity_ids, excluded)
+
+    @measure_loop_blocking
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many, filter_dict, skip, limit, excluded)
+
+    @measure_loop_blocking
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__find, query, excluded)
+
+    @measure_loop_blocking
+    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        return await self.__run(self.__update_one, entity_id, entity)
+
+    @measure_loop_blocking
+    async def delete_one(self, entity_id: int) -> bool:
+        return await self.__run(self.__delete_one, entity_id)
+
+    @measure_loop_blocking
+    async def delete_many(
+        self, entity_ids: list[int], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        return await self.__run(self.__delete_many, entity_ids, where)
+
+    async def close(self) -> None:
+        if self.__compaction is not None:
+            await asyncio.wrap_future(self.__compaction)
+        if self.__file is not None:
+            await self.__executor.run(self.__close)
+        self.__compactor.shutdown()
+        self.__executor.shutdown()
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class CacheStats:
+    """Hit, miss and eviction counters of a cache."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def snapshot(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class LRUCache(Generic[T]):
+    """
+    Least recently used cache bounded by the total size of its values.
+
+    Sizes are given by the caller, so any cheap estimate (e.g. the encoded size
+    of a record, or 1 to bound the number of entries) can be used as the budget
+    unit. With ``ttl_seconds``, entries older than that are dropped when read.
+    """
+
+    def __init__(self, max_bytes: int, *, ttl_seconds: float | None = None) -> None:
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl_seconds
+        self.__entries: OrderedDict[Hashable, tuple[T, int, float | None]] = (
+            OrderedDict()
+        )
+        self.__bytes = 0
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Unlike get, neither counts a lookup nor refreshes the entry
+        return key in self.__entries
+
+    @property
+    def bytes(self) -> int:
+        return self.__bytes
+
+    def get(self, key: Hashable) -> T | None:
+        if (entry := self.__entries.get(key)) is None:
+            self.stats.misses += 1
+            return None
+        if entry[2] is not None and entry[2] <= time.monotonic():
+            self.discard(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: T, size: int) -> None:
+        self.discard(key)
+        if size > self.__max_bytes:
+            return
+
+        expires_at = None if self.__ttl is None else time.monotonic() + self.__ttl
+        self.__entries[key] = (value, size, expires_at)
+        self.__bytes += size
+        while self.__bytes > self.__max_bytes:
+            _, (_, evicted_size, _) = self.__entries.popitem(last=False)
+            self.__bytes -= evicted_size
+            self.stats.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        if (entry := self.__entries.pop(key, None)) is not None:
+            self.__bytes -= entry[1]
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__bytes = 0
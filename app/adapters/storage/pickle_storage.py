@@ -1,109 +1,518 @@
 import logging
+import os
 import pickle
+import struct
+import threading
+import zlib
+from collections.abc import Callable, Iterator, MutableMapping, Sequence
+from datetime import datetime
 from pathlib import Path
-from typing import Generic, TypeVar
+from typing import Any, Generic, NamedTuple, TypeVar
 
 from pydantic import BaseModel
 
 from app.domain.base import BaseCrudEntity
 from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .codec import Codec
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+from .file_lock import FileLock
+from .hydration import hydrate, shallow_dump
+from .index import HashIndex
+from .projection import excluded_fields, project
+from .query import find_in, matching_entities, page, resolve
 
 TModel = TypeVar("TModel", bound=BaseCrudEntity)
 TCreate = TypeVar("TCreate", bound=BaseModel)
 TUpdate = TypeVar("TUpdate", bound=BaseModel)
 TFilter = TypeVar("TFilter", bound=BaseModel)
+T = TypeVar("T")
+
+# File header: magic and format version, then CRC32 and length of the payload
+MAGIC = b"RPKL\x01"
+HEADER = struct.Struct(">IQ")
+
+
+class _Snapshot(NamedTuple):
+    entities: MutableMapping[int, Any]
+    index: HashIndex
+
+
+class _Journal(MutableMapping[int, Any]):
+    """Entities changed in place by a write, with the versions it replaced."""
+
+    def __init__(self, entities: MutableMapping[int, Any]) -> None:
+        self.entities = entities
+        # None for the entities the write created
+        self.replaced: dict[int, Any] = {}
+
+    def __getitem__(self, entity_id: int) -> Any:
+        return self.entities[entity_id]
+
+    def __setitem__(self, entity_id: int, entity: Any) -> None:
+        self.replaced.setdefault(entity_id, self.entities.get(entity_id))
+        self.entities[entity_id] = entity
+
+    def __delitem__(self, entity_id: int) -> None:
+        self.replaced.setdefault(entity_id, self.entities[entity_id])
+        del self.entities[entity_id]
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self.entities
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.entities)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def keys(self):  # type: ignore[override]
+        return self.entities.keys()
+
+    def values(self):  # type: ignore[override]
+        return self.entities.values()
+
+
+def _sync_directory(path: Path) -> None:
+    # Makes renames durable; directories cannot be opened on Windows
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
 
 class PickleStorage(
     Generic[TModel, TCreate, TUpdate, TFilter],
     StoragePort[TModel, TCreate, TUpdate, TFilter],
 ):
-    __state: dict[int, TModel] = {}
+    """
+    In-memory storage persisted to a single file.
+
+    The file holds the entities as plain records encoded by ``Codec``, behind a
+    header with their checksum; files written by older versions, without header
+    or which pickled the models, are still loaded. Saves are synced to a
+    temporary file renamed over the file, whose previous generation is kept next
+    to it, so a missing or corrupted file falls back to the last good one.
+
+    Several processes may share the file: writes reload, mutate and save under an
+    advisory file lock, and every operation first compares the generation of the
+    file with the loaded one, so a process reloads only after another one wrote.
+    In write-behind mode pending mutations are not reloaded over, so that mode is
+    meant for a single writing process.
+
+    Writes change the entities and their index in place, under a lock that reads
+    on the event loop hold while they scan them, so a write costs what it changes.
+    The versions a write replaces are journaled, and restored if it or its save
+    fails.
+    """
 
     def __init__(
         self,
         path: Path,
         *,
+        flush_interval_seconds: float | None = None,
+        indexed_fields: Sequence[str] = (),
+        trusted_hydration: bool = False,
         logger: logging.Logger = logging.getLogger(__name__),
     ) -> None:
         self.__path = path
+        # Write-behind mode when set: mutations are persisted at most once per interval
+        self.__flush_interval = flush_interval_seconds
+        self.__flush_timer: threading.Timer | None = None
+        self.__dirty = False
+        self.__file_lock = FileLock(path)
+        # Generation of the file the state was loaded from, None until loaded
+        self.__generation: int | None = None
+        # False when the file failed to load, so that saves keep the last good one
+        self.__intact = True
+        self.__indexed_fields = tuple(indexed_fields)
+        # Changed in place by writes holding the lock, and replaced by reloads
+        self.__snapshot = _Snapshot({}, HashIndex(self.__indexed_fields))
+        self.__lock = threading.Lock()
+        # Last ID given, saved with the entities so that IDs are never reused
+        self.__last_id = 0
+        self.__executor = StorageExecutor(name=f"pickle-storage-{path.name}")
+        self.__codec = Codec()
+        # Stored records were validated when written, so they may skip validation
+        self.__trusted = trusted_hydration
         self.__logger = logger
-        self.__load()
+        self.loop_blocking_stats = LoopBlockingStats()
+        self.serialization_stats = self.__codec.stats
 
     @property
     def __model(self) -> type[TModel]:
         return self.__orig_class__.__args__[0]  # type: ignore
 
+    @property
+    def __previous_path(self) -> Path:
+        return self.__path.with_name(self.__path.name + ".prev")
+
+    def __decode(self, data: bytes) -> tuple[dict[int, TModel], int]:
+        """Entities saved in the data, and the last ID given."""
+        if data.startswith(MAGIC):
+            checksum, length = HEADER.unpack_from(data, len(MAGIC))
+            data = data[len(MAGIC) + HEADER.size :]
+            if len(data) != length or zlib.crc32(data) != checksum:
+                raise ValueError("Checksum mismatch")
+        if self.__codec.is_encoded(data):
+            saved = self.__codec.decode(data)
+            # Files written before the ID counter hold the records alone
+            records = saved["records"] if isinstance(saved, dict) else saved
+            state = {
+                record["id"]: hydrate(self.__model, record, trusted=self.__trusted)
+                for record in records
+            }
+            if isinstance(saved, dict):
+                return state, saved["last_id"]
+        elif not data:
+            # Left by a crash of versions writing the file in place
+            raise ValueError("Empty file")
+        else:
+            # Files written before the codec hold pickled entities
+            state = pickle.loads(data)
+        return state, max(state, default=0)
+
+    def __read(self, path: Path) -> tuple[dict[int, TModel], int] | None:
+        """Saved entities and last ID, or None if the file is missing or corrupted."""
+        try:
+            return self.__decode(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.__logger.exception(f"Cannot load {path}")
+            return None
+
     def __load(self) -> None:
+        generation = self.__file_lock.generation
+        if generation == self.__generation or self.__dirty:
+            return
+
         self.__path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.__path.exists():
+        state = self.__read(self.__path)
+        self.__intact = state is not None
+        if state is None and (state := self.__read(self.__previous_path)) is not None:
+            self.__logger.warning(f"Loaded the previous generation of {self.__path}")
+
+        state, self.__last_id = state or ({}, 0)
+        index = HashIndex(self.__indexed_fields)
+        for entity in state.values():
+            index.add(entity.id, self.__index_values(entity))  # type: ignore
+        self.__snapshot = _Snapshot(state, index)
+        self.__generation = generation
+
+    def __new_id(self) -> int:
+        # Deleted IDs are never given again, as timeseries and tabs are keyed by ID
+        self.__last_id += 1
+        return self.__last_id
+
+    def __index_values(self, entity: TModel) -> dict[str, object]:
+        return {field: getattr(entity, field, None) for field in self.__indexed_fields}
+
+    def __index_entity(self, snapshot: _Snapshot, entity: TModel) -> None:
+        snapshot.index.add(entity.id, self.__index_values(entity))  # type: ignore
+
+    async def __ensure_loaded(self) -> None:
+        # Reading the generation is a single pread, cheap enough for the event loop
+        if self.__generation is None or (
+            not self.__dirty and self.__generation != self.__file_lock.generation
+        ):
+            await self.__executor.run(self.__load)
+
+    def __save(self, snapshot: _Snapshot) -> None:
+        """Replaces the file atomically. Must be called holding the file lock."""
+        records = [
+            entity.model_dump(mode="json") for entity in snapshot.entities.values()
+        ]
+        payload = self.__codec.encode({"last_id": self.__last_id, "records": records})
+        temp_path = self.__path.with_name(self.__path.name + ".tmp")
+        with temp_path.open("wb") as file:
+            file.write(MAGIC + HEADER.pack(zlib.crc32(payload), len(payload)))
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Readers finding no file in between load the previous generation
+        if self.__intact and self.__path.exists():
+            os.replace(self.__path, self.__previous_path)
+        os.replace(temp_path, self.__path)
+        _sync_directory(self.__path.parent)
+        self.__intact = True
+        self.__generation = self.__file_lock.bump()
+
+    def __flush(self) -> None:
+        if not self.__dirty:
             return
 
-        with self.__path.open("rb") as f:
-            self.__state = pickle.load(f)
+        with self.__file_lock.exclusive():
+            self.__dirty = False
+            self.__save(self.__snapshot)
 
-    def __save(self) -> None:
-        with self.__path.open("wb") as f:
-            pickle.dump(self.__state, f)
+    def __mutate(
+        self, mutate: Callable[..., T], *args: Any
+    ) -> tuple[T, dict[int, Any]]:
+        """Applies a write, returning its result and the versions it replaced."""
+        snapshot = self.__snapshot
+        journal = _Journal(snapshot.entities)
+        try:
+            with self.__lock:
+                result = mutate(_Snapshot(journal, snapshot.index), *args)
+        except BaseException:
+            self.__rollback(snapshot, journal.replaced)
+            raise
+        return result, journal.replaced
 
-    def __filter(self, filter_dict: TFilter | None) -> list[int]:
-        if not filter_dict:
-            return list(self.__state.keys())
+    def __rollback(self, snapshot: _Snapshot, replaced: dict[int, Any]) -> None:
+        with self.__lock:
+            for entity_id, entity in replaced.items():
+                if entity is None:
+                    snapshot.entities.pop(entity_id, None)
+                    snapshot.index.remove(entity_id)
+                else:
+                    snapshot.entities[entity_id] = entity
+                    self.__index_entity(snapshot, entity)
 
-        ids = set([])
-        for entity in self.__state.values():
-            for filter_key, filter_value in filter_dict.model_dump().items():
-                if not hasattr(entity, filter_key):
-                    continue
+    def __write(self, mutate: Callable[..., T], *args: Any) -> T:
+        if self.__flush_interval is not None:
+            self.__load()
+            result, _ = self.__mutate(mutate, *args)
+            if result:
+                self.__schedule_flush()
+            return result
 
-                entity_value = getattr(entity, filter_key)
+        with self.__file_lock.exclusive():
+            # Another process may have written since the last operation
+            self.__load()
+            result, replaced = self.__mutate(mutate, *args)
+            # Missing entities and empty batches leave nothing to persist
+            if result:
+                try:
+                    self.__save(self.__snapshot)
+                except BaseException:
+                    self.__rollback(self.__snapshot, replaced)
+                    raise
+        return result
 
-                if isinstance(filter_value, str):
-                    if entity_value == filter_value:
-                        ids.add(entity.id)
-                elif isinstance(filter_value, list):
-                    if entity_value in filter_value:
-                        ids.add(entity.id)
-        return list(ids)
+    def __schedule_flush(self) -> None:
+        self.__dirty = True
+        if self.__flush_timer is None or not self.__flush_timer.is_alive():
+            # A thread timer, unlike a loop task, outlives short-lived event loops
+            self.__flush_timer = threading.Timer(
+                self.__flush_interval, self.__executor.submit, [self.__flush]  # type: ignore
+            )
+            self.__flush_timer.daemon = True
+            self.__flush_timer.start()
 
-    async def create_one(self, entity: TCreate) -> TModel:
-        new_id = max(self.__state.keys(), default=0) + 1
-        new_entity = self.__model(id=new_id, **entity.model_dump())
-        self.__state[new_id] = new_entity
+    def __filter(
+        self, filter_dict: TFilter | None, snapshot: _Snapshot | None = None
+    ) -> list[int]:
+        if snapshot is None:
+            snapshot = self.__snapshot
+        if not filter_dict:
+            return list(snapshot.entities.keys())
 
-        self.__save()
+        return snapshot.index.match(filter_dict.model_dump(), snapshot.entities.values)
 
-        return new_entity
+    @staticmethod
+    def __find_by(snapshot: _Snapshot, key: str, value: object) -> TModel | None:
+        if snapshot.index.covers(key):
+            ids = snapshot.index.lookup(key, [value])
+            return snapshot.entities[min(ids)] if ids else None
 
-    async def get_one(self, entity_id: int) -> TModel | None:
-        return self.__state.get(entity_id)
+        return next(
+            (
+                item
+                for item in snapshot.entities.values()
+                if getattr(item, key, None) == value
+            ),
+            None,
+        )
 
-    async def get_many(
-        self, filter_dict: TFilter | None, *, skip: int = 0, limit: int = 100
+    def __create_many(
+        self, snapshot: _Snapshot, entities: list[TCreate]
     ) -> list[TModel]:
-        ids = self.__filter(filter_dict)
-        ids = ids[skip : skip + limit]
+        return [self.__create_one(snapshot, entity) for entity in entities]
 
-        return [self.__state[id] for id in ids]
+    def __upsert_many(
+        self, snapshot: _Snapshot, entities: list[TCreate], key: str
+    ) -> list[TModel]:
+        return [self.__upsert_one(snapshot, entity, key) for entity in entities]
 
-    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
-        if entity_id not in self.__state:
+    def __delete_many(
+        self,
+        snapshot: _Snapshot,
+        entity_ids: list[int],
+        where: dict[str, Condition] | None = None,
+    ) -> int:
+        existing = [
+            snapshot.entities[id] for id in entity_ids if id in snapshot.entities
+        ]
+        return sum(
+            self.__delete_one(snapshot, entity.id)
+            for entity in matching_entities(self.__model, existing, where)
+        )
+
+    def __create_one(self, snapshot: _Snapshot, entity: TCreate) -> TModel:
+        new_id = self.__new_id()
+        new_entity = self.__model(id=new_id, **shallow_dump(entity))
+        snapshot.entities[new_id] = new_entity
+        self.__index_entity(snapshot, new_entity)
+        return new_entity
+
+    def __upsert_one(self, snapshot: _Snapshot, entity: TCreate, key: str) -> TModel:
+        new_entity = self.__model(**shallow_dump(entity))
+        existing = self.__find_by(snapshot, key, getattr(new_entity, key))
+
+        if existing is None:
+            new_entity = new_entity.model_copy(update={"id": self.__new_id()})
+        else:
+            new_entity = new_entity.model_copy(
+                update={
+                    "id": existing.id,
+                    "created_at": existing.created_at,
+                    "updated_at": datetime.now(),
+                }
+            )
+        snapshot.entities[new_entity.id] = new_entity  # type: ignore
+        self.__index_entity(snapshot, new_entity)
+        return new_entity
+
+    def __update_one(
+        self, snapshot: _Snapshot, entity_id: int, entity: TUpdate
+    ) -> TModel | None:
+        if entity_id not in snapshot.entities:
             return None
 
-        self.__state[entity_id] = self.__state[entity_id].model_copy(
-            update={
-                **entity.model_dump(exclude_unset=True),
+        updated = self.__model.model_validate(
+            {
+                **shallow_dump(snapshot.entities[entity_id]),
+                **shallow_dump(entity, exclude_unset=True),
             }
         )
-        self.__save()
+        snapshot.entities[entity_id] = updated
+        self.__index_entity(snapshot, updated)
+        return updated
+
+    def __delete_one(self, snapshot: _Snapshot, entity_id: int) -> bool:
+        if entity_id not in snapshot.entities:
+            return False
+
+        del snapshot.entities[entity_id]
+        snapshot.index.remove(entity_id)
+        return True
+
+    @measure_loop_blocking
+    async def create_one(self, entity: TCreate) -> TModel:
+        return await self.__executor.run(self.__write, self.__create_one, entity)
+
+    @measure_loop_blocking
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        return await self.__executor.run(self.__write, self.__upsert_one, entity, key)
+
+    @measure_loop_blocking
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return await self.__executor.run(self.__write, self.__create_many, entities)
+
+    @measure_loop_blocking
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        return await self.__executor.run(
+            self.__write, self.__upsert_many, entities, key
+        )
 
-        return self.__state[entity_id]
+    @measure_loop_blocking
+    async def get_one(
+        self,
+        entity_id: int,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        await self.__ensure_loaded()
+        if (entity := self.__snapshot.entities.get(entity_id)) is None:
+            return None
+        return project(entity, excluded_fields(self.__model, include, exclude))
 
+    @measure_loop_blocking
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        await self.__ensure_loaded()
+        state = self.__snapshot.entities
+        excluded = excluded_fields(self.__model, include, exclude)
+        with self.__lock:
+            found = [state[id] for id in entity_ids if id in state]
+        return [project(entity, excluded) for entity in found]
+
+    @measure_loop_blocking
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        await self.__ensure_loaded()
+        snapshot = self.__snapshot
+        with self.__lock:
+            ids = self.__filter(filter_dict, snapshot)
+            found = [snapshot.entities[id] for id in ids[skip : skip + limit]]
+
+        excluded = excluded_fields(self.__model, include, exclude)
+        return [project(entity, excluded) for entity in found]
+
+    @measure_loop_blocking
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        await self.__ensure_loaded()
+        snapshot = self.__snapshot
+        where = resolve(self.__model, query)
+        with self.__lock:
+            if (ids := snapshot.index.narrow(where)) is None:
+                entities = snapshot.entities.values()
+            else:
+                entities = [snapshot.entities[id] for id in ids]
+            found = find_in(self.__model, entities, query, where)
+
+        return page(found, query, excluded_fields(self.__model, include, exclude))
+
+    @measure_loop_blocking
+    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        return await self.__executor.run(
+            self.__write, self.__update_one, entity_id, entity
+        )
+
+    @measure_loop_blocking
     async def delete_one(self, entity_id: int) -> bool:
-        if entity_id not in self.__state:
-            return False
+        return await self.__executor.run(self.__write, self.__delete_one, entity_id)
 
-        del self.__state[entity_id]
-        self.__save()
+    @measure_loop_blocking
+    async def delete_many(
+        self, entity_ids: list[int], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        return await self.__executor.run(
+            self.__write, self.__delete_many, entity_ids, where
+        )
 
-        return True
+    async def flush(self) -> None:
+        """Persists pending write-behind mutations, if any."""
+        await self.__executor.run(self.__flush)
+
+    async def close(self) -> None:
+        if self.__flush_timer is not None:
+            self.__flush_timer.cancel()
+        await self.flush()
+        await self.__executor.run(self.__file_lock.close)
+        self.__executor.shutdown()
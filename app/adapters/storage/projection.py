@@ -0,0 +1,49 @@
+from functools import cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, create_model
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+
+def excluded_fields(
+    model: type[BaseModel], include: set[str] | None, exclude: set[str] | None
+) -> frozenset[str]:
+    """Resolves an include/exclude projection into the model fields to leave out."""
+    fields = set(model.model_fields)
+    excluded = set(exclude or ())
+    if include is not None:
+        excluded |= fields - set(include)
+    # The ID always identifies the projected entity
+    return frozenset(excluded & fields - {"id"})
+
+
+@cache
+def projection_model(model: type[TModel], excluded: frozenset[str]) -> type[TModel]:
+    """Subclass of the model whose excluded fields are optional and default to None."""
+    if not excluded:
+        return model
+
+    return create_model(  # type: ignore
+        f"{model.__name__}Projection",
+        __base__=model,
+        **{
+            field: (model.model_fields[field].annotation | None, None)
+            for field in sorted(excluded)
+        },
+    )
+
+
+def project(entity: TModel, excluded: frozenset[str]) -> TModel:
+    """Projects an already validated entity without copying or validating its values."""
+    if not excluded:
+        return entity
+
+    values: dict[str, Any] = {
+        field: getattr(entity, field)
+        for field in type(entity).model_fields
+        if field not in excluded
+    }
+    return projection_model(type(entity), excluded).model_construct(
+        _fields_set=entity.model_fields_set - excluded, **values
+    )
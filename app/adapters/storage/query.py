@@ -0,0 +1,182 @@
+import base64
+import binascii
+import json
+from collections.abc import Iterable
+from functools import cmp_to_key
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from app.domain.query import Condition, Page, Query, SortKey
+
+from .projection import project
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def field_type(model: type[BaseModel], field: str) -> Any:
+    if field in model.model_fields:
+        return model.model_fields[field].annotation
+    return model.model_computed_fields[field].return_type
+
+
+def queried_fields(query: Query) -> set[str]:
+    return {*query.where, *(key.field for key in query.sort)}
+
+
+def coerce(model: type[BaseModel], field: str, value: Any) -> Any:
+    """Validates a query value as the model field, so it compares like stored values."""
+    if value is None:
+        return None
+    return TypeAdapter(field_type(model, field)).validate_python(value)
+
+
+def resolve(model: type[BaseModel], query: Query) -> dict[str, Condition]:
+    """Checks the fields of the query and coerces its condition values."""
+    # Computed fields are stored too, so they can be queried like the others
+    fields = {*model.model_fields, *model.model_computed_fields}
+    unknown = queried_fields(query) - fields
+    if unknown:
+        raise ValueError(f"Unknown query fields: {', '.join(sorted(unknown))}")
+
+    return {
+        field: Condition(
+            eq=coerce(model, field, condition.eq),
+            in_=(
+                None
+                if condition.in_ is None
+                else [coerce(model, field, value) for value in condition.in_]
+            ),
+            **{op: coerce(model, field, getattr(condition, op)) for op in OPERATORS},
+        )
+        for field, condition in query.where.items()
+    }
+
+
+def to_param(value: Any) -> Any:
+    """Converts a coerced value to its JSON form, as stored by serializing storages."""
+    return to_jsonable_python(value)
+
+
+def matches(entity: BaseModel, where: dict[str, Condition]) -> bool:
+    for field, condition in where.items():
+        value = getattr(entity, field)
+        if condition.eq is not None and value != condition.eq:
+            return False
+        if condition.in_ is not None and value not in condition.in_:
+            return False
+        if any(getattr(condition, op) is not None for op in OPERATORS):
+            if value is None:
+                return False
+            if condition.gt is not None and not value > condition.gt:
+                return False
+            if condition.gte is not None and not value >= condition.gte:
+                return False
+            if condition.lt is not None and not value < condition.lt:
+                return False
+            if condition.lte is not None and not value <= condition.lte:
+                return False
+    return True
+
+
+def matching_entities(
+    model: type[TModel],
+    entities: Iterable[TModel],
+    where: dict[str, Condition] | None,
+) -> list[TModel]:
+    """Entities meeting the unresolved conditions of a conditional write, if any."""
+    if not where:
+        return list(entities)
+    resolved = resolve(model, Query(where=where))
+    return [entity for entity in entities if matches(entity, resolved)]
+
+
+def sort_values(entity: BaseModel, sort: list[SortKey]) -> tuple:
+    return (*(getattr(entity, key.field) for key in sort), getattr(entity, "id"))
+
+
+def compare(a: tuple, b: tuple, sort: list[SortKey]) -> int:
+    """Compares sort values in query order; None sorts first and IDs break ties."""
+    for index, (x, y) in enumerate(zip(a, b)):
+        if x == y:
+            continue
+        if x is None or y is None:
+            result = -1 if x is None else 1
+        else:
+            result = -1 if x < y else 1
+        if index < len(sort) and sort[index].descending:
+            result = -result
+        return result
+    return 0
+
+
+def encode_cursor(sort: list[SortKey], values: tuple) -> str:
+    cursor = {
+        "sort": [[key.field, key.descending] for key in sort],
+        "after": to_jsonable_python(list(values)),
+    }
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(model: type[BaseModel], query: Query) -> tuple | None:
+    """Returns the sort values the page starts after, or None for the first page."""
+    if query.cursor is None:
+        return None
+
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(query.cursor.encode()))
+        sort, after = cursor["sort"], cursor["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if sort != [[key.field, key.descending] for key in query.sort]:
+        raise ValueError("Cursor does not match the query sort")
+    fields = [*(key.field for key in query.sort), "id"]
+    if not isinstance(after, list) or len(after) != len(fields):
+        raise ValueError("Invalid cursor")
+    # Validation errors are value errors too
+    return tuple(coerce(model, field, value) for field, value in zip(fields, after))
+
+
+def page(items: list[TModel], query: Query, excluded: frozenset[str]) -> Page[TModel]:
+    """
+    Builds the page from up to ``limit + 1`` items, the extra one meaning more.
+
+    The items must hold the sort fields, which are projected out afterwards.
+    """
+    next_cursor = None
+    if len(items) > query.limit:
+        items = items[: query.limit]
+        next_cursor = encode_cursor(query.sort, sort_values(items[-1], query.sort))
+    return Page(
+        items=[project(item, excluded) for item in items], next_cursor=next_cursor
+    )
+
+
+def find_in(
+    model: type[TModel],
+    entities: Iterable[TModel],
+    query: Query,
+    where: dict[str, Condition],
+) -> list[TModel]:
+    """
+    Evaluates the query, with the conditions resolved, over entities in one pass.
+
+    Returns the matching entities of the page plus one, for ``page`` to tell
+    whether more follow.
+    """
+    after = decode_cursor(model, query)
+    key = cmp_to_key(lambda a, b: compare(a, b, query.sort))
+
+    found = []
+    for entity in entities:
+        if not matches(entity, where):
+            continue
+        values = sort_values(entity, query.sort)
+        if after is None or compare(values, after, query.sort) > 0:
+            found.append((key(values), entity))
+    found.sort(key=lambda item: item[0])
+    return [entity for _, entity in found[: query.limit + 1]]
@@ -0,0 +1,576 @@
+import bisect
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+from .hydration import hydrate, shallow_dump
+from .lru import LRUCache
+from .projection import excluded_fields, project
+from .query import (
+    decode_cursor,
+    find_in,
+    matching_entities,
+    page,
+    resolve,
+    to_param,
+)
+from .resp import Command, RespClient
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+T = TypeVar("T")
+
+# Keys fetched by each MGET of a pipelined batch read
+MGET_CHUNK = 500
+
+
+class WriteConflictError(Exception):
+    """Write that kept conflicting with those of other nodes."""
+
+
+class RemoteStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    Storage on a Redis-compatible server, shared by every node using it.
+
+    Entities are JSON strings under ``<namespace>:entity:<id>``, listed in the
+    ``<namespace>:ids`` set, and ``indexed_fields`` are indexed by sets of IDs per
+    value. Writes run in MULTI/EXEC transactions, then publish the written IDs on
+    ``<namespace>:invalidate``. Those based on a read WATCH what they read and
+    are retried when another node wrote it first, so concurrent updates merge and
+    concurrent upserts of a new key value create a single entity. Retries back off
+    with jitter and give up with a ``WriteConflictError`` after
+    ``max_write_attempts``. Each node keeps the entities it read in an LRU of
+    ``cache_max_entries``, from which those messages evict them, so entities are
+    read from the server once until another node writes them. Entities whose
+    message arrives while they are being read or written are not cached, as they
+    may already be stale. Batch reads fetch the missing entities with pipelined
+    MGETs in a single round trip, and unsorted queries stop reading once their
+    page is full.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        namespace: str = "entities",
+        indexed_fields: Sequence[str] = (),
+        cache_max_entries: int = 1024,
+        trusted_hydration: bool = False,
+        max_write_attempts: int = 8,
+        retry_backoff_seconds: float = 0.005,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__client = RespClient(host, port)
+        self.__namespace = namespace
+        self.__indexed_fields = tuple(indexed_fields)
+        self.__logger = logger
+        self.__max_write_attempts = max_write_attempts
+        self.__retry_backoff = retry_backoff_seconds
+        # Stored records were validated when written, so they may skip validation
+        self.__trusted = trusted_hydration
+        self.__executor = StorageExecutor(name=f"remote-storage-{namespace}")
+
+        # Shared by the executor and the invalidation listener threads
+        self.__cache: LRUCache[TModel] = LRUCache(cache_max_entries)
+        self.__cache_lock = threading.Lock()
+        self.cache_stats = self.__cache.stats
+        # IDs invalidated while each read or write is in flight, which it must not
+        # cache once done; None when every entity may have been
+        self.__in_flight: dict[int, set[int] | None] = {}
+        self.__in_flight_ids = itertools.count()
+        # Entities are only cached while invalidations are being received
+        self.__subscribed = threading.Event()
+        self.__listener: threading.Thread | None = None
+        self.__closed = threading.Event()
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @property
+    def __model(self) -> type[TModel]:
+        return self.__orig_class__.__args__[0]  # type: ignore
+
+    def __key(self, *parts: Any) -> str:
+        return ":".join([self.__namespace, *map(str, parts)])
+
+    def __index_key(self, field: str, value: Any) -> str:
+        return self.__key("index", field, json.dumps(to_param(value)))
+
+    async def __run(self, func: Callable[..., T], *args: Any) -> T:
+        return await self.__executor.run(self.__listening, func, *args)
+
+    def __listening(self, func: Callable[..., T], *args: Any) -> T:
+        if self.__listener is None:
+            self.__listener = threading.Thread(
+                target=self.__listen,
+                name=f"remote-storage-listener-{self.__namespace}",
+                daemon=True,
+            )
+            self.__listener.start()
+        return func(*args)
+
+    def __listen(self) -> None:
+        while not self.__closed.is_set():
+            try:
+                for message in self.__client.subscribe(
+                    self.__key("invalidate"), self.__subscribed.set
+                ):
+                    entity_ids = json.loads(message)
+                    with self.__cache_lock:
+                        for invalidated in self.__in_flight.values():
+                            if invalidated is not None:
+                                invalidated.update(entity_ids)
+                        for entity_id in entity_ids:
+                            self.__cache.discard(entity_id)
+            except OSError:
+                self.__logger.warning("Cannot subscribe to invalidations, retrying")
+            finally:
+                # Invalidations may have been missed while disconnected
+                self.__subscribed.clear()
+                with self.__cache_lock:
+                    self.__in_flight = dict.fromkeys(self.__in_flight)
+                    self.__cache.clear()
+            self.__closed.wait(1)
+
+    @contextmanager
+    def __tracking(self) -> Iterator[int]:
+        """Tracks the invalidations received until the entities are cached."""
+        with self.__cache_lock:
+            token = next(self.__in_flight_ids)
+            self.__in_flight[token] = set() if self.__subscribed.is_set() else None
+        try:
+            yield token
+        finally:
+            with self.__cache_lock:
+                del self.__in_flight[token]
+
+    def __cache_put(self, entities: Iterable[TModel], token: int) -> None:
+        # Entities another node wrote during the round trip may be stale
+        with self.__cache_lock:
+            if (invalidated := self.__in_flight[token]) is None:
+                return
+            for entity in entities:
+                if entity.id not in invalidated:
+                    self.__cache.put(entity.id, entity, 1)
+
+    def __fetch(self, entity_ids: list[int]) -> dict[int, TModel]:
+        """Reads entities from the server in one round trip."""
+        chunks = [
+            entity_ids[start : start + MGET_CHUNK]
+            for start in range(0, len(entity_ids), MGET_CHUNK)
+        ]
+        with self.__tracking() as token:
+            replies = self.__client.pipeline(
+                [
+                    ("MGET", *(self.__key("entity", id) for id in chunk))
+                    for chunk in chunks
+                ]
+            )
+            found = {
+                entity_id: hydrate(
+                    self.__model,
+                    {**json.loads(data), "id": entity_id},
+                    trusted=self.__trusted,
+                )
+                for chunk, values in zip(chunks, replies)
+                for entity_id, data in zip(chunk, values)
+                if data is not None
+            }
+            self.__cache_put(found.values(), token)
+        return found
+
+    def __load(self, entity_ids: Iterable[int]) -> dict[int, TModel]:
+        found: dict[int, TModel] = {}
+        with self.__cache_lock:
+            for entity_id in entity_ids:
+                if (entity := self.__cache.get(entity_id)) is not None:
+                    found[entity_id] = entity
+        if missing := [id for id in dict.fromkeys(entity_ids) if id not in found]:
+            found.update(self.__fetch(missing))
+        return found
+
+    def __all_ids(self) -> list[int]:
+        return sorted(map(int, self.__client.execute("SMEMBERS", self.__key("ids"))))
+
+    def __lookup(self, lookups: list[tuple[str, list[Any]]]) -> list[set[int]]:
+        """IDs of the entities with each indexed field equal to any of the values."""
+        commands = [
+            ("SMEMBERS", self.__index_key(field, value))
+            for field, values in lookups
+            for value in values
+        ]
+        replies = iter(self.__client.pipeline(commands))
+        return [
+            {int(id) for _ in values for id in next(replies)} for _, values in lookups
+        ]
+
+    def __find_by(self, key: str, value: Any) -> TModel | None:
+        if key in self.__indexed_fields:
+            (ids,) = self.__lookup([(key, [value])])
+            return self.__fetch([min(ids)]).get(min(ids)) if ids else None
+
+        return next(
+            (
+                entity
+                for entity in self.__fetch(self.__all_ids()).values()
+                if getattr(entity, key, None) == value
+            ),
+            None,
+        )
+
+    def __index_changes(
+        self, entity_id: int, old: TModel | None, new: TModel | None
+    ) -> list[Command]:
+        commands: list[Command] = []
+        for field in self.__indexed_fields:
+            old_value = getattr(old, field, None) if old is not None else None
+            new_value = getattr(new, field, None) if new is not None else None
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                commands.append(("SREM", self.__index_key(field, old_value), entity_id))
+            if new_value is not None:
+                commands.append(("SADD", self.__index_key(field, new_value), entity_id))
+        return commands
+
+    def __publish(self, entity_ids: list[int]) -> None:
+        self.__client.execute(
+            "PUBLISH", self.__key("invalidate"), json.dumps(entity_ids)
+        )
+
+    def __put_many(
+        self,
+        changes: list[tuple[TModel | None, TModel]],
+        claims: Sequence[Command] = (),
+    ) -> list[TModel] | None:
+        """
+        Writes the new entities, given with their stored version, in one transaction.
+
+        Returns None, having written nothing, when a watched key was written since.
+        """
+        commands: list[Command] = [*claims]
+        for old, new in changes:
+            data = json.dumps(new.model_dump(mode="json", exclude={"id"}))
+            commands += [
+                ("SET", self.__key("entity", new.id), data),
+                ("SADD", self.__key("ids"), new.id),
+                *self.__index_changes(new.id, old, new),  # type: ignore
+            ]
+        with self.__tracking() as token:
+            if self.__client.transaction(commands) is None:
+                return None
+
+            written = [new for _, new in changes]
+            self.__publish([entity.id for entity in written])  # type: ignore
+            self.__cache_put(written, token)
+        return written
+
+    def __retry(self, write: Callable[..., T | None], *args: Any) -> T:
+        """Runs a write until no other node wrote what it read meanwhile."""
+        for attempt in range(self.__max_write_attempts):
+            if attempt:
+                # Full jitter, so that conflicting nodes do not retry in lockstep
+                time.sleep(random.uniform(0, self.__retry_backoff * 2**attempt))
+            if (result := write(*args)) is not None:
+                return result
+            self.__logger.debug("Write conflicted with another node, retrying")
+        raise WriteConflictError(
+            f"Write still conflicted after {self.__max_write_attempts} attempts"
+        )
+
+    def __new_ids(self, count: int) -> list[int]:
+        last = self.__client.execute("INCRBY", self.__key("next_id"), count)
+        return list(range(last - count + 1, last + 1))
+
+    def __create_many(self, entities: list[TCreate]) -> list[TModel]:
+        ids = self.__new_ids(len(entities))
+        # Nothing is watched, so the transaction always runs
+        return self.__put_many(  # type: ignore
+            [
+                (None, self.__model(**shallow_dump(entity), id=entity_id))
+                for entity, entity_id in zip(entities, ids)
+            ]
+        )
+
+    def __create_one(self, entity: TCreate) -> TModel:
+        return self.__create_many([entity])[0]
+
+    def __claim_key(self, key: str, value: Any) -> str:
+        return self.__key("unique", key, json.dumps(to_param(value)))
+
+    def __try_upsert_many(
+        self, entities: list[TCreate], key: str
+    ) -> list[TModel] | None:
+        new_entities = [self.__model(**shallow_dump(entity)) for entity in entities]
+        # Upserts write the claims of their key values along with the entities, so
+        # one that found no entity fails if another node created it meanwhile
+        claims = {}
+        if key in self.__indexed_fields:
+            claims = {
+                value: self.__claim_key(key, value)
+                for value in (getattr(entity, key) for entity in new_entities)
+            }
+
+        with self.__client.watch(*claims.values()):
+            batch: dict[Any, TModel] = {}
+            changes: list[tuple[TModel | None, TModel]] = []
+            for new_entity in new_entities:
+                value = getattr(new_entity, key)
+                existing = batch.get(value) or self.__find_by(key, value)
+
+                if existing is None:
+                    (new_id,) = self.__new_ids(1)
+                    new_entity = new_entity.model_copy(update={"id": new_id})
+                else:
+                    new_entity = new_entity.model_copy(
+                        update={
+                            "id": existing.id,
+                            "created_at": existing.created_at,
+                            "updated_at": datetime.now(),
+                        }
+                    )
+                batch[value] = new_entity
+                changes.append((existing, new_entity))
+
+            # Entities upserted twice in the batch are written once, as last given,
+            # with their index changed from the version stored before the batch
+            written: dict[int, tuple[TModel | None, TModel]] = {}
+            for old, new in changes:
+                stored = written[new.id][0] if new.id in written else old
+                written[new.id] = (stored, new)  # type: ignore
+            claim_commands: list[Command] = [
+                ("SET", claims[value], entity.id)  # type: ignore
+                for value, entity in batch.items()
+                if value in claims
+            ]
+            if self.__put_many(list(written.values()), claim_commands) is None:
+                return None
+        return [new for _, new in changes]
+
+    def __upsert_many(self, entities: list[TCreate], key: str) -> list[TModel]:
+        return self.__retry(self.__try_upsert_many, entities, key)
+
+    def __upsert_one(self, entity: TCreate, key: str) -> TModel:
+        return self.__upsert_many([entity], key)[0]
+
+    def __get_many_by_ids(
+        self, entity_ids: list[int], excluded: frozenset[str]
+    ) -> list[TModel]:
+        found = self.__load(entity_ids)
+        return [project(found[id], excluded) for id in entity_ids if id in found]
+
+    def __get_many(
+        self,
+        filter_dict: TFilter | None,
+        skip: int,
+        limit: int,
+        excluded: frozenset[str],
+    ) -> list[TModel]:
+        if not filter_dict:
+            ids = self.__all_ids()
+        else:
+            lookups, scanned = [], []
+            for field, value in filter_dict.model_dump().items():
+                if isinstance(value, str):
+                    value = [value]
+                elif not isinstance(value, list):
+                    continue
+                if field in self.__indexed_fields:
+                    lookups.append((field, value))
+                else:
+                    scanned.append((field, value))
+
+            matched = set().union(*self.__lookup(lookups))
+            if scanned:
+                matched |= {
+                    entity.id
+                    for entity in self.__load(self.__all_ids()).values()
+                    if any(getattr(entity, f, None) in v for f, v in scanned)
+                }
+            ids = sorted(matched)  # type: ignore
+
+        page_ids = ids[skip : skip + limit]
+        return self.__get_many_by_ids(page_ids, excluded)
+
+    def __find(self, query: Query, excluded: frozenset[str]) -> Page[TModel]:
+        where = resolve(self.__model, query)
+        lookups = [
+            (field, [condition.eq] if condition.eq is not None else condition.in_)
+            for field, condition in where.items()
+            if field in self.__indexed_fields
+            and (condition.eq is not None or condition.in_ is not None)
+        ]
+        if lookups:
+            ids = sorted(set.intersection(*self.__lookup(lookups)))  # type: ignore
+        else:
+            ids = self.__all_ids()
+        if not query.sort and (after := decode_cursor(self.__model, query)):
+            ids = ids[bisect.bisect_right(ids, after[0]) :]
+
+        # Entities are loaded a chunk at a time, keeping only the best page so far.
+        # Unsorted pages are in ID order, so loading stops once the page is full.
+        items: list[TModel] = []
+        for start in range(0, len(ids), MGET_CHUNK):
+            found = self.__load(ids[start : start + MGET_CHUNK])
+            items = find_in(self.__model, [*items, *found.values()], query, where)
+            if not query.sort and len(items) > query.limit:
+                break
+        return page(items, query, excluded)
+
+    def __try_update_one(self, entity_id: int, entity: TUpdate) -> list[TModel] | None:
+        with self.__client.watch(self.__key("entity", entity_id)):
+            # Read from the server, as the cached one may be another node's past
+            if (current := self.__fetch([entity_id]).get(entity_id)) is None:
+                return []
+
+            updated = self.__model.model_validate(
+                {
+                    **shallow_dump(current),
+                    **shallow_dump(entity, exclude_unset=True),
+                }
+            )
+            return self.__put_many([(current, updated)])
+
+    def __update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        # Retried until no other node wrote the entity between the read and write
+        updated = self.__retry(self.__try_update_one, entity_id, entity)
+        return updated[0] if updated else None
+
+    def __delete_many(
+        self, entity_ids: list[int], where: dict[str, Condition] | None = None
+    ) -> int:
+        ids = list(dict.fromkeys(entity_ids))
+        # Retried as well, since the index entries removed are those of the version read
+        return self.__retry(self.__try_delete_many, ids, where)
+
+    def __try_delete_many(
+        self, entity_ids: list[int], where: dict[str, Condition] | None
+    ) -> int | None:
+        with self.__client.watch(*(self.__key("entity", id) for id in entity_ids)):
+            current = self.__fetch(entity_ids).values()
+            if not (existing := matching_entities(self.__model, current, where)):
+                return 0
+
+            commands: list[Command] = []
+            for entity in existing:
+                commands += [
+                    ("DEL", self.__key("entity", entity.id)),
+                    ("SREM", self.__key("ids"), entity.id),
+                    *self.__index_changes(entity.id, entity, None),  # type: ignore
+                    *(
+                        ("DEL", self.__claim_key(field, getattr(entity, field)))
+                        for field in self.__indexed_fields
+                    ),
+                ]
+            if self.__client.transaction(commands) is None:
+                return None
+
+        deleted = [entity.id for entity in existing]
+        with self.__cache_lock:
+            for entity_id in deleted:
+                self.__cache.discard(entity_id)
+        self.__publish(deleted)  # type: ignore
+        return len(deleted)
+
+    def __delete_one(self, entity_id: int) -> bool:
+        return self.__delete_many([entity_id]) > 0
+
+    @measure_loop_blocking
+    async def create_one(self, entity: TCreate) -> TModel:
+        return await self.__run(self.__create_one, entity)
+
+    @measure_loop_blocking
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        return await self.__run(self.__upsert_one, entity, key)
+
+    @measure_loop_blocking
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return await self.__run(self.__create_many, entities)
+
+    @measure_loop_blocking
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        return await self.__run(self.__upsert_many, entities, key)
+
+    @measure_loop_blocking
+    async def get_one(
+        self,
+        entity_id: int,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        excluded = excluded_fields(self.__model, include, exclude)
+        found = await self.__run(self.__get_many_by_ids, [entity_id], excluded)
+        return found[0] if found else None
+
+    @measure_loop_blocking
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many_by_ids, entity_ids, excluded)
+
+    @measure_loop_blocking
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many, filter_dict, skip, limit, excluded)
+
+    @measure_loop_blocking
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__find, query, excluded)
+
+    @measure_loop_blocking
+    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        return await self.__run(self.__update_one, entity_id, entity)
+
+    @measure_loop_blocking
+    async def delete_one(self, entity_id: int) -> bool:
+        return await self.__run(self.__delete_one, entity_id)
+
+    @measure_loop_blocking
+    async def delete_many(
+        self, entity_ids: list[int], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        return await self.__run(self.__delete_many, entity_ids, where)
+
+    async def close(self) -> None:
+        self.__closed.set()
+        await self.__executor.run(self.__client.close)
+        self.__executor.shutdown()
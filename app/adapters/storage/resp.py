@@ -0,0 +1,217 @@
+import socket
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, BinaryIO
+
+CRLF = b"\r\n"
+
+Command = Sequence[str | bytes | int]
+
+
+class RespError(Exception):
+    """Error reply of the server."""
+
+
+def encode_command(command: Command) -> bytes:
+    """Encodes a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(command)]
+    for arg in command:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(file: BinaryIO) -> Any:
+    """
+    Reads one RESP reply.
+
+    Error replies are returned as ``RespError`` instances rather than raised, so
+    that a failed command does not hide the replies pipelined after it.
+    """
+    line = file.readline()
+    if not line.endswith(CRLF):
+        raise ConnectionError("Connection closed by the server")
+
+    kind, value = line[:1], line[1:-2]
+    if kind == b"+":
+        return value.decode()
+    if kind == b"-":
+        return RespError(value.decode())
+    if kind == b":":
+        return int(value)
+    if kind == b"$":
+        if (length := int(value)) < 0:
+            return None
+        data = file.read(length + 2)
+        if len(data) < length + 2:
+            raise ConnectionError("Connection closed by the server")
+        return data[:-2]
+    if kind == b"*":
+        if (length := int(value)) < 0:
+            return None
+        return [read_reply(file) for _ in range(length)]
+    raise ConnectionError(f"Invalid reply: {line!r}")
+
+
+def _raise_errors(reply: Any) -> Any:
+    if isinstance(reply, RespError):
+        raise reply
+    if isinstance(reply, list):
+        for item in reply:
+            _raise_errors(item)
+    return reply
+
+
+class RespClient:
+    """
+    Blocking client of a Redis-compatible server.
+
+    Commands sent together with ``pipeline`` cost a single round trip. The
+    connection is opened on first use and reopened once if it was dropped.
+    """
+
+    def __init__(self, host: str, port: int, *, timeout: float = 5.0) -> None:
+        self.__address = (host, port)
+        self.__timeout = timeout
+        self.__socket: socket.socket | None = None
+        self.__file: BinaryIO | None = None
+        # Keys are watched until the next transaction, on this connection only
+        self.__watching = False
+        self.__lock = threading.Lock()
+        self.__subscribers: set[RespClient] = set()
+
+    def __connect(self) -> BinaryIO:
+        if self.__file is None:
+            self.__socket = socket.create_connection(
+                self.__address, timeout=self.__timeout
+            )
+            self.__socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__file = self.__socket.makefile("rwb")
+        return self.__file
+
+    def __disconnect(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__socket.close()  # type: ignore
+            self.__file = self.__socket = None
+        self.__watching = False
+
+    def __send(self, data: bytes) -> BinaryIO:
+        file = self.__connect()
+        file.write(data)
+        file.flush()
+        return file
+
+    def pipeline(self, commands: Sequence[Command]) -> list[Any]:
+        """Sends the commands at once and returns their replies, in order."""
+        if not commands:
+            return []
+
+        data = b"".join(encode_command(command) for command in commands)
+        with self.__lock:
+            try:
+                file = self.__send(data)
+            except OSError:
+                # The server may have closed an idle connection; nothing was run,
+                # but keys watched on it would be lost by reconnecting
+                watching = self.__watching
+                self.__disconnect()
+                if watching:
+                    raise
+                file = self.__send(data)
+            try:
+                replies = [read_reply(file) for _ in commands]
+            except OSError:
+                # Replies may be missing, so the connection cannot be reused
+                self.__disconnect()
+                raise
+        return [_raise_errors(reply) for reply in replies]
+
+    def execute(self, *command: str | bytes | int) -> Any:
+        return self.pipeline([command])[0]
+
+    @contextmanager
+    def watch(self, *keys: str) -> Iterator[None]:
+        """
+        Watches the keys until the next ``transaction``, which then runs only if
+        none of them was written meanwhile.
+
+        The keys are unwatched on exit when no transaction ran. Watched keys
+        belong to the connection, so the client must not be used by other
+        threads in the meantime.
+        """
+        if not keys:
+            yield
+            return
+
+        self.execute("WATCH", *keys)
+        self.__watching = True
+        try:
+            yield
+        finally:
+            if self.__watching:
+                self.execute("UNWATCH")
+                self.__watching = False
+
+    def transaction(self, commands: Sequence[Command]) -> list[Any] | None:
+        """
+        Runs the commands atomically with MULTI/EXEC in a single round trip.
+
+        Returns None, having run none of them, when a key watched with ``watch``
+        was written since.
+        """
+        try:
+            return self.pipeline([("MULTI",), *commands, ("EXEC",)])[-1]
+        finally:
+            self.__watching = False
+
+    def subscribe(
+        self, channel: str, on_subscribed: Callable[[], None] | None = None
+    ) -> Iterator[bytes]:
+        """
+        Yields the messages published on a channel, on a connection of its own.
+
+        ``on_subscribed`` is called once messages are being received. The
+        iteration ends when the connection is lost or ``close`` is called.
+        """
+        subscriber = RespClient(*self.__address, timeout=self.__timeout)
+        with self.__lock:
+            self.__subscribers.add(subscriber)
+        try:
+            with subscriber.__lock:
+                file = subscriber.__connect()
+                subscriber.__socket.settimeout(None)  # type: ignore
+                file.write(encode_command(("SUBSCRIBE", channel)))
+                file.flush()
+                read_reply(file)
+            if on_subscribed is not None:
+                on_subscribed()
+            while True:
+                kind, _, data = read_reply(file)
+                if kind == b"message":
+                    yield data
+        except (OSError, ValueError):
+            return
+        finally:
+            with self.__lock:
+                self.__subscribers.discard(subscriber)
+            subscriber.close()
+
+    def close(self) -> None:
+        with self.__lock:
+            subscribers = list(self.__subscribers)
+            self.__disconnect()
+        for subscriber in subscribers:
+            subscriber.__shutdown()
+
+    def __shutdown(self) -> None:
+        # Unblocks a reader waiting on the socket from another thread
+        if (sock := self.__socket) is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+import struct
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.domain.ports import SnapshotPort
+
+from .codec import Codec
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+
+# File header: magic and format version
+MAGIC = b"RSNP\x01"
+# Batch frame: payload length and CRC32 of the payload
+HEADER = struct.Struct(">II")
+
+
+class SnapshotFile(SnapshotPort):
+    """
+    Snapshot kept in a single file of checksummed batch frames.
+
+    Each batch is encoded and compressed by the ``Codec`` on its own, so writing
+    and reading only hold one batch in memory. Writes go to a temporary file that
+    is synced and then renamed over the snapshot, which is therefore always
+    complete; a frame failing its checksum ends the reading.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        codec: Codec | None = None,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__codec = codec or Codec()
+        self.__logger = logger
+        self.__executor = StorageExecutor(name=f"snapshot-{path.name}")
+        # Writes share the temporary file
+        self.__write_lock = asyncio.Lock()
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @property
+    def __temp_path(self) -> Path:
+        return self.__path.with_name(self.__path.name + ".tmp")
+
+    def __create(self) -> BinaryIO:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        file = self.__temp_path.open("wb")
+        file.write(MAGIC)
+        return file
+
+    def __write_batch(self, file: BinaryIO, batch: list[dict[str, Any]]) -> None:
+        payload = self.__codec.encode(batch)
+        file.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+
+    def __commit(self, file: BinaryIO) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(self.__temp_path, self.__path)
+
+    def __discard(self, file: BinaryIO) -> None:
+        file.close()
+        self.__temp_path.unlink(missing_ok=True)
+
+    def __open(self) -> BinaryIO | None:
+        try:
+            file = self.__path.open("rb")
+        except FileNotFoundError:
+            return None
+
+        if file.read(len(MAGIC)) != MAGIC:
+            file.close()
+            self.__logger.warning(f"Ignoring {self.__path}: not a snapshot")
+            return None
+        return file
+
+    def __read_batch(self, file: BinaryIO) -> list[dict[str, Any]] | None:
+        offset = file.tell()
+        if not (header := file.read(HEADER.size)):
+            return None
+
+        if len(header) == HEADER.size:
+            length, checksum = HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) == length and zlib.crc32(payload) == checksum:
+                return self.__codec.decode(payload)
+
+        self.__logger.warning(
+            f"Stopping at corrupted batch at offset {offset} of {self.__path}"
+        )
+        return None
+
+    @measure_loop_blocking
+    async def write(self, batches: AsyncIterable[list[dict[str, Any]]]) -> int:
+        async with self.__write_lock:
+            file = await self.__executor.run(self.__create)
+            written = 0
+            try:
+                async for batch in batches:
+                    await self.__executor.run(self.__write_batch, file, batch)
+                    written += len(batch)
+                await self.__executor.run(self.__commit, file)
+            except BaseException:
+                await self.__executor.run(self.__discard, file)
+                raise
+            return written
+
+    async def read(self) -> AsyncIterator[list[dict[str, Any]]]:
+        if (file := await self.__executor.run(self.__open)) is None:
+            return
+
+        try:
+            while (
+                batch := await self.__executor.run(self.__read_batch, file)
+            ) is not None:
+                yield batch
+        finally:
+            await self.__executor.run(file.close)
+
+    async def close(self) -> None:
+        self.__executor.shutdown()
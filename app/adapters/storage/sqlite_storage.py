@@ -0,0 +1,470 @@
+import json
+import logging
+import sqlite3
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+from .hydration import hydrate, shallow_dump
+from .projection import excluded_fields, projection_model
+from .query import decode_cursor, page, resolve, to_param
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+T = TypeVar("T")
+
+# Stays well under the bound parameters limit of older SQLite builds
+MAX_PARAMS = 900
+
+COMPARISONS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class SqliteStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    SQLite storage in WAL mode, one row per entity.
+
+    Entities are stored as JSON in the ``data`` column. Fields used by ``indexes``
+    are also copied into their own indexed columns, so filters on them are index
+    lookups and writes only touch the row that changed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        table: str = "entities",
+        indexes: Sequence[Sequence[str]] = (),
+        trusted_hydration: bool = False,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__table = table
+        self.__indexes = [tuple(index) for index in indexes]
+        self.__columns = list(dict.fromkeys(f for index in indexes for f in index))
+        self.__logger = logger
+        # Stored records were validated when written, so they may skip validation
+        self.__trusted = trusted_hydration
+        # Connected lazily; every use happens on the executor thread
+        self.__connection: sqlite3.Connection = None  # type: ignore
+        self.__executor = StorageExecutor(name=f"sqlite-storage-{path.name}")
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @property
+    def __model(self) -> type[TModel]:
+        return self.__orig_class__.__args__[0]  # type: ignore
+
+    async def __run(self, func: Callable[..., T], *args: Any) -> T:
+        return await self.__executor.run(self.__connected, func, *args)
+
+    def __connected(self, func: Callable[..., T], *args: Any) -> T:
+        if self.__connection is None:
+            self.__connection = self.__connect()
+        return func(*args)
+
+    def __connect(self) -> sqlite3.Connection:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.__path, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        with connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.__table}" ('
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+            )
+            existing_columns = {
+                row["name"]
+                for row in connection.execute(f'PRAGMA table_info("{self.__table}")')
+            }
+            for column in self.__columns:
+                if column not in existing_columns:
+                    connection.execute(
+                        f'ALTER TABLE "{self.__table}" ADD COLUMN "{column}"'
+                    )
+            for index in self.__indexes:
+                name = f"ix_{self.__table}_{'_'.join(index)}"
+                columns = ", ".join(f'"{column}"' for column in index)
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{name}" '
+                    f'ON "{self.__table}" ({columns})'
+                )
+        return connection
+
+    def __column(self, field: str) -> tuple[str, list[Any]]:
+        if field == "id" or field in self.__columns:
+            return f'"{field}"', []
+        return "json_extract(data, ?)", [f"$.{field}"]
+
+    def __where(self, filter_dict: TFilter) -> tuple[str, list[Any]] | None:
+        predicates, params = [], []
+        for filter_key, filter_value in filter_dict.model_dump().items():
+            column, column_params = self.__column(filter_key)
+
+            if isinstance(filter_value, str):
+                predicates.append(f"{column} = ?")
+                params.extend([*column_params, filter_value])
+            elif isinstance(filter_value, list):
+                placeholders = ", ".join("?" * len(filter_value))
+                predicates.append(f"{column} IN ({placeholders})")
+                params.extend([*column_params, *filter_value])
+
+        if not predicates:
+            return None
+        return " OR ".join(predicates), params
+
+    def __conditions(self, where: dict[str, Condition]) -> tuple[str, list[Any]]:
+        predicates, params = [], []
+        for field, condition in where.items():
+            column, column_params = self.__column(field)
+            if condition.eq is not None:
+                predicates.append(f"{column} = ?")
+                params.extend([*column_params, to_param(condition.eq)])
+            if condition.in_ is not None:
+                placeholders = ", ".join("?" * len(condition.in_))
+                predicates.append(f"{column} IN ({placeholders})")
+                params.extend([*column_params, *map(to_param, condition.in_)])
+            for op, operator in COMPARISONS.items():
+                if (value := getattr(condition, op)) is not None:
+                    predicates.append(f"{column} {operator} ?")
+                    params.extend([*column_params, to_param(value)])
+        return " AND ".join(predicates) or "1", params
+
+    def __after(
+        self, keys: list[tuple[str, list[Any], bool]], after: tuple
+    ) -> tuple[str, list[Any]]:
+        """Keyset predicate for the rows sorted after the cursor values."""
+        clauses, params = [], []
+        for index, ((column, column_params, descending), value) in enumerate(
+            zip(keys, after)
+        ):
+            # NULLs sort first, so nothing follows them in descending order
+            if descending and value is None:
+                continue
+
+            parts, part_params = [], []
+            for (previous, previous_params, _), previous_value in zip(
+                keys[:index], after
+            ):
+                if previous_value is None:
+                    parts.append(f"{previous} IS NULL")
+                    part_params.extend(previous_params)
+                else:
+                    parts.append(f"{previous} = ?")
+                    part_params.extend([*previous_params, to_param(previous_value)])
+
+            if value is None:
+                parts.append(f"{column} IS NOT NULL")
+                part_params.extend(column_params)
+            elif descending:
+                parts.append(f"({column} < ? OR {column} IS NULL)")
+                part_params.extend([*column_params, to_param(value), *column_params])
+            else:
+                parts.append(f"{column} > ?")
+                part_params.extend([*column_params, to_param(value)])
+
+            clauses.append(f"({' AND '.join(parts)})")
+            params.extend(part_params)
+        return " OR ".join(clauses) or "0", params
+
+    def __to_row(self, entity: TModel) -> dict[str, Any]:
+        data = entity.model_dump(mode="json", exclude={"id"})
+        return {
+            **{column: data.get(column) for column in self.__columns},
+            "data": json.dumps(data),
+        }
+
+    @staticmethod
+    def __data(excluded: frozenset[str]) -> tuple[str, list[Any]]:
+        # Excluded fields are dropped by SQLite and never reach Python
+        if not excluded:
+            return "data", []
+        paths = [f"$.{field}" for field in sorted(excluded)]
+        return f"json_remove(data, {', '.join('?' * len(paths))})", paths
+
+    def __from_row(
+        self, row: sqlite3.Row, excluded: frozenset[str] = frozenset()
+    ) -> TModel:
+        return hydrate(
+            projection_model(self.__model, excluded),
+            {**json.loads(row["data"]), "id": row["id"]},
+            trusted=self.__trusted,
+        )
+
+    def __insert(self, entity: TModel) -> TModel:
+        row = self.__to_row(entity)
+        columns = ", ".join(f'"{column}"' for column in row)
+        placeholders = ", ".join("?" * len(row))
+        cursor = self.__connection.execute(
+            f'INSERT INTO "{self.__table}" ({columns}) VALUES ({placeholders})',
+            list(row.values()),
+        )
+        return entity.model_copy(update={"id": cursor.lastrowid})
+
+    def __replace(self, entity: TModel) -> TModel:
+        row = self.__to_row(entity)
+        assignments = ", ".join(f'"{column}" = ?' for column in row)
+        self.__connection.execute(
+            f'UPDATE "{self.__table}" SET {assignments} WHERE id = ?',
+            [*row.values(), entity.id],
+        )
+        return entity
+
+    def __select_one(
+        self, where: str, params: list[Any], excluded: frozenset[str] = frozenset()
+    ) -> TModel | None:
+        data, data_params = self.__data(excluded)
+        row = self.__connection.execute(
+            f'SELECT id, {data} AS data FROM "{self.__table}" WHERE {where} LIMIT 1',
+            [*data_params, *params],
+        ).fetchone()
+        return self.__from_row(row, excluded) if row else None
+
+    def __upsert(self, entity: TCreate, key: str) -> TModel:
+        new_entity = self.__model(**shallow_dump(entity))
+        column, params = self.__column(key)
+
+        existing = self.__select_one(
+            f"{column} = ?", [*params, getattr(new_entity, key)]
+        )
+        if existing is None:
+            return self.__insert(new_entity)
+
+        return self.__replace(
+            new_entity.model_copy(
+                update={
+                    "id": existing.id,
+                    "created_at": existing.created_at,
+                    "updated_at": datetime.now(),
+                }
+            )
+        )
+
+    def __create_one(self, entity: TCreate) -> TModel:
+        return self.__create_many([entity])[0]
+
+    def __create_many(self, entities: list[TCreate]) -> list[TModel]:
+        with self.__connection:
+            return [
+                self.__insert(self.__model(**shallow_dump(entity)))
+                for entity in entities
+            ]
+
+    def __upsert_one(self, entity: TCreate, key: str) -> TModel:
+        return self.__upsert_many([entity], key)[0]
+
+    def __upsert_many(self, entities: list[TCreate], key: str) -> list[TModel]:
+        with self.__connection:
+            return [self.__upsert(entity, key) for entity in entities]
+
+    def __get_one(self, entity_id: int, excluded: frozenset[str]) -> TModel | None:
+        return self.__select_one("id = ?", [entity_id], excluded)
+
+    def __get_many_by_ids(
+        self, entity_ids: list[int], excluded: frozenset[str]
+    ) -> list[TModel]:
+        if not entity_ids:
+            return []
+
+        data, data_params = self.__data(excluded)
+        ids = list(dict.fromkeys(entity_ids))
+        # The projection binds parameters too, so they count against the limit
+        chunk_size = MAX_PARAMS - len(data_params)
+        found: dict[int, TModel] = {}
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.__connection.execute(
+                f'SELECT id, {data} AS data FROM "{self.__table}" '
+                f"WHERE id IN ({placeholders})",
+                [*data_params, *chunk],
+            ).fetchall()
+            found.update((row["id"], self.__from_row(row, excluded)) for row in rows)
+        return [found[id] for id in entity_ids if id in found]
+
+    def __get_many(
+        self,
+        filter_dict: TFilter | None,
+        skip: int,
+        limit: int,
+        excluded: frozenset[str],
+    ) -> list[TModel]:
+        where, params = "1", []
+        if filter_dict:
+            if (clause := self.__where(filter_dict)) is None:
+                return []
+            where, params = clause
+
+        data, data_params = self.__data(excluded)
+        rows = self.__connection.execute(
+            f'SELECT id, {data} AS data FROM "{self.__table}" WHERE {where} '
+            "ORDER BY id LIMIT ? OFFSET ?",
+            [*data_params, *params, limit, skip],
+        ).fetchall()
+        return [self.__from_row(row, excluded) for row in rows]
+
+    def __find(self, query: Query, excluded: frozenset[str]) -> Page[TModel]:
+        where, params = self.__conditions(resolve(self.__model, query))
+        keys = [(*self.__column(key.field), key.descending) for key in query.sort] + [
+            ("id", [], False)
+        ]
+
+        if (after := decode_cursor(self.__model, query)) is not None:
+            after_where, after_params = self.__after(keys, after)
+            where, params = f"({where}) AND ({after_where})", [*params, *after_params]
+
+        order = ", ".join(
+            f"{column} {'DESC' if descending else 'ASC'}"
+            for column, _, descending in keys
+        )
+        order_params = [
+            param for _, column_params, _ in keys for param in column_params
+        ]
+
+        # Sort fields are read for the next cursor and projected out afterwards;
+        # computed fields depend on others, so sorting on them reads every field
+        sorted_fields = {key.field for key in query.sort}
+        read = (
+            excluded - sorted_fields
+            if sorted_fields <= set(self.__model.model_fields)
+            else frozenset()
+        )
+        data, data_params = self.__data(read)
+        rows = self.__connection.execute(
+            f'SELECT id, {data} AS data FROM "{self.__table}" WHERE {where} '
+            f"ORDER BY {order} LIMIT ?",
+            [*data_params, *params, *order_params, query.limit + 1],
+        ).fetchall()
+        return page([self.__from_row(row, read) for row in rows], query, excluded)
+
+    def __update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        with self.__connection:
+            if (current := self.__select_one("id = ?", [entity_id])) is None:
+                return None
+
+            return self.__replace(
+                self.__model.model_validate(
+                    {
+                        **shallow_dump(current),
+                        **shallow_dump(entity, exclude_unset=True),
+                    }
+                )
+            )
+
+    def __delete_one(self, entity_id: int) -> bool:
+        return self.__delete_many([entity_id]) > 0
+
+    def __delete_many(
+        self, entity_ids: list[int], where: dict[str, Condition] | None = None
+    ) -> int:
+        ids = list(dict.fromkeys(entity_ids))
+        conditions, params = self.__conditions(
+            resolve(self.__model, Query(where=where or {}))
+        )
+        chunk_size = MAX_PARAMS - len(params)
+        deleted = 0
+        with self.__connection:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start : start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = self.__connection.execute(
+                    f'DELETE FROM "{self.__table}" '
+                    f"WHERE id IN ({placeholders}) AND ({conditions})",
+                    [*chunk, *params],
+                )
+                deleted += cursor.rowcount
+        return deleted
+
+    @measure_loop_blocking
+    async def create_one(self, entity: TCreate) -> TModel:
+        return await self.__run(self.__create_one, entity)
+
+    @measure_loop_blocking
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        return await self.__run(self.__upsert_one, entity, key)
+
+    @measure_loop_blocking
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return await self.__run(self.__create_many, entities)
+
+    @measure_loop_blocking
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        return await self.__run(self.__upsert_many, entities, key)
+
+    @measure_loop_blocking
+    async def get_one(
+        self,
+        entity_id: int,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_one, entity_id, excluded)
+
+    @measure_loop_blocking
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many_by_ids, entity_ids, excluded)
+
+    @measure_loop_blocking
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many, filter_dict, skip, limit, excluded)
+
+    @measure_loop_blocking
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__find, query, excluded)
+
+    @measure_loop_blocking
+    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        return await self.__run(self.__update_one, entity_id, entity)
+
+    @measure_loop_blocking
+    async def delete_one(self, entity_id: int) -> bool:
+        return await self.__run(self.__delete_one, entity_id)
+
+    @measure_loop_blocking
+    async def delete_many(
+        self, entity_ids: list[int], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        return await self.__run(self.__delete_many, entity_ids, where)
+
+    async def close(self) -> None:
+        if self.__connection is not None:
+            await self.__run(self.__connection.close)
+        self.__executor.shutdown()
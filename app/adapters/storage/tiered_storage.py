@@ -0,0 +1,658 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.base import BaseCrudEntity
+from app.domain.ports import StoragePort
+from app.domain.query import Condition, Page, Query
+
+from .codec import Codec
+from .executor import LoopBlockingStats, StorageExecutor, measure_loop_blocking
+from .hydration import hydrate, shallow_dump
+from .lru import LRUCache
+from .projection import excluded_fields, project
+from .query import find_in, matching_entities, page, resolve, to_param
+
+TModel = TypeVar("TModel", bound=BaseCrudEntity)
+TCreate = TypeVar("TCreate", bound=BaseModel)
+TUpdate = TypeVar("TUpdate", bound=BaseModel)
+TFilter = TypeVar("TFilter", bound=BaseModel)
+T = TypeVar("T")
+
+# Stays well under the bound parameters limit of older SQLite builds
+MAX_PARAMS = 900
+
+
+class TierStats:
+    """Reads served by each tier, moves between tiers and entities per tier."""
+
+    def __init__(self) -> None:
+        self.hot_reads = 0
+        self.warm_reads = 0
+        self.cold_reads = 0
+        self.admissions = 0
+        self.promotions = 0
+        self.demotions = 0
+        self.hot_entities = 0
+        self.warm_entities = 0
+        self.cold_entities = 0
+
+    def snapshot(self) -> dict[str, float]:
+        reads = self.hot_reads + self.warm_reads + self.cold_reads
+        return {
+            "hot_reads": self.hot_reads,
+            "warm_reads": self.warm_reads,
+            "cold_reads": self.cold_reads,
+            "hot_ratio": self.hot_reads / reads if reads else 0.0,
+            "admissions": self.admissions,
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "hot_entities": self.hot_entities,
+            "warm_entities": self.warm_entities,
+            "cold_entities": self.cold_entities,
+        }
+
+
+class TieredStorage(
+    Generic[TModel, TCreate, TUpdate, TFilter],
+    StoragePort[TModel, TCreate, TUpdate, TFilter],
+):
+    """
+    Storage spending memory and disk on the entities that are actually read.
+
+    Every entity has a row in a SQLite catalog, with its ``indexed_fields`` in
+    indexed columns. Warm entities keep their JSON record in the row, while cold
+    ones only point to the compressed archive segment holding it.
+
+    Reads by ID and filtered reads count as accesses. Entities read
+    ``hot_min_reads`` times, the count halving every ``read_half_life_seconds``
+    without reads, are admitted to an in-memory LRU of ``hot_max_entries``, and
+    cold entities are promoted back to warm when read. Warm entities not read for
+    ``cold_after_seconds`` are demoted to new cold segments of up to
+    ``segment_size`` entities by a rebalance, run on demand or at most every
+    ``rebalance_interval_seconds`` after an operation. Scans (unfiltered
+    ``get_many`` and ``find``) read cold entities in place, so exports and sweeps
+    do not warm everything up.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        indexed_fields: Sequence[str] = (),
+        hot_max_entries: int = 1024,
+        hot_min_reads: float = 2,
+        read_half_life_seconds: float = 60 * 60,
+        cold_after_seconds: float = 60 * 60 * 24 * 7,
+        rebalance_interval_seconds: float = 60 * 60,
+        segment_size: int = 1000,
+        codec: Codec | None = None,
+        trusted_hydration: bool = False,
+        logger: logging.Logger = logging.getLogger(__name__),
+    ) -> None:
+        self.__path = path
+        self.__columns = list(dict.fromkeys(indexed_fields))
+        self.__hot_min_reads = hot_min_reads
+        self.__half_life = read_half_life_seconds
+        self.__cold_after = cold_after_seconds
+        self.__rebalance_interval = rebalance_interval_seconds
+        self.__segment_size = segment_size
+        self.__codec = codec or Codec()
+        self.__logger = logger
+        # Stored records were validated when written, so they may skip validation
+        self.__trusted = trusted_hydration
+
+        # Everything below is only used on the executor thread
+        self.__connection: sqlite3.Connection = None  # type: ignore
+        self.__executor = StorageExecutor(name=f"tiered-storage-{path.name}")
+        self.__hot: LRUCache[TModel] = LRUCache(hot_max_entries)
+        # Decayed read count and last read time of the entities read since startup
+        self.__reads: dict[int, tuple[float, float]] = {}
+        # Last read times not yet saved to the catalog
+        self.__unsaved_reads: dict[int, float] = {}
+        # Decoded records of the recently read cold segments
+        self.__segments: LRUCache[dict[int, dict[str, Any]]] = LRUCache(4)
+        self.__rebalanced_at = time.time()
+
+        self.tier_stats = TierStats()
+        self.hot_cache_stats = self.__hot.stats
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @property
+    def __model(self) -> type[TModel]:
+        return self.__orig_class__.__args__[0]  # type: ignore
+
+    @property
+    def __cold_path(self) -> Path:
+        return self.__path / "cold"
+
+    async def __run(self, func: Callable[..., T], *args: Any) -> T:
+        return await self.__executor.run(self.__connected, func, *args)
+
+    def __connected(self, func: Callable[..., T], *args: Any) -> T:
+        if self.__connection is None:
+            self.__connection = self.__connect()
+        result = func(*args)
+        if time.time() - self.__rebalanced_at >= self.__rebalance_interval:
+            self.__rebalance()
+        return result
+
+    def __connect(self) -> sqlite3.Connection:
+        self.__cold_path.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            self.__path / "catalog.sqlite3", check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT, segment TEXT, "
+                "read_at REAL NOT NULL)"
+            )
+            existing_columns = {
+                row["name"] for row in connection.execute("PRAGMA table_info(entities)")
+            }
+            for column in self.__columns:
+                if column not in existing_columns:
+                    connection.execute(f'ALTER TABLE entities ADD COLUMN "{column}"')
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "ix_entities_{column}" '
+                    f'ON entities ("{column}")'
+                )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_entities_segment ON entities (segment)"
+            )
+
+        counts = dict(
+            connection.execute(
+                "SELECT data IS NOT NULL, COUNT(*) FROM entities GROUP BY 1"
+            ).fetchall()
+        )
+        self.tier_stats.warm_entities = counts.get(1, 0)
+        self.tier_stats.cold_entities = counts.get(0, 0)
+        return connection
+
+    def __in_chunks(self, sql: str, ids: list[int], *params: Any) -> list[sqlite3.Row]:
+        rows = []
+        for start in range(0, len(ids), MAX_PARAMS):
+            chunk = ids[start : start + MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows += self.__connection.execute(
+                sql.format(ids=placeholders), [*params, *chunk]
+            ).fetchall()
+        return rows
+
+    # Cold segments
+
+    def __segment_path(self, segment: str) -> Path:
+        return self.__cold_path / f"{segment}.seg"
+
+    def __write_segment(self, records: dict[int, str]) -> str:
+        segment = uuid.uuid4().hex
+        path = self.__segment_path(segment)
+        temp_path = path.with_name(path.name + ".tmp")
+        payload = self.__codec.encode(
+            [{**json.loads(data), "id": id} for id, data in records.items()]
+        )
+        with temp_path.open("wb") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        return segment
+
+    def __read_segment(self, segment: str) -> dict[int, dict[str, Any]]:
+        if (records := self.__segments.get(segment)) is None:
+            try:
+                decoded = self.__codec.decode(self.__segment_path(segment).read_bytes())
+            except (OSError, ValueError):
+                self.__logger.exception(f"Cannot read cold segment {segment}")
+                decoded = []
+            records = {record.pop("id"): record for record in decoded}
+            self.__segments.put(segment, records, 1)
+        return records
+
+    def __collect_segments(self) -> None:
+        """Deletes the segments whose entities were all promoted or deleted."""
+        referenced = {
+            row["segment"]
+            for row in self.__connection.execute(
+                "SELECT DISTINCT segment FROM entities WHERE segment IS NOT NULL"
+            )
+        }
+        for path in self.__cold_path.iterdir():
+            if path.name.removesuffix(".seg") not in referenced:
+                path.unlink(missing_ok=True)
+                self.__segments.discard(path.name.removesuffix(".seg"))
+
+    # Access tracking
+
+    def __record_reads(self, entities: Iterable[TModel]) -> None:
+        now = time.time()
+        for entity in entities:
+            count, read_at = self.__reads.get(entity.id, (0.0, now))  # type: ignore
+            # Halved for every half-life without reads
+            count = count * 0.5 ** ((now - read_at) // self.__half_life) + 1
+            self.__reads[entity.id] = (count, now)  # type: ignore
+            self.__unsaved_reads[entity.id] = now  # type: ignore
+            if count >= self.__hot_min_reads and entity.id not in self.__hot:
+                self.__hot.put(entity.id, entity, 1)
+                self.tier_stats.admissions += 1
+        self.tier_stats.hot_entities = len(self.__hot)
+
+    def __save_reads(self) -> None:
+        with self.__connection:
+            self.__connection.executemany(
+                "UPDATE entities SET read_at = MAX(read_at, ?) WHERE id = ?",
+                [(read_at, id) for id, read_at in self.__unsaved_reads.items()],
+            )
+        self.__unsaved_reads.clear()
+
+    def __rebalance(self) -> int:
+        """Demotes the warm entities not read lately to new cold segments."""
+        self.__rebalanced_at = time.time()
+        self.__save_reads()
+
+        cutoff = time.time() - self.__cold_after
+        ids = [
+            row["id"]
+            for row in self.__connection.execute(
+                "SELECT id FROM entities WHERE data IS NOT NULL AND read_at < ? "
+                "ORDER BY read_at",
+                [cutoff],
+            )
+            # Hot entities are read often enough to stay warm too
+            if row["id"] not in self.__hot
+        ]
+
+        for start in range(0, len(ids), self.__segment_size):
+            chunk = ids[start : start + self.__segment_size]
+            records = {
+                row["id"]: row["data"]
+                for row in self.__in_chunks(
+                    "SELECT id, data FROM entities WHERE id IN ({ids})", chunk
+                )
+            }
+            segment = self.__write_segment(records)
+            with self.__connection:
+                self.__in_chunks(
+                    "UPDATE entities SET data = NULL, segment = ? WHERE id IN ({ids})",
+                    list(records),
+                    segment,
+                )
+            self.tier_stats.demotions += len(records)
+            self.tier_stats.warm_entities -= len(records)
+            self.tier_stats.cold_entities += len(records)
+
+        self.__collect_segments()
+        if ids:
+            self.__logger.info(f"Demoted {len(ids)} entities to cold storage")
+        return len(ids)
+
+    # Rows
+
+    def __to_row(self, entity: TModel) -> dict[str, Any]:
+        data = entity.model_dump(mode="json", exclude={"id"})
+        return {
+            **{column: data.get(column) for column in self.__columns},
+            "data": json.dumps(data),
+            "segment": None,
+            "read_at": time.time(),
+        }
+
+    def __from_record(self, entity_id: int, data: dict[str, Any]) -> TModel:
+        return hydrate(self.__model, {**data, "id": entity_id}, trusted=self.__trusted)
+
+    def __load_rows(
+        self, rows: list[sqlite3.Row], *, promote: bool
+    ) -> dict[int, TModel]:
+        """Builds the entities of the rows, reading cold ones from their segments."""
+        found, promoted = {}, []
+        for row in rows:
+            if row["data"] is not None:
+                found[row["id"]] = self.__from_record(
+                    row["id"], json.loads(row["data"])
+                )
+                if promote:
+                    self.tier_stats.warm_reads += 1
+                continue
+
+            record = self.__read_segment(row["segment"]).get(row["id"])
+            if record is None:
+                self.__logger.warning(f"Missing cold record of entity {row['id']}")
+                continue
+            found[row["id"]] = self.__from_record(row["id"], record)
+            promoted.append(found[row["id"]])
+
+        if promote and promoted:
+            with self.__connection:
+                self.__write_rows(promoted)
+            self.tier_stats.cold_reads += len(promoted)
+            self.tier_stats.promotions += len(promoted)
+        return found
+
+    def __load(self, entity_ids: list[int], *, promote: bool) -> dict[int, TModel]:
+        return self.__load_rows(
+            self.__in_chunks(
+                "SELECT id, data, segment FROM entities WHERE id IN ({ids})",
+                list(dict.fromkeys(entity_ids)),
+            ),
+            promote=promote,
+        )
+
+    def __load_all(self, ids: list[int] | None = None) -> dict[int, TModel]:
+        if ids is not None:
+            return self.__load(ids, promote=False)
+        rows = self.__connection.execute(
+            "SELECT id, data, segment FROM entities ORDER BY id"
+        ).fetchall()
+        return self.__load_rows(rows, promote=False)
+
+    def __write_rows(self, entities: list[TModel]) -> None:
+        """Replaces the rows of existing entities, which become warm."""
+        for entity in entities:
+            row = self.__to_row(entity)
+            was_cold = self.__connection.execute(
+                "SELECT data IS NULL FROM entities WHERE id = ?", [entity.id]
+            ).fetchone()[0]
+            assignments = ", ".join(f'"{column}" = ?' for column in row)
+            self.__connection.execute(
+                f"UPDATE entities SET {assignments} WHERE id = ?",
+                [*row.values(), entity.id],
+            )
+            if was_cold:
+                self.tier_stats.cold_entities -= 1
+                self.tier_stats.warm_entities += 1
+            if entity.id in self.__hot:
+                self.__hot.put(entity.id, entity, 1)
+
+    def __insert(self, entity: TModel) -> TModel:
+        row = self.__to_row(entity)
+        columns = ", ".join(f'"{column}"' for column in row)
+        placeholders = ", ".join("?" * len(row))
+        cursor = self.__connection.execute(
+            f"INSERT INTO entities ({columns}) VALUES ({placeholders})",
+            list(row.values()),
+        )
+        self.tier_stats.warm_entities += 1
+        return entity.model_copy(update={"id": cursor.lastrowid})
+
+    def __find_by(self, key: str, value: Any) -> TModel | None:
+        if key in self.__columns:
+            rows = self.__connection.execute(
+                f'SELECT id, data, segment FROM entities WHERE "{key}" = ? '
+                "ORDER BY id LIMIT 1",
+                [to_param(value)],
+            ).fetchall()
+            return next(iter(self.__load_rows(rows, promote=False).values()), None)
+
+        return next(
+            (
+                entity
+                for entity in self.__load_all().values()
+                if getattr(entity, key, None) == value
+            ),
+            None,
+        )
+
+    # Operations
+
+    def __create_many(self, entities: list[TCreate]) -> list[TModel]:
+        with self.__connection:
+            return [
+                self.__insert(self.__model(**shallow_dump(entity)))
+                for entity in entities
+            ]
+
+    def __create_one(self, entity: TCreate) -> TModel:
+        return self.__create_many([entity])[0]
+
+    def __upsert_many(self, entities: list[TCreate], key: str) -> list[TModel]:
+        stored = []
+        with self.__connection:
+            for entity in entities:
+                new_entity = self.__model(**shallow_dump(entity))
+                existing = self.__find_by(key, getattr(new_entity, key))
+                if existing is None:
+                    stored.append(self.__insert(new_entity))
+                    continue
+
+                new_entity = new_entity.model_copy(
+                    update={
+                        "id": existing.id,
+                        "created_at": existing.created_at,
+                        "updated_at": datetime.now(),
+                    }
+                )
+                self.__write_rows([new_entity])
+                stored.append(new_entity)
+        return stored
+
+    def __upsert_one(self, entity: TCreate, key: str) -> TModel:
+        return self.__upsert_many([entity], key)[0]
+
+    def __read(self, entity_ids: list[int], excluded: frozenset[str]) -> list[TModel]:
+        """Reads entities by ID as accesses, from the hottest tier holding them."""
+        found: dict[int, TModel] = {}
+        for entity_id in entity_ids:
+            if (entity := self.__hot.get(entity_id)) is not None:
+                found[entity_id] = entity
+                self.tier_stats.hot_reads += 1
+        if missing := [id for id in entity_ids if id not in found]:
+            found.update(self.__load(missing, promote=True))
+
+        entities = [found[id] for id in dict.fromkeys(entity_ids) if id in found]
+        self.__record_reads(entities)
+        return [project(found[id], excluded) for id in entity_ids if id in found]
+
+    def __get_many(
+        self,
+        filter_dict: TFilter | None,
+        skip: int,
+        limit: int,
+        excluded: frozenset[str],
+    ) -> list[TModel]:
+        if not filter_dict:
+            # Scans do not count as reads of every entity
+            rows = self.__connection.execute(
+                "SELECT id, data, segment FROM entities ORDER BY id LIMIT ? OFFSET ?",
+                [limit, skip],
+            ).fetchall()
+            found = self.__load_rows(rows, promote=False)
+            return [project(entity, excluded) for entity in found.values()]
+
+        predicates, params, scanned = [], [], []
+        for field, value in filter_dict.model_dump().items():
+            if isinstance(value, str):
+                value = [value]
+            elif not isinstance(value, list):
+                continue
+            if field in self.__columns:
+                predicates.append(f'"{field}" IN ({", ".join("?" * len(value))})')
+                params.extend(value)
+            else:
+                scanned.append((field, value))
+
+        matched: set[int] = set()
+        if predicates:
+            matched |= {
+                row["id"]
+                for row in self.__connection.execute(
+                    f"SELECT id FROM entities WHERE {' OR '.join(predicates)}", params
+                )
+            }
+        if scanned:
+            matched |= {
+                entity.id  # type: ignore
+                for entity in self.__load_all().values()
+                if any(getattr(entity, f, None) in v for f, v in scanned)
+            }
+        return self.__read(sorted(matched)[skip : skip + limit], excluded)
+
+    def __find(self, query: Query, excluded: frozenset[str]) -> Page[TModel]:
+        where = resolve(self.__model, query)
+        predicates, params = [], []
+        for field, condition in where.items():
+            if field not in self.__columns:
+                continue
+            values = [condition.eq] if condition.eq is not None else condition.in_
+            if values is not None:
+                predicates.append(f'"{field}" IN ({", ".join("?" * len(values))})')
+                params.extend(map(to_param, values))
+
+        ids = None
+        if predicates:
+            ids = [
+                row["id"]
+                for row in self.__connection.execute(
+                    f"SELECT id FROM entities WHERE {' AND '.join(predicates)}", params
+                )
+            ]
+        items = find_in(self.__model, self.__load_all(ids).values(), query, where)
+        return page(items, query, excluded)
+
+    def __update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        with self.__connection:
+            if (
+                current := self.__load([entity_id], promote=False).get(entity_id)
+            ) is None:
+                return None
+
+            updated = self.__model.model_validate(
+                {**shallow_dump(current), **shallow_dump(entity, exclude_unset=True)}
+            )
+            self.__write_rows([updated])
+            return updated
+
+    def __delete_many(
+        self, entity_ids: list[int], where: dict[str, Condition] | None = None
+    ) -> int:
+        ids = list(dict.fromkeys(entity_ids))
+        if where:
+            current = self.__load(ids, promote=False).values()
+            ids = [
+                entity.id for entity in matching_entities(self.__model, current, where)
+            ]
+        rows = self.__in_chunks(
+            "SELECT id, data IS NOT NULL AS warm FROM entities WHERE id IN ({ids})", ids
+        )
+        with self.__connection:
+            self.__in_chunks("DELETE FROM entities WHERE id IN ({ids})", ids)
+
+        for row in rows:
+            self.__hot.discard(row["id"])
+            self.__reads.pop(row["id"], None)
+            self.__unsaved_reads.pop(row["id"], None)
+            if row["warm"]:
+                self.tier_stats.warm_entities -= 1
+            else:
+                self.tier_stats.cold_entities -= 1
+        self.tier_stats.hot_entities = len(self.__hot)
+        return len(rows)
+
+    def __delete_one(self, entity_id: int) -> bool:
+        return self.__delete_many([entity_id]) > 0
+
+    async def rebalance(self) -> int:
+        """
+        Demotes the warm entities not read for ``cold_after_seconds`` to cold.
+
+        Returns:
+            int: The number of demoted entities.
+        """
+        return await self.__run(self.__rebalance)
+
+    @measure_loop_blocking
+    async def create_one(self, entity: TCreate) -> TModel:
+        return await self.__run(self.__create_one, entity)
+
+    @measure_loop_blocking
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        return await self.__run(self.__upsert_one, entity, key)
+
+    @measure_loop_blocking
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        return await self.__run(self.__create_many, entities)
+
+    @measure_loop_blocking
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        return await self.__run(self.__upsert_many, entities, key)
+
+    @measure_loop_blocking
+    async def get_one(
+        self,
+        entity_id: int,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
+        excluded = excluded_fields(self.__model, include, exclude)
+        found = await self.__run(self.__read, [entity_id], excluded)
+        return found[0] if found else None
+
+    @measure_loop_blocking
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__read, entity_ids, excluded)
+
+    @measure_loop_blocking
+    async def get_many(
+        self,
+        filter_dict: TFilter | None,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__get_many, filter_dict, skip, limit, excluded)
+
+    @measure_loop_blocking
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        excluded = excluded_fields(self.__model, include, exclude)
+        return await self.__run(self.__find, query, excluded)
+
+    @measure_loop_blocking
+    async def update_one(self, entity_id: int, entity: TUpdate) -> TModel | None:
+        return await self.__run(self.__update_one, entity_id, entity)
+
+    @measure_loop_blocking
+    async def delete_one(self, entity_id: int) -> bool:
+        return await self.__run(self.__delete_one, entity_id)
+
+    @measure_loop_blocking
+    async def delete_many(
+        self, entity_ids: list[int], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        return await self.__run(self.__delete_many, entity_ids, where)
+
+    async def close(self) -> None:
+        if self.__connection is not None:
+            await self.__executor.run(self.__save_reads)
+            await self.__executor.run(self.__connection.close)
+        self.__executor.shutdown()
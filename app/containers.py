@@ -6,7 +6,18 @@ from github import Auth, Github
 
 from app import use_cases
 from app.adapters.gateways import GithubGateway
-from app.adapters.storage import PickleStorage
+from app.adapters.storage import (
+    CachedStorage,
+    ColumnarTimeseriesStorage,
+    DeltaHistoryStorage,
+    ExpiringStorage,
+    LogStorage,
+    PickleStorage,
+    RemoteStorage,
+    SnapshotFile,
+    SqliteStorage,
+    TieredStorage,
+)
 from app.domain import entities, enums
 from app.infrastructure import schemas
 from app.infrastructure.config.settings import Settings
@@ -36,14 +47,140 @@ class Container(containers.DeclarativeContainer):
         },
     )
 
+    repo_info_backend_storage = providers.Selector(
+        config.STORAGE_BACKEND,
+        pickle=providers.Singleton(
+            PickleStorage[
+                entities.RepoInfoEntity,
+                schemas.CreateRepoInfoSchema,
+                schemas.UpdateRepoInfoSchema,
+                schemas.FilterRepoInfoSchema,
+            ],
+            path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "repo_info.pickle"),
+            flush_interval_seconds=config.STORAGE_FLUSH_INTERVAL_SECONDS,
+            indexed_fields=["full_name", "provider", "owner"],
+            trusted_hydration=config.STORAGE_TRUSTED_HYDRATION,
+        ),
+        sqlite=providers.Singleton(
+            SqliteStorage[
+                entities.RepoInfoEntity,
+                schemas.CreateRepoInfoSchema,
+                schemas.UpdateRepoInfoSchema,
+                schemas.FilterRepoInfoSchema,
+            ],
+            path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "repo_info.sqlite3"),
+            table="repo_info",
+            trusted_hydration=config.STORAGE_TRUSTED_HYDRATION,
+            indexes=[
+                ("full_name",),
+                ("provider", "owner"),
+                ("owner",),
+                ("updated_at",),
+            ],
+        ),
+        log=providers.Singleton(
+            LogStorage[
+                entities.RepoInfoEntity,
+                schemas.CreateRepoInfoSchema,
+                schemas.UpdateRepoInfoSchema,
+                schemas.FilterRepoInfoSchema,
+            ],
+            path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "repo_info.log"),
+            indexed_fields=["full_name", "provider", "owner"],
+            trusted_hydration=config.STORAGE_TRUSTED_HYDRATION,
+            cache_max_bytes=config.STORAGE_CACHE_MAX_BYTES,
+        ),
+        tiered=providers.Singleton(
+            TieredStorage[
+                entities.RepoInfoEntity,
+                schemas.CreateRepoInfoSchema,
+                schemas.UpdateRepoInfoSchema,
+                schemas.FilterRepoInfoSchema,
+            ],
+            path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "repo_info_tiers"),
+            indexed_fields=["full_name", "provider", "owner"],
+            trusted_hydration=config.STORAGE_TRUSTED_HYDRATION,
+            hot_max_entries=config.STORAGE_HOT_MAX_ENTRIES,
+            cold_after_seconds=config.STORAGE_COLD_AFTER_SECONDS,
+        ),
+        remote=providers.Singleton(
+            RemoteStorage[
+                entities.RepoInfoEntity,
+                schemas.CreateRepoInfoSchema,
+                schemas.UpdateRepoInfoSchema,
+                schemas.FilterRepoInfoSchema,
+            ],
+            host=config.STORAGE_REMOTE_HOST,
+            port=config.STORAGE_REMOTE_PORT,
+            namespace="repo_info",
+            indexed_fields=["full_name", "provider", "owner"],
+            trusted_hydration=config.STORAGE_TRUSTED_HYDRATION,
+            cache_max_entries=config.STORAGE_READ_CACHE_MAX_ENTRIES,
+        ),
+    )
+
+    repo_info_cached_storage = providers.Singleton(
+        CachedStorage[
+            entities.RepoInfoEntity,
+            schemas.CreateRepoInfoSchema,
+            schemas.UpdateRepoInfoSchema,
+            schemas.FilterRepoInfoSchema,
+        ],
+        storage=repo_info_backend_storage,
+        ttl_seconds=config.STORAGE_READ_CACHE_TTL_SECONDS,
+        max_entries=config.STORAGE_READ_CACHE_MAX_ENTRIES,
+    )
+
+    # The pickle backend reads from memory and reloads as soon as another process
+    # writes the file, which a TTL cache would hide. The tiered backend keeps the
+    # entities read often in memory itself, and the remote one caches entities
+    # itself, evicting them on writes of any node
+    repo_info_read_storage = providers.Selector(
+        config.STORAGE_BACKEND,
+        pickle=repo_info_backend_storage,
+        sqlite=repo_info_cached_storage,
+        log=repo_info_cached_storage,
+        tiered=repo_info_backend_storage,
+        remote=repo_info_backend_storage,
+    )
+
+    repo_timeseries_storage = providers.Singleton(
+        ColumnarTimeseriesStorage,
+        path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "timeseries"),
+    )
+
+    # Shared backends keep the timeseries embedded in the repositories, where every
+    # node reads them, instead of in the local timeseries files
+    repo_source_timeseries_storage = providers.Selector(
+        config.STORAGE_BACKEND,
+        pickle=repo_timeseries_storage,
+        sqlite=repo_timeseries_storage,
+        log=repo_timeseries_storage,
+        tiered=repo_timeseries_storage,
+        remote=providers.Object(None),
+    )
+
+    repo_history_storage = providers.Singleton(
+        DeltaHistoryStorage,
+        path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "history"),
+    )
+
     repo_info_storage = providers.Singleton(
-        PickleStorage[
+        ExpiringStorage[
             entities.RepoInfoEntity,
             schemas.CreateRepoInfoSchema,
             schemas.UpdateRepoInfoSchema,
             schemas.FilterRepoInfoSchema,
         ],
-        path=config.STORAGE_FOLDER.as_(lambda x: Path(x) / "repo_info.pickle"),
+        storage=repo_info_read_storage,
+        retention_seconds=config.STORAGE_RETENTION_SECONDS,
+        sweep_interval_seconds=config.STORAGE_SWEEP_INTERVAL_SECONDS,
+        timeseries_storage=repo_source_timeseries_storage,
+    )
+
+    repo_snapshot = providers.Singleton(
+        SnapshotFile,
+        path=config.STORAGE_SNAPSHOT_PATH.as_(Path),
     )
 
     get_repo_info_by_source_use_case = providers.Factory(
@@ -51,6 +188,16 @@ class Container(containers.DeclarativeContainer):
         gateway_selector=repo_gateway_selector,
         storage=repo_info_storage,
         time_to_live_seconds=config.CACHE_TTL_SECONDS,
+        metric_ttl_seconds=providers.Dict(
+            {
+                enums.RepoMetric.OPEN_PRS_COUNT: config.CACHE_COUNTS_TTL_SECONDS,
+                enums.RepoMetric.CLOSED_PRS_COUNT: config.CACHE_COUNTS_TTL_SECONDS,
+                enums.RepoMetric.USERS_COUNT: config.CACHE_COUNTS_TTL_SECONDS,
+                enums.RepoMetric.OLDEST_PR: None,
+            }
+        ),
+        timeseries_storage=repo_source_timeseries_storage,
+        history_storage=repo_history_storage,
     )
 
     get_repo_info_by_id_use_case = providers.Factory(
@@ -58,6 +205,36 @@ class Container(containers.DeclarativeContainer):
         storage=repo_info_storage,
     )
 
+    get_repo_timeseries_by_id_use_case = providers.Factory(
+        use_cases.GetRepoTimeseriesByIdUseCase,
+        storage=repo_info_storage,
+        timeseries_storage=repo_source_timeseries_storage,
+    )
+
+    get_repo_info_as_of_use_case = providers.Factory(
+        use_cases.GetRepoInfoAsOfUseCase,
+        history_storage=repo_history_storage,
+    )
+
+    get_repo_metric_trend_use_case = providers.Factory(
+        use_cases.GetRepoMetricTrendUseCase,
+        history_storage=repo_history_storage,
+    )
+
+    export_snapshot_use_case = providers.Factory(
+        use_cases.ExportSnapshotUseCase,
+        storage=repo_info_storage,
+        timeseries_storage=repo_source_timeseries_storage,
+        snapshot=repo_snapshot,
+    )
+
+    import_snapshot_use_case = providers.Factory(
+        use_cases.ImportSnapshotUseCase,
+        storage=repo_info_storage,
+        timeseries_storage=repo_source_timeseries_storage,
+        snapshot=repo_snapshot,
+    )
+
     @classmethod
     def default(cls):
         container = cls()
@@ -32,6 +32,13 @@ class RepoInfoEntity(RepoSourceEntity, BaseCrudEntity):
     )
     users: list[TimeseriesDataPoint] = Field(description="Timeseries of contributors")
 
+    metrics_updated_at: dict[str, datetime] = Field(
+        default_factory=dict, description="Last refresh date of each metric"
+    )
+    expires_at: datetime | None = Field(
+        default=None, description="Date the first metric goes stale"
+    )
+
     @field_validator("oldest_pr", mode="before")
     @classmethod
     def _validate_oldest_pr(cls, v) -> str:
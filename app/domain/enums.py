@@ -3,3 +3,17 @@ from enum import StrEnum
 
 class RepoProvider(StrEnum):
     GITHUB = "github"
+
+
+class RepoMetric(StrEnum):
+    OPEN_PRS_COUNT = "open_prs_count"
+    CLOSED_PRS_COUNT = "closed_prs_count"
+    USERS_COUNT = "users_count"
+    OLDEST_PR = "oldest_pr"
+    OPEN_PRS = "open_prs"
+    CLOSED_PRS = "closed_prs"
+    USERS = "users"
+
+    @property
+    def is_timeseries(self) -> bool:
+        return self in (RepoMetric.OPEN_PRS, RepoMetric.CLOSED_PRS, RepoMetric.USERS)
@@ -1,7 +1,13 @@
+from .history_port import HistoryPort
 from .repo_port import RepoPort
+from .snapshot_port import SnapshotPort
 from .storage_port import StoragePort
+from .timeseries_port import TimeseriesPort
 
 __all__ = [
+    "HistoryPort",
     "RepoPort",
+    "SnapshotPort",
     "StoragePort",
+    "TimeseriesPort",
 ]
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any
+
+
+class HistoryPort(ABC):
+    """
+    Abstract interface for the versioned history of stored values.
+
+    Values are JSON-compatible; timeseries are given as dicts of date to value so
+    that versions can keep only the points that changed.
+    """
+
+    @abstractmethod
+    async def record(self, key: str, values: dict[str, Any], at: datetime) -> None:
+        """
+        Records a new version of the values under a key.
+
+        Args:
+            key (str): The key of the history, stable across entity deletions.
+            values (dict[str, Any]): The current values. Fields not given keep
+                their previous value.
+            at (datetime): The date of the version, after the previous versions.
+        """
+        pass
+
+    @abstractmethod
+    async def as_of(self, key: str, at: datetime) -> dict[str, Any] | None:
+        """
+        Reads the values as they were at a given date.
+
+        Args:
+            key (str): The key of the history.
+            at (datetime): The date to read the values at.
+
+        Returns:
+            dict[str, Any] | None: The values of the latest version recorded at
+                or before the date, or None if there is none.
+        """
+        pass
+
+    @abstractmethod
+    async def trend(
+        self,
+        key: str,
+        field: str,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[datetime, Any]]:
+        """
+        Reads the successive values of a field.
+
+        Args:
+            key (str): The key of the history.
+            field (str): The field to follow.
+            start (datetime | None): The first version date to include.
+            end (datetime | None): The last version date to include.
+
+        Returns:
+            list[tuple[datetime, Any]]: The date and new value of each version
+                in the range that changed the field, oldest first.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the storage. Storages without such state
+        keep this default no-op.
+        """
+        pass
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+
+class SnapshotPort(ABC):
+    """
+    Abstract interface for a snapshot of stored records, written and read back in
+    batches so that neither side holds every record at once.
+    """
+
+    @abstractmethod
+    async def write(self, batches: AsyncIterable[list[dict[str, Any]]]) -> int:
+        """
+        Replaces the snapshot with the given records.
+
+        The previous snapshot stays readable until the new one is complete, so a
+        failed or interrupted write leaves it untouched.
+
+        Args:
+            batches (AsyncIterable[list[dict[str, Any]]]): The JSON-compatible
+                records to write, batch by batch.
+
+        Returns:
+            int: The number of records written.
+        """
+        pass
+
+    @abstractmethod
+    def read(self) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Reads the records of the snapshot back, batch by batch.
+
+        Returns:
+            AsyncIterator[list[dict[str, Any]]]: The batches as written. Nothing
+                is yielded when there is no snapshot, and reading stops at the
+                first corrupted batch.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the snapshot. Snapshots without such state
+        keep this default no-op.
+        """
+        pass
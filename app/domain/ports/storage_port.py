@@ -4,6 +4,7 @@ from typing import Any, Generic, TypeVar
 from pydantic import BaseModel
 
 from app.domain.base import BaseCrudEntity
+from app.domain.query import Condition, Page, Query
 
 TModel = TypeVar("TModel", bound=BaseCrudEntity)
 TCreate = TypeVar("TCreate", bound=BaseModel)
@@ -30,18 +31,91 @@ class StoragePort(ABC, Generic[TModel, TCreate, TUpdate, TFilter]):
         pass
 
     @abstractmethod
-    async def get_one(self, entity_id: Any) -> TModel | None:
+    async def upsert_one(self, entity: TCreate, *, key: str) -> TModel:
+        """
+        Creates an entity, or replaces the existing one that shares the same key
+        value in place, keeping its ID.
+
+        Args:
+            entity (TCreate): The entity to create or replace.
+            key (str): The model field that identifies an existing entity.
+
+        Returns:
+            TModel: The stored entity.
+        """
+        pass
+
+    @abstractmethod
+    async def create_many(self, entities: list[TCreate]) -> list[TModel]:
+        """
+        Creates several entities in a single write.
+
+        Args:
+            entities (list[TCreate]): The entities to create.
+
+        Returns:
+            list[TModel]: The created entities, in the given order.
+        """
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, entities: list[TCreate], *, key: str) -> list[TModel]:
+        """
+        Creates or replaces several entities in a single write, as ``upsert_one``
+        would one after the other.
+
+        Args:
+            entities (list[TCreate]): The entities to create or replace.
+            key (str): The model field that identifies an existing entity.
+
+        Returns:
+            list[TModel]: The stored entities, in the given order.
+        """
+        pass
+
+    @abstractmethod
+    async def get_one(
+        self,
+        entity_id: Any,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> TModel | None:
         """
         Retrieves an entity by its unique identifier.
 
         Args:
             entity_id (Any): The ID of the entity to retrieve.
+            include (set[str] | None): Fields to load; all fields when None.
+            exclude (set[str] | None): Fields not to load. Fields left out of a
+                projection are not read and are set to None on the result.
 
         Returns:
             TModel | None: The retrieved entity, or None if not found.
         """
         pass
 
+    @abstractmethod
+    async def get_many_by_ids(
+        self,
+        entity_ids: list[Any],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[TModel]:
+        """
+        Retrieves entities by their unique identifiers in a single round trip.
+
+        Args:
+            entity_ids (list[Any]): The IDs of the entities to retrieve.
+            include (set[str] | None): Fields to load; all fields when None.
+            exclude (set[str] | None): Fields not to load.
+
+        Returns:
+            list[TModel]: The entities found, in the order of the given IDs.
+        """
+        pass
+
     @abstractmethod
     async def get_many(
         self,
@@ -49,6 +123,8 @@ class StoragePort(ABC, Generic[TModel, TCreate, TUpdate, TFilter]):
         *,
         skip: int = 0,
         limit: int = 100,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
     ) -> list[TModel]:
         """
         Retrieves filtered entities with pagination.
@@ -57,12 +133,42 @@ class StoragePort(ABC, Generic[TModel, TCreate, TUpdate, TFilter]):
             filter_dict: (TFilter | None): The filter to apply to the query.
             skip (int): The number of entities to skip.
             limit (int): The maximum number of entities to return.
+            include (set[str] | None): Fields to load; all fields when None.
+            exclude (set[str] | None): Fields not to load.
 
         Returns:
             List[TModel]: A list of entities.
         """
         pass
 
+    @abstractmethod
+    async def find(
+        self,
+        query: Query,
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> Page[TModel]:
+        """
+        Retrieves a page of the entities matching a query, in the query order.
+
+        Unlike ``get_many``, conditions are combined with AND and support ranges,
+        and pages are read from a cursor instead of skipping the previous ones.
+
+        Args:
+            query (Query): The conditions, sort keys, page size and cursor.
+            include (set[str] | None): Fields to load; all fields when None.
+            exclude (set[str] | None): Fields not to load.
+
+        Returns:
+            Page[TModel]: The entities of the page, and the cursor of the next page
+                if more entities match.
+
+        Raises:
+            ValueError: If the query names unknown fields or has an invalid cursor.
+        """
+        pass
+
     @abstractmethod
     async def update_one(self, entity_id: Any, entity: TUpdate) -> TModel | None:
         """
@@ -88,3 +194,28 @@ class StoragePort(ABC, Generic[TModel, TCreate, TUpdate, TFilter]):
         Returns:
             bool: True if the entity was deleted, False otherwise.
         """
+        pass
+
+    @abstractmethod
+    async def delete_many(
+        self, entity_ids: list[Any], *, where: dict[str, Condition] | None = None
+    ) -> int:
+        """
+        Deletes several entities in a single write.
+
+        Args:
+            entity_ids (list[Any]): The IDs of the entities to delete.
+            where (Optional[dict[str, Condition]]): Conditions the entities must
+                still meet, checked in the same write as the delete.
+
+        Returns:
+            int: The number of entities deleted.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Persists pending writes and releases the resources held by the storage.
+        Storages without such state keep this default no-op.
+        """
+        pass
@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from app.domain.entities import TimeseriesDataPoint
+
+
+class TimeseriesPort(ABC):
+    """
+    Abstract interface for the timeseries of stored entities, kept apart from the
+    entities so that reading an entity never loads its history.
+    """
+
+    @abstractmethod
+    async def write(
+        self, entity_id: Any, series: dict[str, list[TimeseriesDataPoint]]
+    ) -> None:
+        """
+        Replaces the given timeseries of an entity.
+
+        Args:
+            entity_id (Any): The ID of the entity owning the timeseries.
+            series (dict[str, list[TimeseriesDataPoint]]): The points of each
+                metric to store. Metrics not given are left untouched.
+        """
+        pass
+
+    @abstractmethod
+    async def read_many(
+        self, entity_ids: list[Any], metrics: list[str]
+    ) -> dict[Any, dict[str, list[TimeseriesDataPoint]]]:
+        """
+        Reads the timeseries of several entities.
+
+        Args:
+            entity_ids (list[Any]): The IDs of the entities to read.
+            metrics (list[str]): The metrics to read.
+
+        Returns:
+            dict[Any, dict[str, list[TimeseriesDataPoint]]]: The points of each
+                stored metric by entity ID. Metrics never written are left out.
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, entity_id: Any) -> None:
+        """
+        Deletes every timeseries of an entity.
+
+        Args:
+            entity_id (Any): The ID of the entity owning the timeseries.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the storage. Storages without such state
+        keep this default no-op.
+        """
+        pass
@@ -0,0 +1,42 @@
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field
+
+T = TypeVar("T")
+
+
+class Condition(BaseModel):
+    """Predicates on one field; every one given must hold."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    eq: Any = None
+    in_: list[Any] | None = Field(default=None, alias="in")
+    gt: Any = None
+    gte: Any = None
+    lt: Any = None
+    lte: Any = None
+
+
+class SortKey(BaseModel):
+    field: str
+    descending: bool = False
+
+
+class Query(BaseModel):
+    """
+    Entities matching every condition, in sort order, one page at a time.
+
+    Entities with equal sort values are ordered by ID, and missing values sort
+    before any other. ``cursor`` is the ``next_cursor`` of the previous page.
+    """
+
+    where: dict[str, Condition] = Field(default_factory=dict)
+    sort: list[SortKey] = Field(default_factory=list)
+    limit: int = Field(default=100, ge=1)
+    cursor: str | None = None
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
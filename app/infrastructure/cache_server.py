@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+import logging
+from collections.abc import Callable
+
+from app.adapters.storage.resp import RespError
+
+logger = logging.getLogger(__name__)
+
+Reply = str | bytes | int | list | RespError | None
+
+
+def encode_reply(reply: Reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, RespError):
+        return b"-%s\r\n" % str(reply).encode()
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+
+async def read_command(reader: asyncio.StreamReader) -> list[bytes] | None:
+    """Reads a command sent as a RESP array of bulk strings, or None at EOF."""
+    if not (line := await reader.readline()):
+        return None
+    if not line.startswith(b"*"):
+        # Inline command, as typed in a terminal
+        return line.split()
+
+    command = []
+    for _ in range(int(line[1:])):
+        if not (header := await reader.readline()).startswith(b"$"):
+            raise ValueError("Expected a bulk string")
+        data = await reader.readexactly(int(header[1:]) + 2)
+        command.append(data[:-2])
+    return command
+
+
+class _Watch:
+    """Keys watched by a connection for its next transaction."""
+
+    def __init__(self) -> None:
+        self.keys: set[bytes] = set()
+        # Set once a watched key is written, failing the next EXEC
+        self.dirty = False
+
+
+class CacheServer:
+    """
+    In-memory server speaking the Redis protocol for the commands used by
+    ``RemoteStorage``: strings, sets, MULTI/EXEC transactions with WATCH, and
+    pub/sub.
+
+    It stands in for Redis when running several nodes locally; data lives only as
+    long as the server process.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379) -> None:
+        self.__host = host
+        self.__port = port
+        self.__data: dict[bytes, bytes | set[bytes]] = {}
+        self.__channels: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self.__watches: dict[bytes, set[_Watch]] = {}
+        self.__server: asyncio.Server | None = None
+        self.__commands: dict[bytes, Callable[..., Reply]] = {
+            b"PING": lambda *args: args[0] if args else "PONG",
+            b"SELECT": lambda db: "OK",
+            b"FLUSHDB": self.__flush,
+            b"GET": self.__get,
+            b"MGET": lambda *keys: [self.__get(key) for key in keys],
+            b"SET": self.__set,
+            b"DEL": self.__delete,
+            b"EXISTS": lambda *keys: sum(key in self.__data for key in keys),
+            b"INCR": lambda key: self.__incr(key, b"1"),
+            b"INCRBY": self.__incr,
+            b"SADD": self.__sadd,
+            b"SREM": self.__srem,
+            b"SMEMBERS": lambda key: sorted(self.__set_at(key)),
+            b"SCARD": lambda key: len(self.__set_at(key)),
+        }
+
+    @property
+    def port(self) -> int:
+        """The bound port, useful when started on port 0."""
+        if self.__server is None:
+            return self.__port
+        return self.__server.sockets[0].getsockname()[1]
+
+    def __string_at(self, key: bytes) -> bytes | None:
+        value = self.__data.get(key)
+        if isinstance(value, set):
+            raise RespError("WRONGTYPE Operation against a key holding a set")
+        return value
+
+    def __set_at(self, key: bytes) -> set[bytes]:
+        value = self.__data.get(key, set())
+        if not isinstance(value, set):
+            raise RespError("WRONGTYPE Operation against a key holding a string")
+        return value
+
+    def __touch(self, *keys: bytes) -> None:
+        for key in keys:
+            for watch in self.__watches.get(key, ()):
+                watch.dirty = True
+
+    def __watch(self, watch: _Watch, keys: list[bytes]) -> None:
+        for key in keys:
+            self.__watches.setdefault(key, set()).add(watch)
+        watch.keys.update(keys)
+
+    def __unwatch(self, watch: _Watch) -> None:
+        for key in watch.keys:
+            self.__watches[key].discard(watch)
+            if not self.__watches[key]:
+                del self.__watches[key]
+        watch.keys.clear()
+        watch.dirty = False
+
+    def __flush(self) -> Reply:
+        self.__touch(*self.__data)
+        self.__data.clear()
+        return "OK"
+
+    def __get(self, key: bytes) -> Reply:
+        try:
+            return self.__string_at(key)
+        except RespError:
+            return None
+
+    def __set(self, key: bytes, value: bytes, *options: bytes) -> Reply:
+        if b"NX" in (option.upper() for option in options) and key in self.__data:
+            return None
+        self.__data[key] = value
+        self.__touch(key)
+        return "OK"
+
+    def __delete(self, *keys: bytes) -> Reply:
+        deleted = [key for key in keys if self.__data.pop(key, None) is not None]
+        self.__touch(*deleted)
+        return len(deleted)
+
+    def __incr(self, key: bytes, increment: bytes) -> Reply:
+        value = int(self.__string_at(key) or b"0") + int(increment)
+        self.__data[key] = str(value).encode()
+        self.__touch(key)
+        return value
+
+    def __sadd(self, key: bytes, *members: bytes) -> Reply:
+        members_set = self.__set_at(key)
+        if added := len(set(members) - members_set):
+            self.__data[key] = members_set | set(members)
+            self.__touch(key)
+        return added
+
+    def __srem(self, key: bytes, *members: bytes) -> Reply:
+        members_set = self.__set_at(key)
+        if not (removed := len(members_set & set(members))):
+            return 0
+        if remaining := members_set - set(members):
+            self.__data[key] = remaining
+        else:
+            self.__data.pop(key, None)
+        self.__touch(key)
+        return removed
+
+    def __run(self, command: list[bytes]) -> Reply:
+        name, *args = command
+        if (handler := self.__commands.get(name.upper())) is None:
+            return RespError(f"ERR unknown command '{name.decode()}'")
+        try:
+            return handler(*args)
+        except RespError as e:
+            return e
+        except (TypeError, ValueError):
+            return RespError(f"ERR invalid arguments for '{name.decode()}'")
+
+    def __publish(self, channel: bytes, message: bytes) -> int:
+        subscribers = self.__channels.get(channel, set())
+        for writer in subscribers:
+            writer.write(encode_reply([b"message", channel, message]))
+        return len(subscribers)
+
+    async def __handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        queued: list[list[bytes]] | None = None
+        watch = _Watch()
+        subscriptions: set[bytes] = set()
+        try:
+            while (command := await read_command(reader)) is not None:
+                if not command:
+                    continue
+                name = command[0].upper()
+                if name == b"QUIT":
+                    writer.write(encode_reply("OK"))
+                    break
+                elif name == b"MULTI":
+                    queued, reply = [], "OK"
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = RespError("ERR EXEC without MULTI")
+                    elif watch.dirty:
+                        # Aborted: a watched key was written since WATCH
+                        queued, reply = None, None
+                    else:
+                        # Commands run back to back, so no other client sees a part
+                        reply = [
+                            self.__run(queued_command) for queued_command in queued
+                        ]
+                        queued = None
+                    self.__unwatch(watch)
+                elif name == b"DISCARD":
+                    queued, reply = None, "OK"
+                    self.__unwatch(watch)
+                elif name == b"WATCH" and queued is not None:
+                    reply = RespError("ERR WATCH inside MULTI is not allowed")
+                elif queued is not None:
+                    queued.append(command)
+                    reply = "QUEUED"
+                elif name == b"WATCH":
+                    self.__watch(watch, command[1:])
+                    reply = "OK"
+                elif name == b"UNWATCH":
+                    self.__unwatch(watch)
+                    reply = "OK"
+                elif name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        self.__channels.setdefault(channel, set()).add(writer)
+                        subscriptions.add(channel)
+                        writer.write(
+                            encode_reply([b"subscribe", channel, len(subscriptions)])
+                        )
+                    await writer.drain()
+                    continue
+                elif name == b"PUBLISH":
+                    reply = self.__publish(command[1], command[2])
+                else:
+                    reply = self.__run(command)
+
+                writer.write(encode_reply(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.__unwatch(watch)
+            for channel in subscriptions:
+                self.__channels[channel].discard(writer)
+            writer.close()
+
+    async def start(self) -> None:
+        self.__server = await asyncio.start_server(
+            self.__handle, self.__host, self.__port
+        )
+        logger.info(f"Cache server listening on {self.__host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        await self.__server.serve_forever()  # type: ignore
+
+    async def close(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+
+
+def main() -> None:
+    """Runs a cache server for local multi-node setups."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(CacheServer(args.host, args.port).serve_forever())
+
+
+if __name__ in {"__main__", "__mp_main__"}:
+    main()
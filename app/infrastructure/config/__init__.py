@@ -1,3 +1,3 @@
-from .settings import Settings
+from .settings import Settings, StorageBackend
 
-__all__ = ["Settings"]
+__all__ = ["Settings", "StorageBackend"]
@@ -1,8 +1,17 @@
+from enum import StrEnum
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class StorageBackend(StrEnum):
+    PICKLE = "pickle"
+    SQLITE = "sqlite"
+    LOG = "log"
+    TIERED = "tiered"
+    REMOTE = "remote"
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parents[3] / ".env", env_file_encoding="utf-8"
@@ -10,4 +19,19 @@ class Settings(BaseSettings):
 
     GITHUB_TOKEN: str
     STORAGE_FOLDER: str = ".storage/"
+    STORAGE_BACKEND: StorageBackend = StorageBackend.PICKLE
+    STORAGE_FLUSH_INTERVAL_SECONDS: float | None = None
+    STORAGE_TRUSTED_HYDRATION: bool = False
+    STORAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    STORAGE_READ_CACHE_TTL_SECONDS: float = 30
+    STORAGE_READ_CACHE_MAX_ENTRIES: int = 1024
+    STORAGE_RETENTION_SECONDS: int = 60 * 60 * 24 * 30
+    STORAGE_SWEEP_INTERVAL_SECONDS: int = 60 * 60
+    STORAGE_HOT_MAX_ENTRIES: int = 1024
+    STORAGE_COLD_AFTER_SECONDS: int = 60 * 60 * 24 * 7
+    STORAGE_REMOTE_HOST: str = "localhost"
+    STORAGE_REMOTE_PORT: int = 6379
+    STORAGE_SNAPSHOT_PATH: str | None = None
+    STORAGE_SNAPSHOT_INTERVAL_SECONDS: int | None = None
     CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    CACHE_COUNTS_TTL_SECONDS: int = 60 * 5
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.domain.entities.repo import TimeseriesDataPoint
 
@@ -18,18 +18,23 @@ class CreateRepoInfoSchema(BaseModel):
     open_prs: list[TimeseriesDataPoint]
     closed_prs: list[TimeseriesDataPoint]
     users: list[TimeseriesDataPoint]
+    metrics_updated_at: dict[str, datetime] = Field(default_factory=dict)
+    expires_at: datetime | None = None
 
 
 class UpdateRepoInfoSchema(BaseUpdateSchema):
     open_prs_count: int | None = None
     closed_prs_count: int | None = None
-    oldest_pr: str | None = None
+    oldest_pr: datetime | None = None
     users_count: int | None = None
-    open_prs: int | None = None
-    closed_prs: int | None = None
-    oldest_pr: str | None = None
-    users: int | None = None
+    open_prs: list[TimeseriesDataPoint] | None = None
+    closed_prs: list[TimeseriesDataPoint] | None = None
+    users: list[TimeseriesDataPoint] | None = None
+    metrics_updated_at: dict[str, datetime] | None = None
+    expires_at: datetime | None = None
 
 
 class FilterRepoInfoSchema(BaseModel):
     full_name: str | None = None
+    provider: str | None = None
+    owner: str | None = None
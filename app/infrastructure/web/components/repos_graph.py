@@ -1,28 +1,18 @@
-from dependency_injector.wiring import Provide, inject
-from nicegui import run, ui
+from nicegui import ui
 
-from app.containers import Container
-from app.use_cases import GetRepoInfoByIdUseCase
+from app.infrastructure.web.view_models import ComparisonViewModel
 
 
 @ui.refreshable
-@inject
-async def repos_graph_component(
-    repo_info_ids: list[int],
-    *,
-    get_repo_info_by_id: GetRepoInfoByIdUseCase = Provide[
-        Container.get_repo_info_by_id_use_case
-    ],
-):
+async def repos_graph_component(view_model: ComparisonViewModel):
+    info_list = view_model.repos
 
-    if not repo_info_ids:
+    if not info_list:
         ui.label(
             "No repositories added yet. Add repositories using the form above."
         ).classes("text-gray-500 text-center w-full")
         return
 
-    info_list = await run.cpu_bound(get_repo_info_by_id.execute_sync, repo_info_ids)
-
     config_map = {
         "open_prs_count": {
             "icon": "mdi:source-pull",
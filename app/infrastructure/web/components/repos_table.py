@@ -1,12 +1,7 @@
-from typing import Annotated
+from nicegui import events, ui
 
-from dependency_injector.wiring import Provide, inject
-from fastapi import Depends
-from nicegui import events, run, ui
-
-from app.containers import Container
 from app.domain import entities
-from app.use_cases.get_repo_info_by_id import GetRepoInfoByIdUseCase
+from app.infrastructure.web.view_models import ComparisonViewModel
 
 
 def repo_info_to_raw_table_component(info_list: list[entities.RepoInfoEntity]):
@@ -86,22 +81,14 @@ def repo_info_to_raw_table_component(info_list: list[entities.RepoInfoEntity]):
 
 
 @ui.refreshable
-@inject
 async def repos_table_component(
-    source_ids: list[int],
+    view_model: ComparisonViewModel,
     *,
-    get_repo_info_by_id: Annotated[
-        GetRepoInfoByIdUseCase, Depends(Provide[Container.get_repo_info_by_id_use_case])
-    ],
     title: str = "Comparison Table",
     empty_message: str = "No repositories added yet. Add repositories using the form above.",
     on_remove: events.Handler[events.GenericEventArguments] | None = None,
 ):
-    repos = (
-        await run.cpu_bound(get_repo_info_by_id.execute_sync, source_ids)
-        if source_ids
-        else []
-    )
+    repos = view_model.repos
 
     with ui.card().classes("w-full"):
         ui.label(title).classes("text-xl font-semibold mb-4")
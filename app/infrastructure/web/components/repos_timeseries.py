@@ -1,33 +1,28 @@
-from typing import Annotated
+from nicegui import ui
 
-from dependency_injector.wiring import Provide, inject
-from fastapi import Depends
-from nicegui import run, ui
-
-from app.containers import Container
 from app.domain import entities
-from app.use_cases.get_repo_info_by_id import GetRepoInfoByIdUseCase
 
 
 @ui.refreshable
-@inject
 async def repos_timeseries_component(
-    info_ids: list[int],
-    *,
-    get_repo_info_by_id: Annotated[
-        GetRepoInfoByIdUseCase, Depends(Provide[Container.get_repo_info_by_id_use_case])
-    ],
+    timeseries_list: list[entities.RepoInfoEntity] | None,
 ) -> None:
-    """Component to display timeseries graphs for multiple repositories."""
+    """
+    Component to display timeseries graphs for multiple repositories.
+
+    Timeseries are loaded on demand, so None means they are not loaded yet.
+    """
 
-    if not info_ids:
+    if timeseries_list is None:
+        ui.spinner(size="lg").classes("mx-auto")
+        return
+
+    if not timeseries_list:
         ui.label(
             "No repositories added yet. Add repositories using the form above."
         ).classes("text-gray-500 text-center w-full")
         return
 
-    timeseries_list = await run.cpu_bound(get_repo_info_by_id.execute_sync, info_ids)
-
     with ui.column().classes("w-full gap-4"):
         # Open PRs Timeseries
         _create_timeseries_chart(
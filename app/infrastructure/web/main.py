@@ -1,4 +1,4 @@
-from nicegui import ui
+from nicegui import app, ui
 
 from app.containers import Container
 
@@ -11,13 +11,27 @@ def main() -> None:
     container.wire(
         modules=[
             "app.infrastructure.web.pages.comparison",
-            "app.infrastructure.web.components.repos_graph",
-            "app.infrastructure.web.components.repos_table",
-            "app.infrastructure.web.components.repos_timeseries",
         ],
         warn_unresolved=True,
     )
 
+    if container.config.STORAGE_SNAPSHOT_PATH():
+        # Warm start from the snapshot of another node, then keep it up to date
+        app.on_startup(container.import_snapshot_use_case().execute)
+        if interval := container.config.STORAGE_SNAPSHOT_INTERVAL_SECONDS():
+            app.timer(
+                interval, container.export_snapshot_use_case().execute, immediate=False
+            )
+        app.on_shutdown(container.repo_snapshot().close)
+
+    # Purge long expired repositories in the background
+    app.on_startup(container.repo_info_storage().start)
+    # Persist pending storage writes before the process exits
+    app.on_shutdown(container.repo_info_storage().close)
+    if timeseries_storage := container.repo_source_timeseries_storage():
+        app.on_shutdown(timeseries_storage.close)
+    app.on_shutdown(container.repo_history_storage().close)
+
     from app.infrastructure.web.pages import comparison_page
 
     # Run the application
@@ -1,9 +1,10 @@
 import asyncio
+import logging
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
 from fastapi import Depends
-from nicegui import app, events, run, ui
+from nicegui import app, background_tasks, events, run, ui
 from pydantic import ValidationError
 
 from app.containers import Container
@@ -15,7 +16,14 @@ from app.infrastructure.web.components import (
     repos_table_component,
     repos_timeseries_component,
 )
-from app.use_cases import GetRepoInfoBySourceUseCase
+from app.infrastructure.web.view_models import ComparisonViewModel
+from app.use_cases import (
+    GetRepoInfoByIdUseCase,
+    GetRepoInfoBySourceUseCase,
+    GetRepoTimeseriesByIdUseCase,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @ui.page("/")
@@ -25,6 +33,14 @@ async def comparison_page(
         GetRepoInfoBySourceUseCase,
         Depends(Provide[Container.get_repo_info_by_source_use_case]),
     ],
+    get_repo_info_by_id: Annotated[
+        GetRepoInfoByIdUseCase,
+        Depends(Provide[Container.get_repo_info_by_id_use_case]),
+    ],
+    get_repo_timeseries_by_id: Annotated[
+        GetRepoTimeseriesByIdUseCase,
+        Depends(Provide[Container.get_repo_timeseries_by_id_use_case]),
+    ],
 ) -> None:
     """Create and render the repository comparison page."""
 
@@ -36,6 +52,7 @@ async def comparison_page(
     cache.setdefault("is_loading", False)
 
     repo_ids = list(cache["repos"].keys())
+    is_refreshing = False
 
     available_providers = list(RepoProvider)
 
@@ -51,6 +68,66 @@ async def comparison_page(
 
         return info
 
+    def refresh_repo_infos(sources: list[RepoSourceEntity]) -> None:
+        asyncio.run(get_repo_info_by_source.execute_many(sources))
+
+    async def refresh_expired(expired: list[RepoSourceEntity]) -> None:
+        nonlocal is_refreshing
+
+        is_refreshing = True
+        try:
+            await run.io_bound(refresh_repo_infos, expired)
+        except Exception:
+            # The stored repositories stay on the page until the next refresh
+            logger.exception("Cannot refresh expired repositories")
+            return
+        finally:
+            is_refreshing = False
+
+        await render_components(
+            await ComparisonViewModel.load(repo_ids, get_repo_info_by_id)
+        )
+
+    def refresh_expired_in_background(view_model: ComparisonViewModel) -> None:
+        # Expired repositories are fetched together and stored in a single write,
+        # while the page shows the stored ones
+        if is_refreshing or not (expired := view_model.expired_sources()):
+            return
+
+        background_tasks.create(refresh_expired(expired), name="refresh_expired")
+
+    def is_timeseries_tab_open() -> bool:
+        return tabs.value in (timeseries_tab, timeseries_tab.props["name"])
+
+    async def refresh_timeseries() -> None:
+        # Timeseries are only loaded while their tab is open
+        if not is_timeseries_tab_open():
+            await repos_timeseries_component.refresh(None)
+            return
+
+        await repos_timeseries_component.refresh(
+            await get_repo_timeseries_by_id.execute(repo_ids)
+        )
+
+    async def render_components(view_model: ComparisonViewModel) -> None:
+        async def refresh(component: ui.refreshable) -> None:
+            await component.refresh(view_model)
+
+        await asyncio.gather(
+            refresh(repos_table_component),
+            refresh(repos_graph_component),
+            refresh_timeseries(),
+        )
+
+    async def refresh_components() -> None:
+        view_model = await ComparisonViewModel.load(repo_ids, get_repo_info_by_id)
+        await render_components(view_model)
+        refresh_expired_in_background(view_model)
+
+    async def on_tab_change(event: events.ValueChangeEventArguments) -> None:
+        if event.value == timeseries_tab.props["name"]:
+            await refresh_timeseries()
+
     async def add_source(event: events.ClickEventArguments) -> None:
         nonlocal repo_ids
 
@@ -59,8 +136,6 @@ async def comparison_page(
         owner = owner_input.value.strip()
         repo = repo_input.value.strip()
 
-        cache["is_loading"] = True
-
         try:
             source = RepoSourceEntity(
                 provider=provider,
@@ -72,17 +147,17 @@ async def comparison_page(
                 include_url=False, include_context=False, include_input=False
             )
             ui.notify(errors, type="warning", multi_line=True)
-            cache["is_loading"] = False
             return
 
-        if new_info := await run.io_bound(get_new_repo_info, source):
-            cache["repos"][new_info.id] = new_info.full_name
-            repo_ids = list(cache["repos"].keys())
-            await repos_table_component.refresh(repo_ids)
-            await repos_graph_component.refresh(repo_ids)
-            await repos_timeseries_component.refresh(repo_ids)
+        cache["is_loading"] = True
 
-        cache["is_loading"] = False
+        try:
+            if new_info := await run.io_bound(get_new_repo_info, source):
+                cache["repos"][new_info.id] = new_info.full_name
+                repo_ids = list(cache["repos"].keys())
+                await refresh_components()
+        finally:
+            cache["is_loading"] = False
 
     async def remove_source(event: events.GenericEventArguments) -> None:
         nonlocal repo_ids
@@ -94,9 +169,7 @@ async def comparison_page(
         del cache["repos"][id_to_delete]
 
         repo_ids = list(cache["repos"].keys())
-        await repos_table_component.refresh(repo_ids)
-        await repos_graph_component.refresh(repo_ids)
-        await repos_timeseries_component.refresh(repo_ids)
+        await refresh_components()
 
     # Page header
     ui.label("Repository Comparison").classes("text-3xl font-bold mb-4")
@@ -150,19 +223,23 @@ async def comparison_page(
 
             ui.spinner().classes("ml-2").bind_visibility_from(cache, "is_loading")
 
+    view_model = await ComparisonViewModel.load(repo_ids, get_repo_info_by_id)
+
     # Tabs for different views
-    with ui.tabs().classes("w-full") as tabs:
+    with ui.tabs(on_change=on_tab_change).classes("w-full") as tabs:
         summary_tab = ui.tab("Summary")
         timeseries_tab = ui.tab("Timeseries")
 
     with ui.tab_panels(tabs, value=summary_tab).classes("w-full"):
         # Summary Tab
         with ui.tab_panel(summary_tab):
-            await repos_graph_component(repo_ids)  # type: ignore
+            await repos_graph_component(view_model)
 
         # Timeseries Tab
         with ui.tab_panel(timeseries_tab):
-            await repos_timeseries_component(repo_ids)  # type: ignore
+            await repos_timeseries_component(None)
 
     with ui.column().classes("w-full mt-6"):
-        await repos_table_component(repo_ids, on_remove=remove_source)  # type: ignore
+        await repos_table_component(view_model, on_remove=remove_source)
+
+    refresh_expired_in_background(view_model)
@@ -0,0 +1,3 @@
+from .comparison import ComparisonViewModel
+
+__all__ = ["ComparisonViewModel"]
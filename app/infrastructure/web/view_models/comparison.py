@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.domain import dto, entities, enums
+from app.use_cases import GetRepoInfoByIdUseCase
+
+TIMESERIES_FIELDS = {
+    metric.value for metric in enums.RepoMetric if metric.is_timeseries
+}
+
+
+class ComparisonViewModel(BaseModel):
+    """Repositories shown by the comparison page, loaded once per state change."""
+
+    # Summaries for the table and the bar chart; timeseries are loaded on demand
+    repos: list[entities.RepoInfoEntity] = Field(default_factory=list)
+
+    @classmethod
+    async def load(
+        cls, repo_ids: list[int], get_repo_info_by_id: GetRepoInfoByIdUseCase
+    ) -> "ComparisonViewModel":
+        if not repo_ids:
+            return cls()
+        return cls(
+            repos=await get_repo_info_by_id.execute(repo_ids, exclude=TIMESERIES_FIELDS)
+        )
+
+    def expired_sources(self) -> list[dto.RepoSourceEntity]:
+        """Sources of the repositories with a stored metric gone stale."""
+        now = datetime.now()
+        return [
+            dto.RepoSourceEntity(
+                provider=repo.provider, owner=repo.owner, repo=repo.repo
+            )
+            for repo in self.repos
+            if repo.expires_at is not None and now >= repo.expires_at
+        ]
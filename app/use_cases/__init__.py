@@ -1,7 +1,17 @@
+from .export_snapshot import ExportSnapshotUseCase
+from .get_repo_info_as_of import GetRepoInfoAsOfUseCase
 from .get_repo_info_by_id import GetRepoInfoByIdUseCase
 from .get_repo_info_by_source import GetRepoInfoBySourceUseCase
+from .get_repo_metric_trend import GetRepoMetricTrendUseCase
+from .get_repo_timeseries_by_id import GetRepoTimeseriesByIdUseCase
+from .import_snapshot import ImportSnapshotUseCase
 
 __all__ = [
     "GetRepoInfoBySourceUseCase",
     "GetRepoInfoByIdUseCase",
+    "GetRepoTimeseriesByIdUseCase",
+    "GetRepoInfoAsOfUseCase",
+    "GetRepoMetricTrendUseCase",
+    "ExportSnapshotUseCase",
+    "ImportSnapshotUseCase",
 ]
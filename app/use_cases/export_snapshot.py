@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.domain import enums
+from app.domain.ports import SnapshotPort, TimeseriesPort
+from app.domain.query import Query
+from app.shared.types import RepoInfoStorage
+
+
+class ExportSnapshotUseCase:
+    def __init__(
+        self,
+        storage: RepoInfoStorage,
+        timeseries_storage: TimeseriesPort | None,
+        snapshot: SnapshotPort,
+        batch_size: int = 500,
+    ):
+        self.__storage = storage
+        # When None, timeseries are exported as embedded in the repositories
+        self.__timeseries = timeseries_storage
+        self.__snapshot = snapshot
+        self.__batch_size = batch_size
+
+    async def __batches(self) -> AsyncIterator[list[dict[str, Any]]]:
+        metrics = [metric.value for metric in enums.RepoMetric if metric.is_timeseries]
+        query = Query(limit=self.__batch_size)
+        while True:
+            page = await self.__storage.find(query)
+            if page.items:
+                stored = {}
+                if self.__timeseries is not None:
+                    stored = await self.__timeseries.read_many(
+                        [repo.id for repo in page.items], metrics
+                    )
+                yield [
+                    repo.model_copy(update=stored.get(repo.id, {})).model_dump(
+                        mode="json", exclude={"id"}
+                    )
+                    for repo in page.items
+                ]
+            if page.next_cursor is None:
+                return
+            query = query.model_copy(update={"cursor": page.next_cursor})
+
+    async def execute(self) -> int:
+        """
+        Replaces the snapshot with every stored repository and its timeseries.
+
+        Repositories are read page by page while the storage keeps serving, so each
+        one is exported as stored when its page was read.
+
+        Returns:
+            int: The number of exported repositories.
+        """
+        return await self.__snapshot.write(self.__batches())
+
+    def execute_sync(self) -> int:
+        return asyncio.run(self.execute())
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime
+
+from app.domain import dto, enums
+from app.domain.entities.repo import RepoInfoEntity, TimeseriesDataPoint
+from app.domain.ports import HistoryPort
+
+
+class GetRepoInfoAsOfUseCase:
+    def __init__(self, history_storage: HistoryPort):
+        self.__history = history_storage
+
+    async def execute(
+        self, source: dto.RepoSourceEntity, at: datetime
+    ) -> RepoInfoEntity | None:
+        """
+        Rebuilds the repository information as it was fetched at a given date.
+
+        Args:
+            source (dto.RepoSourceEntity): The source entity of the repository.
+            at (datetime): The date to read the information at.
+
+        Returns:
+            RepoInfoEntity | None: The information of the latest fetch at or
+                before the date, without an ID, or None if it was never fetched.
+        """
+        if (values := await self.__history.as_of(source.full_name, at)) is None:
+            return None
+
+        for metric in enums.RepoMetric:
+            if metric.is_timeseries:
+                values[metric] = [
+                    TimeseriesDataPoint(date=date, value=value)
+                    for date, value in sorted((values.get(metric) or {}).items())
+                ]
+        return RepoInfoEntity(**source.model_dump(exclude={"full_name"}), **values)
+
+    def execute_sync(
+        self, source: dto.RepoSourceEntity, at: datetime
+    ) -> RepoInfoEntity | None:
+        return asyncio.run(self.execute(source, at))
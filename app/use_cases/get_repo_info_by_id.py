@@ -8,14 +8,26 @@ class GetRepoInfoByIdUseCase:
     def __init__(self, storage: RepoInfoStorage):
         self.__storage = storage
 
-    async def execute(self, ids_list: list[int]) -> list[RepoInfoEntity]:
-        id_set = set(ids_list)
+    async def execute(
+        self,
+        ids_list: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[RepoInfoEntity]:
+        unique_ids = list(dict.fromkeys(ids_list))
+        if not unique_ids:
+            return []
 
-        items_list = []
-        for id in id_set:
-            if item := await self.__storage.get_one(id):
-                items_list.append(item)
-        return items_list
+        return await self.__storage.get_many_by_ids(
+            unique_ids, include=include, exclude=exclude
+        )
 
-    def execute_sync(self, ids_list: list[int]) -> list[RepoInfoEntity]:
-        return asyncio.run(self.execute(ids_list))
+    def execute_sync(
+        self,
+        ids_list: list[int],
+        *,
+        include: set[str] | None = None,
+        exclude: set[str] | None = None,
+    ) -> list[RepoInfoEntity]:
+        return asyncio.run(self.execute(ids_list, include=include, exclude=exclude))
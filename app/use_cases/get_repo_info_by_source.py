@@ -1,10 +1,12 @@
 import asyncio
-from datetime import datetime
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any
 
 from dependency_injector.providers import Aggregate
 
-from app.domain import dto, entities
-from app.domain.ports import RepoPort
+from app.domain import dto, entities, enums
+from app.domain.ports import HistoryPort, RepoPort, TimeseriesPort
 from app.infrastructure import schemas
 from app.shared.types import RepoInfoStorage
 
@@ -15,27 +17,70 @@ class GetRepoInfoBySourceUseCase:
         gateway_selector: Aggregate[RepoPort],
         storage: RepoInfoStorage,
         time_to_live_seconds: int = 60 * 60,
+        metric_ttl_seconds: dict[str, int | None] | None = None,
+        timeseries_storage: TimeseriesPort | None = None,
+        history_storage: HistoryPort | None = None,
     ):
         self.__selector = gateway_selector
         self.__storage = storage
+        # When set, timeseries are stored there and entities keep empty lists
+        self.__timeseries = timeseries_storage
+        # When set, every fetch is recorded there as a new version of the repository
+        self.__history = history_storage
         self.__ttl = time_to_live_seconds
+        # Per-metric overrides of the TTL; None means immutable once known
+        self.__metric_ttl = metric_ttl_seconds or {}
 
     async def __get_from_db(
         self, source: dto.RepoSourceEntity
     ) -> entities.RepoInfoEntity | None:
         filter_ = schemas.FilterRepoInfoSchema(full_name=source.full_name)
         if result := await self.__storage.get_many(filter_, limit=1):
-            item = result[0]
-            since_last_update = (item.updated_at or datetime.now()) - item.created_at
-            if since_last_update.total_seconds() < self.__ttl:
-                return item
-            await self.__storage.delete_one(item.id)
+            return result[0]
 
         return None
 
+    def __get_expiries(
+        self,
+        values: Mapping[str, Any],
+        metrics_updated_at: Mapping[str, datetime],
+        last_update: datetime,
+    ) -> dict[enums.RepoMetric, datetime]:
+        expiries = {}
+        for metric in enums.RepoMetric:
+            ttl = self.__metric_ttl.get(metric, self.__ttl)
+            if ttl is None:
+                if values.get(metric) is not None:
+                    continue
+                ttl = self.__ttl
+
+            refreshed_at = metrics_updated_at.get(metric, last_update)
+            expiries[metric] = refreshed_at + timedelta(seconds=ttl)
+        return expiries
+
+    def __get_expires_at(
+        self,
+        values: Mapping[str, Any],
+        metrics_updated_at: Mapping[str, datetime],
+        last_update: datetime,
+    ) -> datetime | None:
+        expiries = self.__get_expiries(values, metrics_updated_at, last_update)
+        return min(expiries.values(), default=None)
+
+    def __get_stale_metrics(
+        self, item: entities.RepoInfoEntity
+    ) -> list[enums.RepoMetric]:
+        now = datetime.now()
+        expiries = self.__get_expiries(
+            {metric: getattr(item, metric) for metric in enums.RepoMetric},
+            item.metrics_updated_at,
+            item.updated_at or item.created_at,
+        )
+        return [metric for metric, expires_at in expiries.items() if now >= expires_at]
+
     async def __get_from_gateway(
-        self, source: dto.RepoSourceEntity
-    ) -> entities.RepoInfoEntity:
+        self, source: dto.RepoSourceEntity, metrics: list[enums.RepoMetric]
+    ) -> dict[str, Any]:
         if source.provider not in self.__selector.providers:
             raise ValueError("Unsupported provider")
 
@@ -56,37 +101,95 @@ class GetRepoInfoBySourceUseCase:
 
             return result
 
-        return entities.RepoInfoEntity(
-            open_prs_count=await gateway.get_open_pull_requests_count(
-                owner=source.owner, repo=source.repo
-            ),
-            open_prs=fill_timeseries(
-                await gateway.get_timeseries_open_pull_requests(
-                    owner=source.owner, repo=source.repo
-                )
-            ),
-            closed_prs_count=await gateway.get_closed_pull_requests_count(
-                owner=source.owner, repo=source.repo
-            ),
-            closed_prs=fill_timeseries(
-                await gateway.get_timeseries_closed_pull_requests(
-                    owner=source.owner, repo=source.repo
-                )
-            ),
-            users_count=await gateway.get_users_count(
-                owner=source.owner, repo=source.repo
-            ),
-            users=fill_timeseries(
-                await gateway.get_timeseries_users(owner=source.owner, repo=source.repo)
+        async def fetch(metric: enums.RepoMetric) -> Any:
+            kwargs = {"owner": source.owner, "repo": source.repo}
+            match metric:
+                case enums.RepoMetric.OPEN_PRS_COUNT:
+                    return await gateway.get_open_pull_requests_count(**kwargs)
+                case enums.RepoMetric.CLOSED_PRS_COUNT:
+                    return await gateway.get_closed_pull_requests_count(**kwargs)
+                case enums.RepoMetric.USERS_COUNT:
+                    return await gateway.get_users_count(**kwargs)
+                case enums.RepoMetric.OLDEST_PR:
+                    return await gateway.get_oldest_pull_request_date(**kwargs)
+                case enums.RepoMetric.OPEN_PRS:
+                    return fill_timeseries(
+                        await gateway.get_timeseries_open_pull_requests(**kwargs)
+                    )
+                case enums.RepoMetric.CLOSED_PRS:
+                    return fill_timeseries(
+                        await gateway.get_timeseries_closed_pull_requests(**kwargs)
+                    )
+                case enums.RepoMetric.USERS:
+                    return fill_timeseries(await gateway.get_timeseries_users(**kwargs))
+
+        return {metric.value: await fetch(metric) for metric in metrics}
+
+    def __split_timeseries(
+        self, values: dict[str, Any]
+    ) -> tuple[dict[str, Any], dict[str, list[entities.TimeseriesDataPoint]]]:
+        if self.__timeseries is None:
+            return values, {}
+
+        series = {
+            metric: points
+            for metric, points in values.items()
+            if enums.RepoMetric(metric).is_timeseries
+        }
+        return {**values, **{metric: [] for metric in series}}, series
+
+    async def __record_history(
+        self, full_name: str, values: dict[str, Any], at: datetime
+    ) -> None:
+        if self.__history is None:
+            return
+
+        def encode(value: Any) -> Any:
+            if isinstance(value, list):
+                return {point.date: point.value for point in value}
+            if isinstance(value, datetime):
+                return value.isoformat()
+            return value
+
+        await self.__history.record(
+            full_name, {metric: encode(value) for metric, value in values.items()}, at
+        )
+
+    async def __refresh(
+        self, item: entities.RepoInfoEntity, metrics: list[enums.RepoMetric]
+    ) -> entities.RepoInfoEntity | None:
+        fetched = await self.__get_from_gateway(item, metrics)
+        values, series = self.__split_timeseries(fetched)
+        if series:
+            await self.__timeseries.write(item.id, series)  # type: ignore
+
+        now = datetime.now()
+        await self.__record_history(item.full_name, fetched, now)
+        metrics_updated_at = {
+            **item.metrics_updated_at,
+            **{metric.value: now for metric in metrics},
+        }
+        update_item = schemas.UpdateRepoInfoSchema(
+            **values,
+            metrics_updated_at=metrics_updated_at,
+            expires_at=self.__get_expires_at(
+                {
+                    **{metric: getattr(item, metric) for metric in enums.RepoMetric},
+                    **values,
+                },
+                metrics_updated_at,
+                now,
             ),
-            oldest_pr=await gateway.get_oldest_pull_request_date(owner=source.owner, repo=source.repo),  # type: ignore
-            **source.model_dump(),
         )
+        return await self.__storage.update_one(item.id, update_item)
 
     async def execute(self, source: dto.RepoSourceEntity) -> entities.RepoInfoEntity:
         """
         Executes the use case to get repository information.
 
+        Cached information is returned as is while all its metrics are fresh;
+        otherwise only the stale metrics are fetched again and updated in place.
+
         Args:
             source (entities.RepoSourceEntity): The source entity of the repository.
 
@@ -95,12 +198,101 @@ class GetRepoInfoBySourceUseCase:
         """
 
         if db_item := await self.__get_from_db(source):
-            return db_item
+            # Stored expiries spare the per-metric checks while nothing is stale
+            if db_item.expires_at is not None and datetime.now() < db_item.expires_at:
+                return db_item
+            if not (stale_metrics := self.__get_stale_metrics(db_item)):
+                return db_item
+            if updated_item := await self.__refresh(db_item, stale_metrics):
+                return updated_item
+
+        metrics = list(enums.RepoMetric)
+        fetched = await self.__get_from_gateway(source, metrics)
+        values, series = self.__split_timeseries(fetched)
+        now = datetime.now()
+        await self.__record_history(source.full_name, fetched, now)
+        metrics_updated_at = {metric.value: now for metric in metrics}
+        create_item = schemas.CreateRepoInfoSchema(
+            **source.model_dump(),
+            **values,
+            metrics_updated_at=metrics_updated_at,
+            expires_at=self.__get_expires_at(values, metrics_updated_at, now),
+        )
+        item = await self.__storage.upsert_one(create_item, key="full_name")
+        if series:
+            await self.__timeseries.write(item.id, series)  # type: ignore
+
+        return item
+
+    async def execute_many(
+        self, sources: list[dto.RepoSourceEntity]
+    ) -> list[entities.RepoInfoEntity]:
+        """
+        Executes the use case for several repositories at once.
+
+        Each repository is handled as by ``execute``, except that every fetched or
+        refreshed repository is then stored in a single ``upsert_many`` write.
+
+        Args:
+            sources (list[entities.RepoSourceEntity]): The source entities of the
+                repositories.
+
+        Returns:
+            list[entities.RepoInfoEntity]: The repository information entities, in
+                the given order.
+        """
+        unique = list({source.full_name: source for source in sources}.values())
+        db_items = await asyncio.gather(*(self.__get_from_db(s) for s in unique))
+
+        results: dict[str, entities.RepoInfoEntity] = {}
+        pending = []
+        for source, db_item in zip(unique, db_items):
+            if db_item is None:
+                pending.append((source, None, list(enums.RepoMetric)))
+            elif db_item.expires_at is not None and datetime.now() < db_item.expires_at:
+                results[source.full_name] = db_item
+            elif stale_metrics := self.__get_stale_metrics(db_item):
+                pending.append((source, db_item, stale_metrics))
+            else:
+                results[source.full_name] = db_item
+
+        fetched_values = await asyncio.gather(
+            *(self.__get_from_gateway(s, metrics) for s, _, metrics in pending)
+        )
+
+        create_items, all_series = [], []
+        for (source, db_item, metrics), fetched in zip(pending, fetched_values):
+            values, series = self.__split_timeseries(fetched)
+            now = datetime.now()
+            await self.__record_history(source.full_name, fetched, now)
+
+            current = {}
+            if db_item is not None:
+                current = {m.value: getattr(db_item, m) for m in enums.RepoMetric}
+            metrics_updated_at = {
+                **(db_item.metrics_updated_at if db_item is not None else {}),
+                **{metric.value: now for metric in metrics},
+            }
+            create_items.append(
+                schemas.CreateRepoInfoSchema(
+                    **source.model_dump(),
+                    **{**current, **values},
+                    metrics_updated_at=metrics_updated_at,
+                    expires_at=self.__get_expires_at(
+                        {**current, **values}, metrics_updated_at, now
+                    ),
+                )
+            )
+            all_series.append(series)
+
+        if create_items:
+            stored = await self.__storage.upsert_many(create_items, key="full_name")
+            for item, series in zip(stored, all_series):
+                if series:
+                    await self.__timeseries.write(item.id, series)  # type: ignore
+                results[item.full_name] = item
 
-        gateway_item = await self.__get_from_gateway(source)
-        create_item = schemas.CreateRepoInfoSchema(**gateway_item.model_dump())
-        new_item = await self.__storage.create_one(create_item)
-        return new_item
+        return [results[source.full_name] for source in sources]
 
     def execute_sync(self, source: dto.RepoSourceEntity) -> entities.RepoInfoEntity:
         return asyncio.run(self.execute(source))
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+from app.domain import dto, enums
+from app.domain.ports import HistoryPort
+
+
+class GetRepoMetricTrendUseCase:
+    def __init__(self, history_storage: HistoryPort):
+        self.__history = history_storage
+
+    async def execute(
+        self,
+        source: dto.RepoSourceEntity,
+        metric: enums.RepoMetric,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[datetime, Any]]:
+        """
+        Lists the successive values a metric of a repository was fetched with.
+
+        Args:
+            source (dto.RepoSourceEntity): The source entity of the repository.
+            metric (enums.RepoMetric): The metric to follow, other than a timeseries.
+            start (datetime | None): The first fetch date to include.
+            end (datetime | None): The last fetch date to include.
+
+        Returns:
+            list[tuple[datetime, Any]]: The fetch date and value of each change of
+                the metric, oldest first.
+        """
+        if metric.is_timeseries:
+            raise ValueError("Timeseries metrics have no trend")
+
+        trend = await self.__history.trend(
+            source.full_name, metric, start=start, end=end
+        )
+        if metric == enums.RepoMetric.OLDEST_PR:
+            return [
+                (at, None if value is None else datetime.fromisoformat(value))
+                for at, value in trend
+            ]
+        return trend
+
+    def execute_sync(
+        self,
+        source: dto.RepoSourceEntity,
+        metric: enums.RepoMetric,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[datetime, Any]]:
+        return asyncio.run(self.execute(source, metric, start=start, end=end))
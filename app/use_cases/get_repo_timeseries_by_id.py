@@ -0,0 +1,52 @@
+import asyncio
+
+from app.domain import enums
+from app.domain.entities.repo import RepoInfoEntity
+from app.domain.ports import TimeseriesPort
+from app.shared.types import RepoInfoStorage
+
+IDENTITY_FIELDS = {"id", "provider", "owner", "repo"}
+
+
+class GetRepoTimeseriesByIdUseCase:
+    def __init__(
+        self, storage: RepoInfoStorage, timeseries_storage: TimeseriesPort | None
+    ):
+        self.__storage = storage
+        # When None, timeseries are read as embedded in the repositories
+        self.__timeseries = timeseries_storage
+
+    async def execute(self, ids_list: list[int]) -> list[RepoInfoEntity]:
+        """
+        Loads the timeseries of the given repositories.
+
+        Args:
+            ids_list (list[int]): The IDs of the repositories.
+
+        Returns:
+            list[RepoInfoEntity]: The repositories in the given order, projected on
+                their identity and timeseries.
+        """
+        unique_ids = list(dict.fromkeys(ids_list))
+        if not unique_ids:
+            return []
+
+        metrics = [metric.value for metric in enums.RepoMetric if metric.is_timeseries]
+        stored = {}
+        if self.__timeseries is not None:
+            stored = await self.__timeseries.read_many(unique_ids, metrics)
+
+        # Repositories cached before the timeseries storage still embed their points
+        embedded = {
+            metric
+            for entity_id in unique_ids
+            for metric in metrics
+            if metric not in stored.get(entity_id, {})
+        }
+        repos = await self.__storage.get_many_by_ids(
+            unique_ids, include=IDENTITY_FIELDS | embedded
+        )
+        return [repo.model_copy(update=stored.get(repo.id, {})) for repo in repos]
+
+    def execute_sync(self, ids_list: list[int]) -> list[RepoInfoEntity]:
+        return asyncio.run(self.execute(ids_list))
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any
+
+from app.domain import enums
+from app.domain.entities.repo import TimeseriesDataPoint
+from app.domain.ports import SnapshotPort, TimeseriesPort
+from app.domain.query import Condition, Query
+from app.infrastructure import schemas
+from app.shared.types import RepoInfoStorage
+
+
+class ImportSnapshotUseCase:
+    def __init__(
+        self,
+        storage: RepoInfoStorage,
+        timeseries_storage: TimeseriesPort | None,
+        snapshot: SnapshotPort,
+    ):
+        self.__storage = storage
+        # When None, timeseries are imported embedded in the repositories
+        self.__timeseries = timeseries_storage
+        self.__snapshot = snapshot
+
+    async def __import(self, batch: list[dict[str, Any]]) -> int:
+        records = {record["full_name"]: record for record in batch}
+        existing = await self.__storage.find(
+            Query(
+                where={"full_name": Condition(in_=list(records))}, limit=len(records)
+            ),
+            include={"provider", "owner", "repo"},
+        )
+        for repo in existing.items:
+            records.pop(repo.full_name)
+        if not records:
+            return 0
+
+        if self.__timeseries is None:
+            stored = await self.__storage.upsert_many(
+                [
+                    schemas.CreateRepoInfoSchema.model_validate(record)
+                    for record in records.values()
+                ],
+                key="full_name",
+            )
+            return len(stored)
+
+        metrics = [metric.value for metric in enums.RepoMetric if metric.is_timeseries]
+        stored = await self.__storage.upsert_many(
+            [
+                schemas.CreateRepoInfoSchema.model_validate(
+                    {**record, **{metric: [] for metric in metrics}}
+                )
+                for record in records.values()
+            ],
+            key="full_name",
+        )
+        for repo, record in zip(stored, records.values()):
+            series = {
+                metric: [TimeseriesDataPoint.model_validate(p) for p in record[metric]]
+                for metric in metrics
+                if record.get(metric)
+            }
+            if series:
+                await self.__timeseries.write(repo.id, series)
+        return len(stored)
+
+    async def execute(self) -> int:
+        """
+        Bulk-loads the repositories of the snapshot that are not stored yet.
+
+        Stored repositories are kept as they are, since they are at least as recent
+        as the snapshot. Imported ones keep their refresh dates, so their metrics
+        go stale as they would have on the exporting node.
+
+        Returns:
+            int: The number of imported repositories.
+        """
+        imported = 0
+        async for batch in self.__snapshot.read():
+            if batch:
+                imported += await self.__import(batch)
+        return imported
+
+    def execute_sync(self) -> int:
+        return asyncio.run(self.execute())
@@ -14,6 +14,12 @@ from .schema_factories import (
     filter_repo_info_schema_factory,
     update_repo_info_schema_factory,
 )
+from .storage_factories import (
+    INDEXED_FIELDS,
+    REPO_INFO_TYPES,
+    STORAGE_BACKENDS,
+    make_storage,
+)
 
 __all__ = [
     "faker",
@@ -30,4 +36,8 @@ __all__ = [
     "create_repo_info_schema_factory",
     "update_repo_info_schema_factory",
     "filter_repo_info_schema_factory",
+    "INDEXED_FIELDS",
+    "REPO_INFO_TYPES",
+    "STORAGE_BACKENDS",
+    "make_storage",
 ]
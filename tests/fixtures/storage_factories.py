@@ -0,0 +1,60 @@
+"""Builders of the repository info storages under test."""
+
+from pathlib import Path
+from typing import Any
+
+from app.adapters.storage import (
+    LogStorage,
+    PickleStorage,
+    RemoteStorage,
+    SqliteStorage,
+    TieredStorage,
+)
+from app.domain import entities
+from app.domain.ports import StoragePort
+from app.infrastructure import schemas
+
+REPO_INFO_TYPES = (
+    entities.RepoInfoEntity,
+    schemas.CreateRepoInfoSchema,
+    schemas.UpdateRepoInfoSchema,
+    schemas.FilterRepoInfoSchema,
+)
+
+STORAGE_BACKENDS = ["pickle", "sqlite", "log", "tiered", "remote"]
+
+# Indexes of the container
+INDEXED_FIELDS = ["full_name", "provider", "owner"]
+SQLITE_INDEXES = [("full_name",), ("provider", "owner"), ("owner",), ("updated_at",)]
+
+
+def make_storage(
+    backend: str, path: Path | None = None, *, indexed: bool = True, **kwargs: Any
+) -> StoragePort:
+    """
+    Create a repository info storage of the backend, indexed like the container
+    unless ``indexed`` is False. Keyword arguments override those defaults; the
+    remote backend takes the ``port`` of a cache server instead of a path.
+    """
+    if backend == "sqlite":
+        return SqliteStorage[REPO_INFO_TYPES](  # type: ignore
+            path=path,
+            **{
+                "table": "repo_info",
+                "indexes": SQLITE_INDEXES if indexed else (),
+                **kwargs,
+            },
+        )
+
+    options = {"indexed_fields": INDEXED_FIELDS if indexed else (), **kwargs}
+    if backend == "pickle":
+        return PickleStorage[REPO_INFO_TYPES](path=path, **options)  # type: ignore
+    if backend == "log":
+        return LogStorage[REPO_INFO_TYPES](path=path, **options)  # type: ignore
+    if backend == "tiered":
+        return TieredStorage[REPO_INFO_TYPES](path=path, **options)  # type: ignore
+    if backend == "remote":
+        return RemoteStorage[REPO_INFO_TYPES](  # type: ignore
+            host="127.0.0.1", namespace="repo_info", **options
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
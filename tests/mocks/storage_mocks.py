@@ -34,10 +34,15 @@ def mock_storage(mocker: MockerFixture, repo_info_entity_factory) -> StoragePort
     sample_entities = repo_info_entity_factory.batch(size=3)
     storage_data = {entity.id: entity for entity in sample_entities}
 
-    async def get_one_side_effect(entity_id: Any):
+    async def get_one_side_effect(entity_id: Any, **projection):
         return storage_data.get(entity_id)
 
-    async def get_many_side_effect(filter_dict, *, skip: int = 0, limit: int = 100):
+    async def get_many_by_ids_side_effect(entity_ids: list[Any], **projection):
+        return [storage_data[id] for id in entity_ids if id in storage_data]
+
+    async def get_many_side_effect(
+        filter_dict, *, skip: int = 0, limit: int = 100, **projection
+    ):
         entities_list = list(storage_data.values())
         return entities_list[skip : skip + limit]
 
@@ -47,6 +52,20 @@ def mock_storage(mocker: MockerFixture, repo_info_entity_factory) -> StoragePort
         storage_data[new_id] = new_entity
         return new_entity
 
+    async def upsert_one_side_effect(entity, *, key: str):
+        candidate = repo_info_entity_factory.build(**entity.model_dump())
+        existing_id = next(
+            (
+                entity_id
+                for entity_id, existing in storage_data.items()
+                if getattr(existing, key) == getattr(candidate, key)
+            ),
+            max(storage_data.keys(), default=0) + 1,
+        )
+        new_entity = candidate.model_copy(update={"id": existing_id})
+        storage_data[existing_id] = new_entity
+        return new_entity
+
     async def update_one_side_effect(entity_id: Any, entity):
         if entity_id not in storage_data:
             return None
@@ -63,10 +82,24 @@ def mock_storage(mocker: MockerFixture, repo_info_entity_factory) -> StoragePort
             return True
         return False
 
+    async def create_many_side_effect(entities):
+        return [await create_one_side_effect(entity) for entity in entities]
+
+    async def upsert_many_side_effect(entities, *, key: str):
+        return [await upsert_one_side_effect(entity, key=key) for entity in entities]
+
+    async def delete_many_side_effect(entity_ids: list[Any], *, where=None):
+        return sum([await delete_one_side_effect(id) for id in entity_ids])
+
     storage.get_one.side_effect = get_one_side_effect
+    storage.get_many_by_ids.side_effect = get_many_by_ids_side_effect
     storage.get_many.side_effect = get_many_side_effect
     storage.create_one.side_effect = create_one_side_effect
+    storage.upsert_one.side_effect = upsert_one_side_effect
     storage.update_one.side_effect = update_one_side_effect
     storage.delete_one.side_effect = delete_one_side_effect
+    storage.create_many.side_effect = create_many_side_effect
+    storage.upsert_many.side_effect = upsert_many_side_effect
+    storage.delete_many.side_effect = delete_many_side_effect
 
     return storage
@@ -0,0 +1,26 @@
+"""Fixtures shared by the storage adapter tests."""
+
+import pytest
+
+from app.infrastructure.cache_server import CacheServer
+from tests.fixtures import STORAGE_BACKENDS, make_storage
+
+
+@pytest.fixture
+async def cache_server():
+    """Start a cache server on a free port."""
+    server = CacheServer(port=0)
+    await server.start()
+    yield server
+    await server.close()
+
+
+@pytest.fixture(params=STORAGE_BACKENDS)
+async def storage(request, tmp_path, cache_server):
+    """Create a storage of each backend, indexed like the container."""
+    if request.param == "remote":
+        storage = make_storage("remote", port=cache_server.port)
+    else:
+        storage = make_storage(request.param, tmp_path / "repo_info")
+    yield storage
+    await storage.close()
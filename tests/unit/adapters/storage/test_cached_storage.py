@@ -0,0 +1,254 @@
+"""Tests for CachedStorage."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.adapters.storage.cached_storage import CachedStorage
+from app.domain.query import Query, SortKey
+from app.infrastructure import schemas
+from tests.fixtures import REPO_INFO_TYPES, CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """Create the wrapped storage."""
+    return make_storage("pickle", tmp_path / "cached.pickle", indexed=False)
+
+
+def make_cache(backend, **kwargs) -> CachedStorage:
+    """Create a cache in front of the given storage."""
+    return CachedStorage[REPO_INFO_TYPES](
+        storage=backend, **{"ttl_seconds": 60, "max_entries": 100, **kwargs}
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_memory(backend, mocker):
+    """Test that repeated reads reach the wrapped storage once."""
+    # Arrange
+    storage = make_cache(backend)
+    created = await backend.create_one(CreateRepoInfoSchemaFactory.build())
+    get_one = mocker.spy(backend, "get_one")
+    get_many = mocker.spy(backend, "get_many")
+
+    # Act
+    for _ in range(3):
+        by_id = await storage.get_one(created.id)
+        found = await storage.get_many(
+            schemas.FilterRepoInfoSchema(owner=created.owner)
+        )
+
+    # Assert
+    assert by_id == created
+    assert found == [created]
+    assert get_one.call_count == 1
+    assert get_many.call_count == 1
+    assert storage.cache_stats.snapshot()["hit_ratio"] == pytest.approx(4 / 6)
+
+
+@pytest.mark.asyncio
+async def test_projections_are_cached_apart(backend):
+    """Test that a projected read never serves a full one and vice versa."""
+    # Arrange
+    storage = make_cache(backend)
+    created = await backend.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    summary = await storage.get_one(created.id, exclude={"open_prs"})
+    full = await storage.get_one(created.id)
+
+    # Assert
+    assert summary.open_prs is None
+    assert full == created
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_fetches_only_missing(backend, mocker):
+    """Test that cached entities are not fetched again in a batch read."""
+    # Arrange
+    storage = make_cache(backend)
+    first = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    second = await backend.create_one(CreateRepoInfoSchemaFactory.build())
+    get_many_by_ids = mocker.spy(backend, "get_many_by_ids")
+
+    # Act
+    result = await storage.get_many_by_ids([second.id, 999, first.id])
+
+    # Assert
+    assert result == [second, first]
+    get_many_by_ids.assert_called_once_with(
+        [second.id, 999], include=None, exclude=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_reads(backend):
+    """Test that writes through the cache are visible to the next reads."""
+    # Arrange
+    storage = make_cache(backend)
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    await storage.get_one(created.id, exclude={"open_prs"})
+    await storage.get_many(None)
+
+    # Act
+    updated = await storage.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(open_prs_count=99)
+    )
+    summary = await storage.get_one(created.id, exclude={"open_prs"})
+    listed = await storage.get_many(None)
+    await storage.delete_one(created.id)
+
+    # Assert
+    assert summary.open_prs_count == 99
+    assert listed == [updated]
+    assert await storage.get_one(created.id) is None
+    assert await storage.get_many(None) == []
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(backend, mocker):
+    """Test that writes made behind the cache are seen once entries expire."""
+    # Arrange
+    clock = mocker.patch("app.adapters.storage.lru.time.monotonic", return_value=0.0)
+    storage = make_cache(backend, ttl_seconds=10)
+    created = await storage.create_one(
+        CreateRepoInfoSchemaFactory.build(open_prs_count=10)
+    )
+    await backend.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(open_prs_count=99)
+    )
+
+    # Act
+    stale = await storage.get_one(created.id)
+    clock.return_value = 10.0
+    fresh = await storage.get_one(created.id)
+
+    # Assert
+    assert stale.open_prs_count == 10
+    assert fresh.open_prs_count == 99
+    assert storage.entity_cache_stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_size_bound_evicts_least_recently_used(backend):
+    """Test that the cache never holds more entries than its bound."""
+    # Arrange
+    storage = make_cache(backend, max_entries=2)
+
+    # Act
+    for schema in CreateRepoInfoSchemaFactory.batch(size=3):
+        await storage.create_one(schema)
+
+    # Assert
+    assert storage.entity_cache_stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_invalidate_cached_reads(backend):
+    """Test that bulk writes refresh and drop the cached entries they touch."""
+    # Arrange
+    storage = make_cache(backend)
+    schemas_ = CreateRepoInfoSchemaFactory.batch(size=2)
+    created = await storage.create_many(schemas_)
+    query = schemas.FilterRepoInfoSchema(provider="github")
+    assert len(await storage.get_many(query)) == 2
+
+    # Act
+    upserted = await storage.upsert_many(
+        [schemas_[0].model_copy(update={"users_count": 7})],
+        key="full_name",
+    )
+    by_id = await storage.get_one(created[0].id)
+    deleted = await storage.delete_many([created[1].id])
+
+    # Assert
+    assert upserted[0].id == created[0].id
+    assert by_id.users_count == 7
+    assert deleted == 1
+    assert await storage.get_one(created[1].id) is None
+    assert await storage.get_many(query) == [by_id]
+
+
+@pytest.mark.asyncio
+async def test_find_pages_are_cached_until_writes(backend, mocker):
+    """Test that find pages are served from memory and dropped by writes."""
+    # Arrange
+    storage = make_cache(backend)
+    await storage.create_many(
+        [
+            CreateRepoInfoSchemaFactory.build(owner="a"),
+            CreateRepoInfoSchemaFactory.build(owner="b"),
+        ]
+    )
+    find = mocker.spy(backend, "find")
+    query = Query(sort=[SortKey(field="owner", descending=True)], limit=1)
+
+    # Act
+    first = await storage.find(query)
+    again = await storage.find(query)
+    await storage.create_one(CreateRepoInfoSchemaFactory.build(owner="c"))
+    after_write = await storage.find(query)
+
+    # Assert
+    assert [item.owner for item in first.items] == ["b"]
+    assert again == first
+    assert [item.owner for item in after_write.items] == ["c"]
+    assert find.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reads_overtaken_by_a_write_are_not_cached(backend, mocker):
+    """Test that a read that a write overtakes does not cache the old entity."""
+    # Arrange
+    storage = make_cache(backend)
+    created = await backend.create_one(CreateRepoInfoSchemaFactory.build())
+    get_one = backend.get_one
+
+    async def get_one_then_write(entity_id, **kwargs):
+        found = await get_one(entity_id, **kwargs)
+        await storage.update_one(
+            entity_id, schemas.UpdateRepoInfoSchema(users_count=42)
+        )
+        return found
+
+    mocker.patch.object(backend, "get_one", side_effect=get_one_then_write)
+
+    # Act
+    stale = await storage.get_one(created.id, exclude={"users"})
+    mocker.patch.object(backend, "get_one", side_effect=get_one)
+    fresh = await storage.get_one(created.id, exclude={"users"})
+
+    # Assert
+    assert stale.users_count == created.users_count
+    assert fresh.users_count == 42
+
+
+@pytest.mark.asyncio
+async def test_cache_is_shared_with_worker_threads(backend):
+    """Test that threads running their own loops read and write the cache at once."""
+    # Arrange
+    storage = make_cache(backend, max_entries=4)
+    created = await backend.create_many(CreateRepoInfoSchemaFactory.batch(8))
+    projections = [set(), {"users"}, {"open_prs"}, {"closed_prs"}]
+
+    async def work(worker: int) -> None:
+        for step in range(50):
+            repo = created[(worker + step) % len(created)]
+            await storage.get_one(repo.id, exclude=projections[step % 4])
+            await storage.find(Query(limit=step % 3 + 1))
+            await storage.update_one(
+                repo.id, schemas.UpdateRepoInfoSchema(users_count=worker)
+            )
+
+    # Act
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for future in [
+            executor.submit(asyncio.run, work(worker)) for worker in range(4)
+        ]:
+            future.result()
+
+    # Assert
+    for repo in created:
+        assert await storage.get_one(repo.id) == await backend.get_one(repo.id)
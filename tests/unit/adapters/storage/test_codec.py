@@ -0,0 +1,97 @@
+"""Tests for the storage codec."""
+
+import pytest
+
+from app.adapters.storage.codec import MAGIC, Codec
+
+
+def test_round_trip_with_fallback_formats():
+    """Test that the standard library formats round trip plain records."""
+    # Arrange
+    codec = Codec(serializer="json", compressor="zlib")
+    records = [{"id": 1, "owner": "owner", "points": [{"date": "2024-01-01"}]}]
+
+    # Act
+    data = codec.encode(records)
+
+    # Assert
+    assert data.startswith(MAGIC + b"jz")
+    assert codec.decode(data) == records
+
+
+def test_decode_reads_header_formats():
+    """Test that data is decoded with the formats it was encoded with."""
+    # Arrange
+    data = Codec(serializer="json", compressor="zlib").encode({"a": 1})
+
+    # Act
+    result = Codec().decode(data)
+
+    # Assert
+    assert result == {"a": 1}
+
+
+def test_decode_rejects_foreign_data():
+    """Test that data not produced by the codec is rejected."""
+    # Act & Assert
+    with pytest.raises(ValueError):
+        Codec().decode(b"\x80\x04not a codec frame")
+
+
+def test_unavailable_format_is_rejected():
+    """Test that asking for a format that is not installed fails early."""
+    # Act & Assert
+    with pytest.raises(ValueError):
+        Codec(serializer="unknown")
+
+
+def test_stats_report_time_and_size():
+    """Test that encoding and decoding report their time and sizes."""
+    # Arrange
+    codec = Codec()
+    records = [{"value": "x" * 1000}]
+
+    # Act
+    codec.decode(codec.encode(records))
+
+    # Assert
+    stats = codec.stats.snapshot()
+    assert stats["encode"]["calls"] == stats["decode"]["calls"] == 1
+    assert stats["encode"]["last_encoded_bytes"] < stats["encode"]["last_raw_bytes"]
+    assert stats["decode"]["total_seconds"] >= 0
+
+
+@pytest.mark.parametrize(
+    ("serializer", "compressor", "module", "tags"),
+    [
+        ("msgpack", "zlib", "msgpack", b"mz"),
+        ("json", "zstd", "zstandard", b"js"),
+    ],
+)
+def test_round_trip_with_fast_codec_formats(serializer, compressor, module, tags):
+    """Test that the formats of the fast-codec extra round trip plain records."""
+    # Arrange
+    pytest.importorskip(module)
+    codec = Codec(serializer=serializer, compressor=compressor)
+    records = [{"id": 1, "owner": "owner", "points": [{"date": "2024-01-01"}]}]
+
+    # Act
+    data = codec.encode(records)
+
+    # Assert
+    assert data.startswith(MAGIC + tags)
+    assert codec.decode(data) == records
+
+
+def test_fast_codec_formats_are_the_defaults():
+    """Test that the formats of the fast-codec extra are used once installed."""
+    # Arrange
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+
+    # Act
+    data = Codec().encode({"a": 1})
+
+    # Assert
+    assert data.startswith(MAGIC + b"ms")
+    assert Codec(serializer="json", compressor="zlib").decode(data) == {"a": 1}
@@ -0,0 +1,75 @@
+"""Tests for ColumnarTimeseriesStorage."""
+
+import pytest
+
+from app.adapters.storage import ColumnarTimeseriesStorage
+from app.domain import entities
+
+
+@pytest.fixture
+def storage(tmp_path) -> ColumnarTimeseriesStorage:
+    """Create a storage instance."""
+    return ColumnarTimeseriesStorage(path=tmp_path / "timeseries")
+
+
+def make_points(*values: int) -> list[entities.TimeseriesDataPoint]:
+    """Create consecutive daily points."""
+    return [
+        entities.TimeseriesDataPoint(date=f"2024-01-{day:02d}", value=value)
+        for day, value in enumerate(values, start=1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_and_read_round_trip(storage: ColumnarTimeseriesStorage):
+    """Test that stored points are read back unchanged."""
+    # Arrange
+    open_prs = make_points(1, 2, 3)
+    users = make_points(7)
+
+    # Act
+    await storage.write(1, {"open_prs": open_prs, "users": users})
+    result = await storage.read_many([1], ["open_prs", "users"])
+
+    # Assert
+    assert result == {1: {"open_prs": open_prs, "users": users}}
+
+
+@pytest.mark.asyncio
+async def test_read_many_leaves_out_missing_series(storage: ColumnarTimeseriesStorage):
+    """Test that metrics and entities never written are not returned."""
+    # Arrange
+    await storage.write(1, {"open_prs": make_points(1)})
+
+    # Act
+    result = await storage.read_many([1, 2], ["open_prs", "closed_prs"])
+
+    # Assert
+    assert result == {1: {"open_prs": make_points(1)}}
+
+
+@pytest.mark.asyncio
+async def test_write_replaces_only_given_metrics(storage: ColumnarTimeseriesStorage):
+    """Test that writing one metric keeps the others."""
+    # Arrange
+    await storage.write(1, {"open_prs": make_points(1), "users": make_points(2)})
+
+    # Act
+    await storage.write(1, {"open_prs": make_points(5, 6)})
+    result = await storage.read_many([1], ["open_prs", "users"])
+
+    # Assert
+    assert result == {1: {"open_prs": make_points(5, 6), "users": make_points(2)}}
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_every_series(storage: ColumnarTimeseriesStorage):
+    """Test deleting the timeseries of an entity."""
+    # Arrange
+    await storage.write(1, {"open_prs": make_points(1), "users": []})
+
+    # Act
+    await storage.delete(1)
+
+    # Assert
+    assert await storage.read_many([1], ["open_prs", "users"]) == {}
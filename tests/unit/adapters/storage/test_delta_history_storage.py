@@ -0,0 +1,130 @@
+"""Tests for DeltaHistoryStorage."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.adapters.storage.delta_history_storage import DeltaHistoryStorage
+
+KEY = "github/owner/repo"
+
+
+def day(n: int) -> datetime:
+    """Date of the n-th version."""
+    return datetime(2024, 1, n)
+
+
+def read_records(path):
+    """Records of the only history file."""
+    [file] = path.iterdir()
+    return [json.loads(line) for line in file.read_bytes().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_versions_store_only_changes(tmp_path):
+    """Test that versions after the keyframe keep only what changed."""
+    # Arrange
+    storage = DeltaHistoryStorage(tmp_path)
+
+    # Act
+    await storage.record(KEY, {"count": 1, "series": {"d1": 1}}, day(1))
+    await storage.record(KEY, {"count": 1, "series": {"d1": 1, "d2": 2}}, day(2))
+    await storage.record(KEY, {"count": 2}, day(3))
+    await storage.record(KEY, {"count": 2, "series": {"d1": 1, "d2": 2}}, day(4))
+
+    # Assert
+    assert [(r["key"], r["values"]) for r in read_records(tmp_path)] == [
+        (True, {"count": 1, "series": {"d1": 1}}),
+        (False, {"series": {"d2": 2}}),
+        (False, {"count": 2}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_as_of_replays_versions(tmp_path):
+    """Test that values are rebuilt as they were at any date."""
+    # Arrange
+    storage = DeltaHistoryStorage(tmp_path)
+    await storage.record(KEY, {"count": 1, "series": {"d1": 1, "d2": 1}}, day(2))
+    await storage.record(KEY, {"count": 2, "series": {"d2": 2, "d3": 3}}, day(4))
+
+    # Act
+    before = await storage.as_of(KEY, day(1))
+    first = await storage.as_of(KEY, day(3))
+    latest = await storage.as_of(KEY, day(9))
+
+    # Assert
+    assert before is None
+    assert first == {"count": 1, "series": {"d1": 1, "d2": 1}}
+    assert latest == {"count": 2, "series": {"d2": 2, "d3": 3}}
+
+
+@pytest.mark.asyncio
+async def test_keyframes_bound_replays(tmp_path):
+    """Test that full values are stored every keyframe interval."""
+    # Arrange
+    storage = DeltaHistoryStorage(tmp_path, keyframe_interval=2)
+
+    # Act
+    for n in range(1, 6):
+        await storage.record(KEY, {"count": n, "series": {f"d{n}": n}}, day(n))
+
+    # Assert
+    records = read_records(tmp_path)
+    assert [r["key"] for r in records] == [True, False, True, False, True]
+    assert records[2]["values"] == {"count": 3, "series": {"d3": 3}}
+    assert await storage.as_of(KEY, day(4)) == {"count": 4, "series": {"d4": 4}}
+
+
+@pytest.mark.asyncio
+async def test_trend_follows_field_changes(tmp_path):
+    """Test that trends list the changes of a field within the range."""
+    # Arrange
+    storage = DeltaHistoryStorage(tmp_path, keyframe_interval=2)
+    for n, count in enumerate([1, 1, 2, 2, 5], start=1):
+        await storage.record(KEY, {"count": count, "other": n}, day(n))
+
+    # Act
+    trend = await storage.trend(KEY, "count")
+    ranged = await storage.trend(KEY, "count", start=day(2), end=day(4))
+
+    # Assert
+    assert trend == [(day(1), 1), (day(3), 2), (day(5), 5)]
+    assert ranged == [(day(3), 2)]
+    assert await storage.trend("unknown", "count") == []
+
+
+@pytest.mark.asyncio
+async def test_index_catches_up_with_other_writers(tmp_path):
+    """Test that versions appended by another instance are read."""
+    # Arrange
+    reader = DeltaHistoryStorage(tmp_path)
+    writer = DeltaHistoryStorage(tmp_path)
+    await writer.record(KEY, {"count": 1}, day(1))
+    assert await reader.as_of(KEY, day(9)) == {"count": 1}
+
+    # Act
+    await writer.record(KEY, {"count": 2}, day(2))
+
+    # Assert
+    assert await reader.as_of(KEY, day(9)) == {"count": 2}
+
+
+@pytest.mark.asyncio
+async def test_recovers_from_torn_line(tmp_path):
+    """Test that a line torn by a crash is skipped by later versions."""
+    # Arrange
+    storage = DeltaHistoryStorage(tmp_path)
+    await storage.record(KEY, {"count": 1}, day(1))
+    [file] = tmp_path.iterdir()
+    with file.open("ab") as f:
+        f.write(b'{"at":"2024-01-02')
+    recovered = DeltaHistoryStorage(tmp_path)
+
+    # Act
+    await recovered.record(KEY, {"count": 3}, day(3))
+
+    # Assert
+    assert await recovered.as_of(KEY, day(2)) == {"count": 1}
+    assert await recovered.as_of(KEY, day(3)) == {"count": 3}
@@ -0,0 +1,173 @@
+"""Tests for ExpiryIndex and ExpiringStorage."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.adapters.storage.expiry import ExpiringStorage, ExpiryIndex
+from app.infrastructure import schemas
+from tests.fixtures import REPO_INFO_TYPES, CreateRepoInfoSchemaFactory, make_storage
+
+NOW = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """Create the wrapped storage."""
+    return make_storage("pickle", tmp_path / "expiring.pickle", indexed=False)
+
+
+def make_expiring(backend, **kwargs) -> ExpiringStorage:
+    """Create an expiring storage around the given storage."""
+    return ExpiringStorage[REPO_INFO_TYPES](
+        storage=backend,
+        **{"retention_seconds": 60, "sweep_interval_seconds": 3600, **kwargs},
+    )
+
+
+def test_index_pops_due_ids_in_expiry_order():
+    """Test that only due IDs are popped, oldest first and by batch."""
+    # Arrange
+    index = ExpiryIndex()
+    index.set(1, NOW)
+    index.set(2, NOW - timedelta(hours=2))
+    index.set(3, NOW - timedelta(hours=1))
+    index.set(4, NOW + timedelta(hours=1))
+
+    # Act
+    first = index.pop_due(NOW, limit=2)
+    second = index.pop_due(NOW, limit=2)
+
+    # Assert
+    assert first == [2, 3]
+    assert second == [1]
+    assert len(index) == 1
+
+
+def test_index_skips_changed_and_removed_expiries():
+    """Test that outdated heap entries are never popped."""
+    # Arrange
+    index = ExpiryIndex()
+    index.set(1, NOW - timedelta(hours=1))
+    index.set(2, NOW - timedelta(hours=1))
+    index.set(3, NOW - timedelta(hours=1))
+
+    # Act
+    index.set(1, NOW + timedelta(hours=1))
+    index.remove(2)
+    index.set(3, None)
+
+    # Assert
+    assert index.pop_due(NOW, limit=10) == []
+    assert index.pop_due(NOW + timedelta(hours=1), limit=10) == [1]
+
+
+@pytest.mark.asyncio
+async def test_sweep_purges_entities_past_retention(backend, mocker):
+    """Test that entities expired for longer than the retention are purged."""
+    # Arrange
+    timeseries = mocker.AsyncMock()
+    now = datetime.now()
+    expired = await backend.create_one(
+        CreateRepoInfoSchemaFactory.build(expires_at=now - timedelta(hours=1))
+    )
+    recent = await backend.create_one(
+        CreateRepoInfoSchemaFactory.build(expires_at=now - timedelta(seconds=1))
+    )
+    storage = make_expiring(backend, timeseries_storage=timeseries)
+    fresh = await storage.create_one(
+        CreateRepoInfoSchemaFactory.build(expires_at=now + timedelta(hours=1))
+    )
+    unknown = await storage.create_one(
+        CreateRepoInfoSchemaFactory.build(expires_at=None)
+    )
+
+    # Act
+    purged = await storage.sweep()
+
+    # Assert
+    assert purged == 1
+    remaining = await storage.get_many(None)
+    assert [entity.id for entity in remaining] == [recent.id, fresh.id, unknown.id]
+    timeseries.delete.assert_awaited_once_with(expired.id)
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_entities_refreshed_behind_its_back(backend):
+    """Test that an entity refreshed since it was indexed is not purged."""
+    # Arrange
+    storage = make_expiring(backend)
+    created = await storage.create_one(
+        CreateRepoInfoSchemaFactory.build(
+            expires_at=datetime.now() - timedelta(hours=1)
+        )
+    )
+    await backend.update_one(
+        created.id,
+        schemas.UpdateRepoInfoSchema(expires_at=datetime.now() + timedelta(hours=1)),
+    )
+
+    # Act
+    purged = await storage.sweep()
+
+    # Assert
+    assert purged == 0
+    assert await storage.get_one(created.id) is not None
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_entities_refreshed_while_purging(backend, mocker):
+    """Test that an entity refreshed just before it is deleted is kept."""
+    # Arrange
+    timeseries = mocker.AsyncMock()
+    storage = make_expiring(backend, timeseries_storage=timeseries)
+    created = await storage.create_one(
+        CreateRepoInfoSchemaFactory.build(
+            expires_at=datetime.now() - timedelta(hours=1)
+        )
+    )
+    delete_many = backend.delete_many
+
+    async def refresh_then_delete(entity_ids, **kwargs):
+        await backend.update_one(
+            created.id,
+            schemas.UpdateRepoInfoSchema(
+                expires_at=datetime.now() + timedelta(hours=1)
+            ),
+        )
+        return await delete_many(entity_ids, **kwargs)
+
+    mocker.patch.object(backend, "delete_many", side_effect=refresh_then_delete)
+
+    # Act
+    purged = await storage.sweep()
+
+    # Assert
+    assert purged == 0
+    assert await storage.get_one(created.id) is not None
+    timeseries.delete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_start_sweeps_in_background(backend):
+    """Test that a started storage sweeps without being asked."""
+    # Arrange
+    await backend.create_one(
+        CreateRepoInfoSchemaFactory.build(
+            expires_at=datetime.now() - timedelta(hours=1)
+        )
+    )
+    storage = make_expiring(backend)
+
+    # Act
+    await storage.start()
+    for _ in range(50):
+        if not await backend.get_many(None):
+            break
+        await asyncio.sleep(0.01)
+    remaining = await backend.get_many(None)
+    await storage.close()
+
+    # Assert
+    assert remaining == []
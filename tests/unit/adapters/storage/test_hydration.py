@@ -0,0 +1,83 @@
+"""Tests for trusted hydration of stored records."""
+
+from datetime import datetime
+
+from app.adapters.storage.hydration import construct, hydrate, shallow_dump
+from app.domain import entities
+from app.infrastructure import schemas
+
+
+def make_entity() -> entities.RepoInfoEntity:
+    """Create a validated entity."""
+    return entities.RepoInfoEntity(
+        id=1,
+        provider="github",
+        owner="owner",
+        repo="repo",
+        open_prs_count=10,
+        closed_prs_count=20,
+        oldest_pr=datetime(2024, 1, 1),
+        users_count=5,
+        open_prs=[entities.TimeseriesDataPoint(date="2024-01-01", value=1)],
+        closed_prs=[],
+        users=[],
+        metrics_updated_at={"users": datetime(2024, 2, 1, 12, 30)},
+    )
+
+
+def test_construct_matches_validation_for_json_records():
+    """Test that JSON-mode records are rebuilt as validation would."""
+    # Arrange
+    entity = make_entity()
+    record = entity.model_dump(mode="json")
+
+    # Act
+    result = construct(entities.RepoInfoEntity, record)
+
+    # Assert
+    assert result == entity
+    assert isinstance(result.open_prs[0], entities.TimeseriesDataPoint)
+    assert isinstance(result.metrics_updated_at["users"], datetime)
+    assert result.full_name == entity.full_name
+
+
+def test_construct_keeps_python_values():
+    """Test that python-mode records are used as they are."""
+    # Arrange
+    entity = make_entity()
+
+    # Act
+    result = construct(entities.RepoInfoEntity, entity.model_dump())
+
+    # Assert
+    assert result == entity
+
+
+def test_hydrate_validates_untrusted_records():
+    """Test that untrusted records go through validation."""
+    # Arrange
+    record = {**make_entity().model_dump(mode="json"), "open_prs_count": "7"}
+
+    # Act
+    trusted = hydrate(entities.RepoInfoEntity, record, trusted=True)
+    validated = hydrate(entities.RepoInfoEntity, record, trusted=False)
+
+    # Assert
+    assert trusted.open_prs_count == "7"
+    assert validated.open_prs_count == 7
+
+
+def test_shallow_dump_keeps_nested_models_and_computed_fields():
+    """Test that nested models are not dumped and computed fields are kept."""
+    # Arrange
+    entity = make_entity()
+    update = schemas.UpdateRepoInfoSchema(users_count=3)
+
+    # Act
+    values = shallow_dump(entity)
+    update_values = shallow_dump(update, exclude_unset=True)
+
+    # Assert
+    assert values["open_prs"][0] is entity.open_prs[0]
+    assert values["full_name"] == entity.full_name
+    assert set(update_values) == {"users_count", "updated_at"}
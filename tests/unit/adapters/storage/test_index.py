@@ -0,0 +1,85 @@
+"""Tests for HashIndex."""
+
+from types import SimpleNamespace
+
+from app.adapters.storage.index import HashIndex
+
+
+def test_add_replaces_previous_values():
+    """Test that re-indexing an entity drops its old values."""
+    # Arrange
+    index = HashIndex(["owner"])
+    index.add(1, {"owner": "old"})
+
+    # Act
+    index.add(1, {"owner": "new"})
+
+    # Assert
+    assert index.lookup("owner", ["old"]) == set()
+    assert index.lookup("owner", ["new"]) == {1}
+
+
+def test_remove_drops_entity():
+    """Test that removed entities are no longer found."""
+    # Arrange
+    index = HashIndex(["owner"])
+    index.add(1, {"owner": "a"})
+    index.add(2, {"owner": "a"})
+
+    # Act
+    index.remove(1)
+
+    # Assert
+    assert index.lookup("owner", ["a"]) == {2}
+
+
+def test_match_looks_up_indexed_fields_without_scanning():
+    """Test that filters on indexed fields never scan the entities."""
+    # Arrange
+    index = HashIndex(["owner", "provider"])
+    index.add(1, {"owner": "a", "provider": "github"})
+    index.add(2, {"owner": "b", "provider": "gitlab"})
+    index.add(3, {"owner": "c", "provider": "bitbucket"})
+
+    def scan():
+        raise AssertionError("indexed filters must not scan")
+
+    # Act
+    result = index.match({"owner": "a", "provider": ["gitlab"], "repo": None}, scan)
+
+    # Assert
+    assert result == [1, 2]
+
+
+def test_match_scans_fields_without_index():
+    """Test that filters on fields without an index fall back to a scan."""
+    # Arrange
+    index = HashIndex(["owner"])
+    index.add(1, {"owner": "a"})
+    entities = [
+        SimpleNamespace(id=1, owner="a", repo="x"),
+        SimpleNamespace(id=2, owner="b", repo="y"),
+    ]
+
+    # Act
+    result = index.match({"owner": "a", "repo": "y"}, lambda: entities)
+
+    # Assert
+    assert result == [1, 2]
+
+
+def test_copy_is_independent():
+    """Test that changes to a copy leave the original index untouched."""
+    # Arrange
+    index = HashIndex(["owner"])
+    index.add(1, {"owner": "a"})
+
+    # Act
+    copy = index.copy()
+    copy.add(2, {"owner": "a"})
+    copy.add(1, {"owner": "b"})
+
+    # Assert
+    assert index.lookup("owner", ["a"]) == {1}
+    assert index.lookup("owner", ["b"]) == set()
+    assert copy.lookup("owner", ["a", "b"]) == {1, 2}
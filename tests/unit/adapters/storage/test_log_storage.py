@@ -0,0 +1,311 @@
+"""Tests for LogStorage."""
+
+import pytest
+
+from app.adapters.storage.log_storage import LogStorage
+from app.infrastructure import schemas
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+def temp_storage_path(tmp_path):
+    """Create a temporary storage path."""
+    return tmp_path / "test_storage.log"
+
+
+@pytest.fixture
+def storage(temp_storage_path):
+    """Create a storage instance."""
+    return make_storage("log", temp_storage_path)
+
+
+@pytest.mark.asyncio
+async def test_crud_round_trip(storage: LogStorage):
+    """Test create, read, update and delete through the log."""
+    # Act
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    updated = await storage.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(open_prs_count=99)
+    )
+    fetched = await storage.get_one(created.id)
+    deleted = await storage.delete_one(created.id)
+
+    # Assert
+    assert created.id == 1
+    assert updated.open_prs_count == 99
+    assert fetched == updated
+    assert deleted is True
+    assert await storage.get_one(created.id) is None
+    assert await storage.delete_one(created.id) is False
+    assert await storage.update_one(created.id, schemas.UpdateRepoInfoSchema()) is None
+
+
+@pytest.mark.asyncio
+async def test_writes_append_one_record(storage: LogStorage, temp_storage_path):
+    """Test that each write appends to the log instead of rewriting it."""
+    # Arrange
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    size_after_first = temp_storage_path.stat().st_size
+    with temp_storage_path.open("rb") as f:
+        first_record = f.read()
+
+    # Act
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Assert
+    with temp_storage_path.open("rb") as f:
+        assert f.read(size_after_first) == first_record
+    assert temp_storage_path.stat().st_size > size_after_first
+
+
+@pytest.mark.asyncio
+async def test_get_many_filter_pagination_and_ids(storage: LogStorage):
+    """Test filtering, pagination and id lookups."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=5))
+
+    # Act
+    filtered = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=created[2].full_name)
+    )
+    page = await storage.get_many(None, skip=1, limit=2)
+    by_ids = await storage.get_many_by_ids([4, 999, 2])
+
+    # Assert
+    assert filtered == [created[2]]
+    assert [entity.id for entity in page] == [2, 3]
+    assert [entity.id for entity in by_ids] == [4, 2]
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_keeps_id(storage: LogStorage):
+    """Test that upsert replaces the entity sharing the key and keeps its id."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+    created = await storage.create_one(schema)
+
+    # Act
+    result = await storage.upsert_one(
+        schema.model_copy(update={"open_prs_count": 42}),
+        key="full_name",
+    )
+
+    # Assert
+    assert result.id == created.id
+    assert result.created_at == created.created_at
+    assert (await storage.get_one(created.id)).open_prs_count == 42
+
+
+@pytest.mark.asyncio
+async def test_replay_across_instances(temp_storage_path):
+    """Test that reopening the log replays puts and deletes, keeping ids unique."""
+    # Arrange
+    storage1 = make_storage("log", temp_storage_path)
+    first, second = await storage1.create_many(
+        CreateRepoInfoSchemaFactory.batch(size=2)
+    )
+    await storage1.delete_one(second.id)
+
+    # Act
+    storage2 = make_storage("log", temp_storage_path)
+    third = await storage2.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Assert
+    assert await storage2.get_one(first.id) == first
+    assert await storage2.get_one(second.id) is None
+    assert third.id == 3
+
+
+@pytest.mark.asyncio
+async def test_recovers_from_torn_record(temp_storage_path):
+    """Test that a partially written trailing record is dropped on replay."""
+    # Arrange
+    storage1 = make_storage("log", temp_storage_path)
+    created = await storage1.create_one(CreateRepoInfoSchemaFactory.build())
+    valid_size = temp_storage_path.stat().st_size
+    await storage1.create_one(CreateRepoInfoSchemaFactory.build())
+    with temp_storage_path.open("r+b") as f:
+        f.truncate(temp_storage_path.stat().st_size - 3)
+
+    # Act
+    storage2 = make_storage("log", temp_storage_path)
+
+    # Assert
+    assert await storage2.get_one(created.id) == created
+    assert await storage2.get_one(2) is None
+    assert temp_storage_path.stat().st_size == valid_size
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_only_live_records(storage: LogStorage, temp_storage_path):
+    """Test that compaction shrinks the log and keeps live entities readable."""
+    # Arrange
+    kept, removed = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=2))
+    for i in range(10):
+        kept = await storage.update_one(
+            kept.id, schemas.UpdateRepoInfoSchema(open_prs_count=i)
+        )
+    await storage.delete_one(removed.id)
+    size_before = temp_storage_path.stat().st_size
+
+    # Act
+    await storage.compact()
+
+    # Assert
+    assert temp_storage_path.stat().st_size < size_before
+    assert await storage.get_one(kept.id) == kept
+    assert await storage.get_one(removed.id) is None
+    reopened = make_storage("log", temp_storage_path)
+    assert await reopened.get_one(kept.id) == kept
+    # The live record, and the delete of the highest ID
+    assert reopened._LogStorage__records == 2
+
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_deleted_ids_from_being_reused(
+    storage: LogStorage, temp_storage_path
+):
+    """Test that the ID of a deleted entity is not given again after compaction."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=3))
+    await storage.delete_many([created[1].id, created[2].id])
+
+    # Act
+    await storage.compact()
+    reopened = make_storage("log", temp_storage_path)
+    new = await reopened.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Assert
+    assert new.id == created[2].id + 1
+
+
+@pytest.mark.asyncio
+async def test_compaction_runs_in_background(temp_storage_path):
+    """Test that passing the dead record thresholds schedules a compaction."""
+    # Arrange
+    storage = make_storage(
+        "log", temp_storage_path, compaction_ratio=0.5, compaction_min_dead=3
+    )
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    for i in range(3):
+        await storage.update_one(
+            created.id, schemas.UpdateRepoInfoSchema(open_prs_count=i)
+        )
+    storage._LogStorage__compaction.result(timeout=5)
+
+    # Assert
+    assert storage._LogStorage__records == 1
+    assert (await storage.get_one(created.id)).open_prs_count == 2
+
+
+@pytest.mark.asyncio
+async def test_indexed_filter_follows_writes(temp_storage_path):
+    """Test that indexed lookups reflect updates, deletes and a replay."""
+    # Arrange
+    schemas_ = CreateRepoInfoSchemaFactory.batch(size=2)
+    storage = make_storage("log", temp_storage_path)
+    first, second = await storage.create_many(schemas_)
+    await storage.delete_one(first.id)
+    await storage.upsert_one(schemas_[1], key="full_name")
+
+    # Act
+    by_owner = await storage.get_many(schemas.FilterRepoInfoSchema(owner=first.owner))
+    by_name = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=second.full_name)
+    )
+    reopened = make_storage("log", temp_storage_path)
+    replayed = await reopened.get_many(
+        schemas.FilterRepoInfoSchema(full_name=second.full_name)
+    )
+
+    # Assert
+    assert by_owner == []
+    assert [entity.id for entity in by_name] == [second.id]
+    assert [entity.id for entity in replayed] == [second.id]
+
+
+@pytest.mark.asyncio
+async def test_projection_leaves_out_excluded_fields(storage):
+    """Test that include/exclude projections are applied on every read."""
+    # Arrange
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    timeseries = {"open_prs", "closed_prs", "users"}
+
+    # Act
+    summary = await storage.get_one(created.id, exclude=timeseries)
+    [by_id] = await storage.get_many_by_ids([created.id], exclude=timeseries)
+    [named] = await storage.get_many(None, include={"provider", "owner", "repo"})
+
+    # Assert
+    assert summary.open_prs is None
+    assert summary.open_prs_count == created.open_prs_count
+    assert by_id.model_dump(exclude=timeseries) == created.model_dump(
+        exclude=timeseries
+    )
+    assert (named.id, named.full_name) == (created.id, created.full_name)
+    assert named.open_prs_count is None
+    assert named.open_prs is None
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_and_reloads_from_disk(tmp_path):
+    """Test that a small memory budget evicts entities that are then reread."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build(repo="a")
+    probe = make_storage("log", tmp_path / "probe.log")
+    await probe.create_one(schema)
+    await probe.close()
+    record_size = (tmp_path / "probe.log").stat().st_size
+    storage = make_storage(
+        "log", tmp_path / "cached.log", cache_max_bytes=record_size + 1
+    )
+    first = await storage.create_one(schema)
+    await storage.create_one(schema.model_copy(update={"repo": "b"}))
+
+    # Act
+    reloaded = await storage.get_one(first.id)
+    cached = await storage.get_one(first.id)
+
+    # Assert
+    assert reloaded == first
+    assert cached == first
+    assert storage.cache_stats.snapshot() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 2,
+        "expirations": 0,
+        "hit_ratio": 0.5,
+    }
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_upsert_and_delete(temp_storage_path):
+    """Test that bulk writes match the single entity ones and replay on reopen."""
+    # Arrange
+    first, second, third = CreateRepoInfoSchemaFactory.batch(size=3)
+    storage = make_storage("log", temp_storage_path)
+    created = await storage.create_many([first, second])
+
+    # Act
+    upserted = await storage.upsert_many(
+        [
+            second.model_copy(update={"users_count": 7}),
+            third,
+            third.model_copy(update={"users_count": 9}),
+        ],
+        key="full_name",
+    )
+    deleted = await storage.delete_many([created[0].id, created[0].id, 12345])
+    await storage.close()
+    reopened = make_storage("log", temp_storage_path)
+
+    # Assert
+    assert upserted[0].id == created[1].id
+    assert upserted[1].id == upserted[2].id
+    assert deleted == 1
+    assert await reopened.get_one(created[0].id) is None
+    assert (await reopened.get_one(created[1].id)).users_count == 7
+    assert (await reopened.get_one(upserted[2].id)).users_count == 9
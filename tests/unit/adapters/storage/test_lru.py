@@ -0,0 +1,97 @@
+"""Tests for LRUCache."""
+
+from app.adapters.storage.lru import LRUCache
+
+
+def test_evicts_least_recently_used_over_budget():
+    """Test that entries are evicted oldest first once the budget is exceeded."""
+    # Arrange
+    cache = LRUCache[str](max_bytes=10)
+    cache.put("a", "A", 4)
+    cache.put("b", "B", 4)
+    cache.get("a")
+
+    # Act
+    cache.put("c", "C", 4)
+
+    # Assert
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.bytes == 8
+    assert cache.stats.evictions == 1
+
+
+def test_counts_hits_and_misses():
+    """Test that lookups update the hit ratio."""
+    # Arrange
+    cache = LRUCache[str](max_bytes=10)
+    cache.put("a", "A", 1)
+
+    # Act
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    cache.get("a")
+
+    # Assert
+    assert cache.stats.snapshot() == {
+        "hits": 3,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 0,
+        "hit_ratio": 0.75,
+    }
+
+
+def test_skips_values_larger_than_budget():
+    """Test that an oversize value is not cached and does not flush the cache."""
+    # Arrange
+    cache = LRUCache[str](max_bytes=10)
+    cache.put("a", "A", 5)
+
+    # Act
+    cache.put("big", "BIG", 11)
+
+    # Assert
+    assert cache.get("big") is None
+    assert cache.get("a") == "A"
+    assert len(cache) == 1
+
+
+def test_put_replaces_and_discard_frees_bytes():
+    """Test that re-putting a key replaces its size and discarding frees it."""
+    # Arrange
+    cache = LRUCache[str](max_bytes=10)
+    cache.put("a", "A", 5)
+
+    # Act
+    cache.put("a", "AA", 3)
+    replaced_bytes = cache.bytes
+    cache.discard("a")
+
+    # Assert
+    assert replaced_bytes == 3
+    assert cache.bytes == 0
+    assert len(cache) == 0
+
+
+def test_expired_entries_are_misses(mocker):
+    """Test that entries older than the TTL are dropped when read."""
+    # Arrange
+    clock = mocker.patch("app.adapters.storage.lru.time.monotonic", return_value=0.0)
+    cache = LRUCache[str](max_bytes=10, ttl_seconds=5)
+    cache.put("a", "A", 1)
+
+    # Act
+    clock.return_value = 4.0
+    fresh = cache.get("a")
+    clock.return_value = 5.0
+    expired = cache.get("a")
+
+    # Assert
+    assert fresh == "A"
+    assert expired is None
+    assert len(cache) == 0
+    assert cache.stats.expirations == 1
+    assert cache.stats.misses == 1
@@ -1,5 +1,8 @@
 """Tests for PickleStorage."""
 
+import asyncio
+import pickle
+import sys
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -7,9 +10,11 @@ from pathlib import Path
 import pytest
 from pydantic import BaseModel
 
-from app.adapters.storage.pickle_storage import PickleStorage
+from app.adapters.storage.codec import Codec
+from app.adapters.storage.pickle_storage import HEADER, MAGIC, PickleStorage
 from app.domain import entities
 from app.infrastructure import schemas
+from tests.fixtures import make_storage
 
 
 @pytest.fixture
@@ -21,8 +26,6 @@ def temp_storage_path(tmp_path):
 @pytest.fixture
 def storage(temp_storage_path):
     """Create a storage instance."""
-    # Reset class state before creating new instance
-    PickleStorage._PickleStorage__state = {}
     return PickleStorage[
         entities.RepoInfoEntity,
         schemas.CreateRepoInfoSchema,
@@ -262,3 +265,384 @@ async def test_persistence_across_instances(temp_storage_path, sample_create_sch
     assert result is not None
     assert result.id == created.id
     assert result.provider == "github"
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_creates_when_missing(
+    storage: PickleStorage, sample_create_schema
+):
+    """Test that upsert creates a new entity when the key is not stored yet."""
+    # Act
+    result = await storage.upsert_one(sample_create_schema, key="full_name")
+
+    # Assert
+    assert result.id == 1
+    assert result.updated_at is None
+    assert await storage.get_one(1) == result
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_replaces_in_place_keeping_id(
+    storage: PickleStorage, sample_create_schema
+):
+    """Test that upsert replaces the entity sharing the key and keeps its id."""
+    # Arrange
+    created = await storage.create_one(sample_create_schema)
+    refreshed = sample_create_schema.model_copy(update={"open_prs_count": 42})
+
+    # Act
+    result = await storage.upsert_one(refreshed, key="full_name")
+
+    # Assert
+    assert result.id == created.id
+    assert result.open_prs_count == 42
+    assert result.created_at == created.created_at
+    assert result.updated_at is not None
+    assert len(await storage.get_many(None)) == 1
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_saves_once(
+    storage: PickleStorage, sample_create_schema, mocker
+):
+    """Test that a refresh through upsert writes the storage file once."""
+    # Arrange
+    await storage.create_one(sample_create_schema)
+    save_spy = mocker.spy(storage, "_PickleStorage__save")
+
+    # Act
+    await storage.upsert_one(sample_create_schema, key="full_name")
+
+    # Assert
+    assert save_spy.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_update_one_partial_metrics(storage: PickleStorage, sample_create_schema):
+    """Test that a partial update keeps nested timeseries points as models."""
+    # Arrange
+    created = await storage.create_one(sample_create_schema)
+    refreshed_at = datetime(2024, 6, 1)
+    update_schema = schemas.UpdateRepoInfoSchema(
+        open_prs=[entities.TimeseriesDataPoint(date="2024-06-01", value=3)],
+        metrics_updated_at={"open_prs": refreshed_at},
+    )
+
+    # Act
+    result = await storage.update_one(created.id, update_schema)
+
+    # Assert
+    assert result is not None
+    assert result.open_prs == [entities.TimeseriesDataPoint(date="2024-06-01", value=3)]
+    assert result.metrics_updated_at == {"open_prs": refreshed_at}
+    assert result.open_prs_count == created.open_prs_count
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_preserves_order(storage: PickleStorage):
+    """Test getting entities by ids in the requested order, skipping unknown ids."""
+    # Arrange
+    for i in range(3):
+        await storage.create_one(
+            schemas.CreateRepoInfoSchema(
+                provider="github",
+                owner=f"owner{i}",
+                repo=f"repo{i}",
+                open_prs_count=10,
+                closed_prs_count=20,
+                oldest_pr=datetime(2024, 1, 1),
+                users_count=5,
+                open_prs=[],
+                closed_prs=[],
+                users=[],
+            )
+        )
+
+    # Act
+    result = await storage.get_many_by_ids([3, 999, 1])
+
+    # Assert
+    assert [entity.id for entity in result] == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_indexed_filter_follows_writes(temp_storage_path, sample_create_schema):
+    """Test that indexed lookups reflect updates, deletes and a reload."""
+
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path)
+    first = await storage.create_one(sample_create_schema)
+    second = await storage.create_one(
+        sample_create_schema.model_copy(update={"owner": "other_owner"})
+    )
+    await storage.delete_one(first.id)
+    await storage.upsert_one(
+        sample_create_schema.model_copy(update={"owner": "other_owner"}),
+        key="full_name",
+    )
+
+    # Act
+    by_owner = await storage.get_many(schemas.FilterRepoInfoSchema(owner=first.owner))
+    by_name = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=second.full_name)
+    )
+    reloaded = await make_storage("pickle", temp_storage_path).get_many(
+        schemas.FilterRepoInfoSchema(full_name=second.full_name)
+    )
+
+    # Assert
+    assert by_owner == []
+    assert [entity.id for entity in by_name] == [second.id]
+    assert [entity.id for entity in reloaded] == [second.id]
+
+
+@pytest.mark.asyncio
+async def test_projection_leaves_out_excluded_fields(
+    storage: PickleStorage, sample_create_schema
+):
+    """Test that projections leave the stored entity untouched."""
+    # Arrange
+    created = await storage.create_one(sample_create_schema)
+
+    # Act
+    summary = await storage.get_one(created.id, exclude={"open_prs", "users"})
+    [named] = await storage.get_many(None, include={"owner"})
+
+    # Assert
+    assert summary.open_prs is None
+    assert summary.users_count == created.users_count
+    assert named.id == created.id
+    assert named.repo is None
+    assert (await storage.get_one(created.id)) == created
+
+
+@pytest.mark.asyncio
+async def test_saves_encoded_records_and_loads_legacy_pickles(
+    temp_storage_path, sample_create_schema
+):
+    """Test that files written with pickle are loaded and rewritten encoded."""
+    # Arrange
+    legacy = entities.RepoInfoEntity(id=7, **sample_create_schema.model_dump())
+    temp_storage_path.write_bytes(pickle.dumps({7: legacy}))
+    storage = make_storage("pickle", temp_storage_path)
+
+    # Act
+    loaded = await storage.get_one(7)
+    await storage.delete_one(99)
+    await storage.create_one(sample_create_schema)
+    reloaded = await make_storage("pickle", temp_storage_path).get_many(None)
+
+    # Assert
+    assert loaded == legacy
+    data = temp_storage_path.read_bytes()
+    assert data.startswith(MAGIC)
+    assert Codec.is_encoded(data[len(MAGIC) + HEADER.size :])
+    assert [entity.id for entity in reloaded] == [7, 8]
+    assert reloaded[0] == legacy
+    assert "encode" in storage.serialization_stats.snapshot()
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_save_once(storage: PickleStorage, sample_create_schema):
+    """Test that each bulk write saves the file once."""
+    # Arrange
+    saves = []
+    save = storage._PickleStorage__save
+    storage._PickleStorage__save = lambda snapshot: saves.append(1) or save(snapshot)
+    other = sample_create_schema.model_copy(update={"repo": "other_repo"})
+
+    # Act
+    created = await storage.create_many([sample_create_schema, other])
+    upserted = await storage.upsert_many(
+        [other.model_copy(update={"users_count": 7})], key="full_name"
+    )
+    deleted = await storage.delete_many([entity.id for entity in created])
+
+    # Assert
+    assert len(saves) == 3
+    assert upserted[0].id == created[1].id
+    assert deleted == 2
+    assert await storage.get_many_by_ids([entity.id for entity in created]) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "damage",
+    [
+        pytest.param(lambda data: data[: len(data) // 2], id="truncated"),
+        pytest.param(lambda data: data[:-1] + bytes([data[-1] ^ 1]), id="bit_flip"),
+        pytest.param(lambda data: b"", id="emptied"),
+    ],
+)
+async def test_corrupted_file_falls_back_to_previous_generation(
+    temp_storage_path, sample_create_schema, damage
+):
+    """Test that a damaged file is replaced by the last good generation."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path)
+    first = await storage.create_one(sample_create_schema)
+    await storage.create_one(sample_create_schema.model_copy(update={"repo": "other"}))
+    temp_storage_path.write_bytes(damage(temp_storage_path.read_bytes()))
+
+    # Act
+    recovered = make_storage("pickle", temp_storage_path)
+    loaded = await recovered.get_many(None)
+    created = await recovered.create_one(
+        sample_create_schema.model_copy(update={"repo": "third"})
+    )
+
+    # Assert
+    assert loaded == [first]
+    assert created.id == 2
+    # The damaged file is not kept as the previous generation
+    previous = make_storage(
+        "pickle", temp_storage_path.with_name("test_storage.pickle.prev")
+    )
+    assert await previous.get_many(None) == [first]
+    reloaded = await make_storage("pickle", temp_storage_path).get_many(None)
+    assert [entity.id for entity in reloaded] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_crash_between_renames_loads_previous_generation(
+    temp_storage_path, sample_create_schema
+):
+    """Test that a save interrupted before its file was renamed in is ignored."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path)
+    first = await storage.create_one(sample_create_schema)
+    await storage.create_one(sample_create_schema.model_copy(update={"repo": "other"}))
+    temp_storage_path.rename(temp_storage_path.with_name("test_storage.pickle.tmp"))
+
+    # Act
+    loaded = await make_storage("pickle", temp_storage_path).get_many(None)
+
+    # Assert
+    assert loaded == [first]
+
+
+@pytest.mark.asyncio
+async def test_reads_during_writes_see_a_consistent_state(
+    storage: PickleStorage, sample_create_schema
+):
+    """Test that scans on the event loop never race writes on the executor."""
+    # Arrange
+    await storage.create_many(
+        [sample_create_schema.model_copy(update={"repo": f"r{i}"}) for i in range(500)]
+    )
+    other_owner = schemas.FilterRepoInfoSchema(owner="other_owner")
+
+    async def write() -> None:
+        for i in range(100):
+            await storage.create_one(
+                sample_create_schema.model_copy(update={"repo": f"new{i}"})
+            )
+            await storage.delete_one(i + 1)
+
+    # Act
+    # Switches threads often, so that writes land in the middle of scans
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        writes = asyncio.ensure_future(write())
+        scans = 0
+        while not writes.done():
+            # Scans a filter on a field without index over every entity
+            assert await storage.get_many(other_owner) == []
+            scans += 1
+            await asyncio.sleep(0)
+        await writes
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    # Assert
+    assert scans > 0
+    assert len(await storage.get_many(None, limit=1000)) == 500
+
+
+@pytest.mark.asyncio
+async def test_instances_do_not_share_state(tmp_path, sample_create_schema):
+    """Test that each instance holds the entities of its own file."""
+    # Arrange
+    first = make_storage("pickle", tmp_path / "first.pickle")
+    second = make_storage("pickle", tmp_path / "second.pickle")
+
+    # Act
+    await first.create_one(sample_create_schema)
+
+    # Assert
+    assert await second.get_many(None) == []
+    assert len(await first.get_many(None)) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_change_the_entities_in_place(
+    storage: PickleStorage, sample_create_schema
+):
+    """Test that a write changes what it writes rather than copying every entity."""
+    # Arrange
+    created = await storage.create_many(
+        [sample_create_schema.model_copy(update={"repo": f"r{i}"}) for i in range(100)]
+    )
+    entities_before = storage._PickleStorage__snapshot.entities
+
+    # Act
+    await storage.update_one(created[0].id, schemas.UpdateRepoInfoSchema(users_count=1))
+    await storage.delete_one(created[1].id)
+
+    # Assert
+    assert storage._PickleStorage__snapshot.entities is entities_before
+    assert (await storage.get_one(created[0].id)).users_count == 1
+    assert await storage.get_one(created[1].id) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_save_rolls_the_write_back(
+    storage: PickleStorage, sample_create_schema, mocker
+):
+    """Test that entities and their index are restored when a write cannot be saved."""
+    # Arrange
+    kept = await storage.create_one(sample_create_schema)
+    mocker.patch.object(
+        storage, "_PickleStorage__save", side_effect=OSError("Disk full")
+    )
+
+    # Act
+    with pytest.raises(OSError):
+        await storage.create_many(
+            [sample_create_schema.model_copy(update={"owner": "new_owner"})]
+        )
+    with pytest.raises(OSError):
+        await storage.update_one(kept.id, schemas.UpdateRepoInfoSchema(users_count=1))
+    with pytest.raises(OSError):
+        await storage.delete_one(kept.id)
+
+    # Assert
+    assert await storage.get_one(kept.id) == kept
+    assert await storage.get_many(None) == [kept]
+    new_owner = schemas.FilterRepoInfoSchema(owner="new_owner")
+    assert await storage.get_many(new_owner) == []
+
+
+@pytest.mark.asyncio
+async def test_ids_of_deleted_entities_are_not_reused(
+    storage: PickleStorage, temp_storage_path, sample_create_schema
+):
+    """Test that deleting the highest ID does not give it again, even after reload."""
+    # Arrange
+    created = await storage.create_many(
+        [sample_create_schema.model_copy(update={"repo": f"r{i}"}) for i in range(3)]
+    )
+    await storage.delete_one(created[2].id)
+
+    # Act
+    after_delete = await storage.create_one(sample_create_schema)
+    await storage.delete_one(after_delete.id)
+    reloaded = make_storage("pickle", temp_storage_path)
+    after_reload = await reloaded.upsert_one(
+        sample_create_schema.model_copy(update={"repo": "new"}), key="full_name"
+    )
+
+    # Assert
+    assert after_delete.id == created[2].id + 1
+    assert after_reload.id == after_delete.id + 1
@@ -20,8 +20,6 @@ def temp_storage_path(tmp_path):
 @pytest.fixture
 def storage(temp_storage_path):
     """Create a storage instance."""
-    # Reset class state before creating new instance
-    PickleStorage._PickleStorage__state = {}
     return PickleStorage[
         entities.RepoInfoEntity,
         schemas.CreateRepoInfoSchema,
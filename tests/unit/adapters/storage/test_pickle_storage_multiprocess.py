@@ -0,0 +1,105 @@
+"""Tests for PickleStorage shared by several processes."""
+
+import asyncio
+import multiprocessing
+
+import pytest
+
+from app.adapters.storage.file_lock import FileLock
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+def temp_storage_path(tmp_path):
+    """Create a temporary storage path."""
+    return tmp_path / "test_storage_shared.pickle"
+
+
+def create_many(path, count: int) -> None:
+    """Create entities from a separate process."""
+
+    async def run() -> None:
+        storage = make_storage("pickle", path)
+        for _ in range(count):
+            await storage.create_one(CreateRepoInfoSchemaFactory.build())
+        await storage.close()
+
+    asyncio.run(run())
+
+
+@pytest.mark.asyncio
+async def test_reads_reload_after_another_instance_writes(temp_storage_path):
+    """Test that a loaded instance sees the writes of another one."""
+    # Arrange
+    reader = make_storage("pickle", temp_storage_path)
+    writer = make_storage("pickle", temp_storage_path)
+    assert await reader.get_many(None) == []
+
+    # Act
+    created = await writer.create_one(CreateRepoInfoSchemaFactory.build())
+    seen = await reader.get_one(created.id)
+    await writer.delete_one(created.id)
+    gone = await reader.get_one(created.id)
+
+    # Assert
+    assert seen == created
+    assert gone is None
+
+
+@pytest.mark.asyncio
+async def test_reads_skip_reload_while_unchanged(temp_storage_path):
+    """Test that the file is decoded again only when its generation changed."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path)
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    await make_storage("pickle", temp_storage_path).create_one(
+        CreateRepoInfoSchemaFactory.build()
+    )
+
+    # Act
+    for _ in range(5):
+        result = await storage.get_many(None)
+
+    # Assert
+    assert len(result) == 2
+    assert storage.serialization_stats.snapshot()["decode"]["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_interleaved_writers_do_not_lose_updates(temp_storage_path):
+    """Test that writes of stale instances are applied on top of the file."""
+    # Arrange
+    first = make_storage("pickle", temp_storage_path)
+    second = make_storage("pickle", temp_storage_path)
+
+    # Act
+    a = await first.create_one(CreateRepoInfoSchemaFactory.build(owner="a"))
+    b = await second.create_one(CreateRepoInfoSchemaFactory.build(owner="b"))
+    c = await first.create_one(CreateRepoInfoSchemaFactory.build(owner="c"))
+
+    # Assert
+    assert [a.id, b.id, c.id] == [1, 2, 3]
+    result = await make_storage("pickle", temp_storage_path).get_many(None)
+    assert [entity.owner for entity in result] == ["a", "b", "c"]
+
+
+def test_concurrent_processes_keep_every_write(temp_storage_path):
+    """Test that processes writing at the same time keep each other's entities."""
+    # Arrange
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=create_many, args=(temp_storage_path, 5))
+        for _ in range(2)
+    ]
+
+    # Act
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+
+    # Assert
+    assert [process.exitcode for process in processes] == [0, 0]
+    result = asyncio.run(make_storage("pickle", temp_storage_path).get_many(None))
+    assert sorted(entity.id for entity in result) == list(range(1, 11))
+    assert FileLock(temp_storage_path).generation == 10
@@ -0,0 +1,101 @@
+"""Tests for the write-behind mode of PickleStorage."""
+
+import asyncio
+import time
+
+import pytest
+
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+def temp_storage_path(tmp_path):
+    """Create a temporary storage path."""
+    return tmp_path / "test_storage_write_behind.pickle"
+
+
+@pytest.mark.asyncio
+async def test_burst_of_writes_is_flushed_once(temp_storage_path, mocker):
+    """Test that a burst of mutations results in a single debounced save."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path, flush_interval_seconds=0.5)
+    save_spy = mocker.spy(storage, "_PickleStorage__save")
+
+    # Act
+    for _ in range(20):
+        schema = CreateRepoInfoSchemaFactory.build()
+        created = await storage.create_one(schema)
+        await storage.upsert_one(schema, key="full_name")
+    await storage.delete_one(created.id)
+
+    # Assert
+    assert save_spy.call_count == 0
+    assert not temp_storage_path.exists()
+
+    await asyncio.sleep(0.6)
+    assert save_spy.call_count == 1
+    assert len(await make_storage("pickle", temp_storage_path).get_many(None)) == 19
+
+
+@pytest.mark.asyncio
+async def test_writes_after_flush_schedule_another_flush(temp_storage_path, mocker):
+    """Test that mutations after a flush are persisted by the next interval."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path, flush_interval_seconds=0.05)
+    save_spy = mocker.spy(storage, "_PickleStorage__save")
+
+    # Act
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    await asyncio.sleep(0.1)
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    await asyncio.sleep(0.1)
+
+    # Assert
+    assert save_spy.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_writes(temp_storage_path):
+    """Test that closing the storage persists pending mutations immediately."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path, flush_interval_seconds=60)
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    await storage.close()
+
+    # Assert
+    assert (
+        await make_storage("pickle", temp_storage_path).get_one(created.id) == created
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_without_pending_writes_does_not_save(temp_storage_path, mocker):
+    """Test that flushing a clean storage does not rewrite the file."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path, flush_interval_seconds=60)
+    save_spy = mocker.spy(storage, "_PickleStorage__save")
+
+    # Act
+    await storage.flush()
+
+    # Assert
+    save_spy.assert_not_called()
+
+
+def test_flush_outlives_the_event_loop_of_the_write(temp_storage_path):
+    """Test that writes made in a short-lived event loop are still flushed."""
+    # Arrange
+    storage = make_storage("pickle", temp_storage_path, flush_interval_seconds=0.05)
+
+    # Act
+    # As in run.io_bound, where each call runs in its own asyncio.run loop
+    created = asyncio.run(storage.create_one(CreateRepoInfoSchemaFactory.build()))
+    time.sleep(0.2)
+
+    # Assert
+    assert (
+        asyncio.run(make_storage("pickle", temp_storage_path).get_one(created.id))
+        == created
+    )
@@ -0,0 +1,162 @@
+"""Tests for the find queries and conditional deletes of every backend."""
+
+from datetime import datetime
+
+import pytest
+
+from app.domain.query import Condition, Query, SortKey
+from tests.fixtures import CreateRepoInfoSchemaFactory
+
+
+@pytest.fixture
+async def repos(storage):
+    """Store repositories with duplicate and missing sort values."""
+    return await storage.create_many(
+        [
+            CreateRepoInfoSchemaFactory.build(
+                repo="a", owner="o1", open_prs_count=5, oldest_pr=datetime(2024, 1, 3)
+            ),
+            CreateRepoInfoSchemaFactory.build(
+                repo="b", owner="o1", open_prs_count=12, oldest_pr=None
+            ),
+            CreateRepoInfoSchemaFactory.build(
+                repo="c", owner="o2", open_prs_count=12, oldest_pr=datetime(2024, 1, 1)
+            ),
+            CreateRepoInfoSchemaFactory.build(
+                repo="d", owner="o2", open_prs_count=30, oldest_pr=datetime(2024, 1, 2)
+            ),
+            CreateRepoInfoSchemaFactory.build(
+                repo="e", owner="o3", open_prs_count=12, oldest_pr=datetime(2024, 1, 5)
+            ),
+        ]
+    )
+
+
+async def read_all(storage, query: Query, **projection) -> list:
+    """Follow the cursors until the last page."""
+    items = []
+    while True:
+        found = await storage.find(query, **projection)
+        items.extend(found.items)
+        if found.next_cursor is None:
+            return items
+        query = query.model_copy(update={"cursor": found.next_cursor})
+
+
+@pytest.mark.asyncio
+async def test_find_combines_ranges_and_in_lists(storage, repos):
+    """Test that every condition must hold, with values coerced to field types."""
+    # Act
+    found = await storage.find(
+        Query(
+            where={
+                "open_prs_count": Condition(gt=5, lte=30),
+                "owner": Condition(in_=["o1", "o2"]),
+                "oldest_pr": Condition(lt="2024-01-02T00:00:00"),
+            }
+        )
+    )
+
+    # Assert
+    assert [item.repo for item in found.items] == ["c"]
+    assert found.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_find_sorts_with_missing_values_first(storage, repos):
+    """Test that sort keys apply in order, with IDs breaking ties."""
+    # Act
+    by_count = await storage.find(
+        Query(sort=[SortKey(field="open_prs_count", descending=True)])
+    )
+    by_date = await storage.find(Query(sort=[SortKey(field="oldest_pr")]))
+
+    # Assert
+    assert [item.repo for item in by_count.items] == ["d", "b", "c", "e", "a"]
+    assert [item.repo for item in by_date.items] == ["b", "c", "d", "a", "e"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("descending", [False, True])
+async def test_cursor_pages_cover_every_match_once(storage, repos, descending):
+    """Test that pages follow each other without gaps, even across writes."""
+    # Arrange
+    sort = [
+        SortKey(field="open_prs_count", descending=descending),
+        SortKey(field="oldest_pr", descending=descending),
+    ]
+    expected = await storage.find(Query(sort=sort))
+
+    # Act
+    first = await storage.find(Query(sort=sort, limit=2))
+    # Entities before the cursor do not shift the following pages
+    await storage.delete_one(first.items[0].id)
+    rest = await read_all(storage, Query(sort=sort, limit=2, cursor=first.next_cursor))
+
+    # Assert
+    assert [item.id for item in [*first.items, *rest]] == [
+        item.id for item in expected.items
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cursor_works_with_sort_fields_projected_out(storage, repos):
+    """Test that projections apply to the items but not to the cursor."""
+    # Act
+    items = await read_all(
+        storage,
+        Query(sort=[SortKey(field="oldest_pr")], limit=2),
+        include={"repo"},
+    )
+
+    # Assert
+    assert [item.repo for item in items] == ["b", "c", "d", "a", "e"]
+    assert all(item.oldest_pr is None for item in items)
+
+
+@pytest.mark.asyncio
+async def test_find_rejects_unknown_fields_and_foreign_cursors(storage, repos):
+    """Test that invalid queries raise ValueError."""
+    # Arrange
+    found = await storage.find(Query(sort=[SortKey(field="repo")], limit=1))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Unknown query fields"):
+        await storage.find(Query(where={"missing": Condition(eq=1)}))
+    with pytest.raises(ValueError, match="does not match"):
+        await storage.find(Query(cursor=found.next_cursor))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await storage.find(Query(cursor="not a cursor"))
+
+
+@pytest.mark.asyncio
+async def test_find_queries_computed_fields(storage, repos):
+    """Test that computed fields can be filtered and sorted on under projection."""
+    # Act
+    items = await read_all(
+        storage,
+        Query(
+            where={"full_name": Condition(in_=["github/o2/d", "github/o1/a"])},
+            sort=[SortKey(field="full_name", descending=True)],
+            limit=1,
+        ),
+        include={"open_prs_count"},
+    )
+
+    # Assert
+    assert [item.open_prs_count for item in items] == [30, 5]
+
+
+@pytest.mark.asyncio
+async def test_delete_many_deletes_only_entities_meeting_the_conditions(storage, repos):
+    """Test that a conditional delete keeps the given entities it does not match."""
+    # Act
+    deleted = await storage.delete_many(
+        [repo.id for repo in repos],
+        where={"oldest_pr": Condition(lte=datetime(2024, 1, 2))},
+    )
+
+    # Assert
+    assert deleted == 2
+    remaining = await storage.get_many_by_ids([repo.id for repo in repos])
+    assert [repo.repo for repo in remaining] == ["a", "b", "e"]
@@ -0,0 +1,358 @@
+"""Tests for RemoteStorage, run against the built-in cache server."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.adapters.storage.remote_storage import RemoteStorage, WriteConflictError
+from app.domain.query import Query, SortKey
+from app.infrastructure import schemas
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+async def nodes(cache_server):
+    """Create two storage nodes sharing the server."""
+    nodes = (
+        make_storage("remote", port=cache_server.port),
+        make_storage("remote", port=cache_server.port),
+    )
+    yield nodes
+    for node in nodes:
+        await node.close()
+
+
+@pytest.fixture
+def storage(nodes):
+    """Use the first node on its own."""
+    return nodes[0]
+
+
+async def wait_until_subscribed(node: RemoteStorage) -> None:
+    """Wait for the node to receive invalidations, so that it caches reads."""
+    await node.get_one(0)
+    await asyncio.to_thread(node._RemoteStorage__subscribed.wait, 5)
+
+
+async def eventually(check, timeout: float = 5) -> None:
+    """Poll an async check until it holds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await check():
+        assert asyncio.get_running_loop().time() < deadline, "Condition not met"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_create_get_update_and_delete(storage: RemoteStorage):
+    """Test that entities round-trip through the server."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+
+    # Act
+    created = await storage.create_one(schema)
+    fetched = await storage.get_one(created.id)
+    updated = await storage.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(open_prs_count=3)
+    )
+    deleted = await storage.delete_one(created.id)
+
+    # Assert
+    assert created.id == 1
+    assert fetched == created
+    assert updated.open_prs_count == 3
+    assert updated.closed_prs_count == schema.closed_prs_count
+    assert deleted is True
+    assert await storage.get_one(created.id) is None
+    assert await storage.delete_one(created.id) is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("indexed_fields", [["full_name", "owner"], []])
+async def test_get_many_matches_any_filter_field(cache_server, indexed_fields):
+    """Test that filters match through indexes or scans, paginated by ID."""
+    # Arrange
+    storage = make_storage(
+        "remote", port=cache_server.port, indexed_fields=indexed_fields
+    )
+    await storage.create_many(
+        [
+            CreateRepoInfoSchemaFactory.build(owner=f"owner{i % 2}", repo=f"repo{i}")
+            for i in range(5)
+        ]
+    )
+
+    # Act
+    by_owner = await storage.get_many(
+        schemas.FilterRepoInfoSchema(owner="owner1"), include={"repo"}
+    )
+    by_any = await storage.get_many(
+        schemas.FilterRepoInfoSchema(owner="owner1", full_name="github/owner0/repo0"),
+        skip=1,
+        limit=2,
+    )
+    await storage.close()
+
+    # Assert
+    assert [repo.repo for repo in by_owner] == ["repo1", "repo3"]
+    assert by_owner[0].owner is None
+    assert [repo.repo for repo in by_any] == ["repo1", "repo3"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_keeps_the_given_order(storage: RemoteStorage):
+    """Test that batch reads return the found entities in the requested order."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=3))
+
+    # Act
+    found = await storage.get_many_by_ids([created[2].id, 999, created[0].id])
+
+    # Assert
+    assert found == [created[2], created[0]]
+
+
+@pytest.mark.asyncio
+async def test_nodes_share_entities(nodes):
+    """Test that an entity stored by one node is found by the other."""
+    # Arrange
+    first, second = nodes
+    created = await first.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    found = await second.get_many(
+        schemas.FilterRepoInfoSchema(full_name=created.full_name)
+    )
+
+    # Assert
+    assert found == [created]
+
+
+@pytest.mark.asyncio
+async def test_upsert_from_both_nodes_updates_the_same_entity(nodes):
+    """Test that upserts on the key reuse the entity created by another node."""
+    # Arrange
+    first, second = nodes
+    schema, other = CreateRepoInfoSchemaFactory.batch(size=2)
+    created = await first.upsert_one(schema, key="full_name")
+
+    # Act
+    upserted = await second.upsert_one(schema, key="full_name")
+    both = await second.upsert_many([other, schema], key="full_name")
+
+    # Assert
+    assert upserted.id == created.id
+    assert upserted.created_at == created.created_at
+    assert both[1].id == created.id
+    assert both[0].id not in {created.id}
+    assert len(await first.get_many(None)) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_of_a_new_key_create_one_entity(nodes):
+    """Test that nodes upserting the same new repositories at once agree on them."""
+    # Arrange
+    first, second = nodes
+    schemas_ = CreateRepoInfoSchemaFactory.batch(size=20)
+
+    # Act
+    from_first, from_second = await asyncio.gather(
+        first.upsert_many(schemas_, key="full_name"),
+        second.upsert_many(schemas_, key="full_name"),
+    )
+
+    # Assert
+    assert [entity.id for entity in from_first] == [entity.id for entity in from_second]
+    assert len(await first.get_many(None)) == 20
+
+
+@pytest.mark.asyncio
+async def test_upserting_a_new_key_twice_in_a_batch_indexes_it(
+    storage: RemoteStorage,
+):
+    """Test that an entity created and replaced in one batch is found by its key."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+
+    # Act
+    upserted = await storage.upsert_many(
+        [schema, schema.model_copy(update={"users_count": schema.users_count + 1})],
+        key="full_name",
+    )
+    found = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=upserted[1].full_name)
+    )
+
+    # Assert
+    assert upserted[0].id == upserted[1].id
+    assert found == [upserted[1]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_of_different_fields_are_merged(nodes):
+    """Test that updates from both nodes at once never undo one another."""
+    # Arrange
+    first, second = nodes
+    created = await first.create_one(CreateRepoInfoSchemaFactory.build())
+
+    async def update(node: RemoteStorage, field: str) -> None:
+        for value in range(30):
+            await node.update_one(
+                created.id, schemas.UpdateRepoInfoSchema(**{field: value})
+            )
+
+    # Act
+    await asyncio.gather(update(first, "open_prs_count"), update(second, "users_count"))
+
+    # Assert
+    updated = await second.get_many_by_ids([created.id])
+    assert updated[0].open_prs_count == 29
+    assert updated[0].users_count == 29
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "write",
+    [
+        pytest.param(
+            lambda storage, entity: storage.update_one(
+                entity.id, schemas.UpdateRepoInfoSchema(users_count=1)
+            ),
+            id="update",
+        ),
+        pytest.param(
+            lambda storage, entity: storage.upsert_one(
+                CreateRepoInfoSchemaFactory.build(), key="full_name"
+            ),
+            id="upsert",
+        ),
+        pytest.param(
+            lambda storage, entity: storage.delete_one(entity.id), id="delete"
+        ),
+    ],
+)
+async def test_writes_give_up_when_they_keep_conflicting(cache_server, mocker, write):
+    """Test that writes retry a bounded number of times before raising."""
+    # Arrange
+    storage = make_storage("remote", port=cache_server.port, max_write_attempts=3)
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    client = storage._RemoteStorage__client
+    # Every transaction is aborted, as if another node always wrote first
+    transaction = mocker.patch.object(client, "transaction", return_value=None)
+
+    # Act & Assert
+    with pytest.raises(WriteConflictError):
+        await write(storage, created)
+    assert transaction.call_count == 3
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_until_another_node_writes(nodes):
+    """Test that cached entities are evicted by the writes of other nodes."""
+    # Arrange
+    first, second = nodes
+    created = await first.create_one(CreateRepoInfoSchemaFactory.build())
+    await wait_until_subscribed(second)
+    await second.get_one(created.id)
+    hits = second.cache_stats.hits
+
+    # Act
+    await second.get_one(created.id)
+    await first.update_one(created.id, schemas.UpdateRepoInfoSchema(users_count=42))
+
+    # Assert
+    assert second.cache_stats.hits == hits + 1
+
+    async def sees_update():
+        return (await second.get_one(created.id)).users_count == 42
+
+    await eventually(sees_update)
+
+
+@pytest.mark.asyncio
+async def test_deletes_of_another_node_are_seen(nodes):
+    """Test that a node stops serving an entity deleted by another node."""
+    # Arrange
+    first, second = nodes
+    created = await first.create_one(CreateRepoInfoSchemaFactory.build())
+    await wait_until_subscribed(second)
+    await second.get_one(created.id)
+
+    # Act
+    await first.delete_many([created.id])
+
+    # Assert
+    async def sees_delete():
+        return await second.get_one(created.id) is None
+
+    await eventually(sees_delete)
+    assert await second.get_many(None) == []
+
+
+@pytest.mark.asyncio
+async def test_reads_overtaken_by_a_write_are_not_cached(nodes, mocker):
+    """Test that an entity another node writes while it is being read stays fresh."""
+    # Arrange
+    first, second = nodes
+    created = await second.create_one(CreateRepoInfoSchemaFactory.build())
+    await wait_until_subscribed(first)
+    loop = asyncio.get_running_loop()
+    discard = mocker.spy(first._RemoteStorage__cache, "discard")
+    client = first._RemoteStorage__client
+    pipeline = client.pipeline
+
+    def pipeline_then_write(commands):
+        # The other node writes after the MGET, and the invalidation arrives first
+        replies = pipeline(commands)
+        update = schemas.UpdateRepoInfoSchema(users_count=42)
+        asyncio.run_coroutine_threadsafe(
+            second.update_one(created.id, update), loop
+        ).result()
+        deadline = time.monotonic() + 5
+        while mocker.call(created.id) not in discard.call_args_list:
+            assert time.monotonic() < deadline, "Invalidation not received"
+            time.sleep(0.01)
+        return replies
+
+    mocker.patch.object(client, "pipeline", side_effect=pipeline_then_write)
+
+    # Act
+    stale = await first.get_one(created.id)
+    mocker.patch.object(client, "pipeline", side_effect=pipeline)
+    fresh = await first.get_one(created.id)
+
+    # Assert
+    assert stale.users_count == created.users_count
+    assert fresh.users_count == 42
+
+
+@pytest.mark.asyncio
+async def test_find_reads_entities_until_the_page_is_full(nodes, mocker):
+    """Test that an unsorted page stops reading once full and sorted ones still merge."""
+    # Arrange
+    first, second = nodes
+    mocker.patch("app.adapters.storage.remote_storage.MGET_CHUNK", 2)
+    created = await second.create_many(CreateRepoInfoSchemaFactory.batch(10))
+    pipeline = mocker.spy(first._RemoteStorage__client, "pipeline")
+
+    # Act
+    unsorted = await first.find(Query(limit=3))
+    read = [
+        key
+        for call in pipeline.call_args_list
+        for command, *keys in call.args[0]
+        if command == "MGET"
+        for key in keys
+    ]
+    following = await first.find(Query(limit=3, cursor=unsorted.next_cursor))
+    by_stars = await first.find(
+        Query(sort=[SortKey(field="open_prs_count", descending=True)], limit=3)
+    )
+
+    # Assert
+    assert [repo.id for repo in unsorted.items] == [repo.id for repo in created[:3]]
+    assert len(read) == 4
+    assert [repo.id for repo in following.items] == [repo.id for repo in created[3:6]]
+    expected = sorted(created, key=lambda repo: (-repo.open_prs_count, repo.id))
+    assert [repo.id for repo in by_stars.items] == [repo.id for repo in expected[:3]]
@@ -0,0 +1,79 @@
+"""Tests for RespClient transactions, run against the built-in cache server."""
+
+import asyncio
+
+import pytest
+
+from app.adapters.storage.resp import RespClient
+
+
+@pytest.fixture
+def clients(cache_server):
+    """Create two clients connected to the server."""
+    clients = (
+        RespClient("127.0.0.1", cache_server.port),
+        RespClient("127.0.0.1", cache_server.port),
+    )
+    yield clients
+    for client in clients:
+        client.close()
+
+
+def run(func, *args):
+    """Run a blocking client call off the event loop serving the server."""
+    return asyncio.to_thread(func, *args)
+
+
+@pytest.mark.asyncio
+async def test_transaction_aborts_when_a_watched_key_was_written(clients):
+    """Test that EXEC runs nothing once another client wrote a watched key."""
+    # Arrange
+    first, second = clients
+
+    def watch_then_write():
+        with first.watch("counter"):
+            second.execute("INCRBY", "counter", 5)
+            return first.transaction([("SET", "counter", 1)])
+
+    # Act
+    aborted = await run(watch_then_write)
+
+    # Assert
+    assert aborted is None
+    assert await run(first.execute, "GET", "counter") == b"5"
+
+
+@pytest.mark.asyncio
+async def test_transaction_runs_when_watched_keys_are_unchanged(clients):
+    """Test that watched keys left alone, or written by the client, let EXEC run."""
+    # Arrange
+    first, second = clients
+
+    def watch_then_transact():
+        with first.watch("counter", "other"):
+            second.execute("SET", "unwatched", 1)
+            return first.transaction([("INCRBY", "counter", 2)])
+
+    # Act
+    replies = await run(watch_then_transact)
+
+    # Assert
+    assert replies == [2]
+
+
+@pytest.mark.asyncio
+async def test_watch_ends_without_transaction(clients):
+    """Test that keys are unwatched when the block exits without a transaction."""
+    # Arrange
+    first, second = clients
+
+    def watch_without_transaction():
+        with first.watch("counter"):
+            second.execute("SET", "counter", 1)
+        return first.transaction([("SET", "counter", 2)])
+
+    # Act
+    replies = await run(watch_without_transaction)
+
+    # Assert
+    assert replies == ["OK"]
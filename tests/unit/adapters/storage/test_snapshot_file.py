@@ -0,0 +1,81 @@
+"""Tests for SnapshotFile."""
+
+import pytest
+
+from app.adapters.storage.snapshot_file import SnapshotFile
+
+
+async def batches(*items):
+    """Yield the given batches asynchronously."""
+    for batch in items:
+        yield batch
+
+
+async def read_all(snapshot: SnapshotFile) -> list:
+    """Read every batch of the snapshot."""
+    return [batch async for batch in snapshot.read()]
+
+
+@pytest.mark.asyncio
+async def test_write_and_read_back_batches(tmp_path):
+    """Test that batches round-trip and a new write replaces the snapshot."""
+    # Arrange
+    snapshot = SnapshotFile(tmp_path / "snapshot")
+
+    # Act
+    first = await snapshot.write(batches([{"a": 1}, {"b": [1, 2]}], [{"c": None}]))
+    read_first = await read_all(snapshot)
+    second = await snapshot.write(batches([{"d": "x"}]))
+    read_second = await read_all(snapshot)
+
+    # Assert
+    assert first == 3
+    assert read_first == [[{"a": 1}, {"b": [1, 2]}], [{"c": None}]]
+    assert second == 1
+    assert read_second == [[{"d": "x"}]]
+    assert not (tmp_path / "snapshot.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_missing_snapshot_reads_nothing(tmp_path):
+    """Test that reading without a snapshot yields no batch."""
+    # Arrange
+    snapshot = SnapshotFile(tmp_path / "missing")
+
+    # Act & Assert
+    assert await read_all(snapshot) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_previous_snapshot(tmp_path):
+    """Test that a write interrupted by an error leaves the snapshot untouched."""
+    # Arrange
+    snapshot = SnapshotFile(tmp_path / "snapshot")
+    await snapshot.write(batches([{"a": 1}]))
+
+    async def failing():
+        yield [{"b": 2}]
+        raise RuntimeError("storage unavailable")
+
+    # Act
+    with pytest.raises(RuntimeError):
+        await snapshot.write(failing())
+
+    # Assert
+    assert await read_all(snapshot) == [[{"a": 1}]]
+    assert not (tmp_path / "snapshot.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_reading_stops_at_corrupted_batch(tmp_path):
+    """Test that batches before a corrupted one are still read."""
+    # Arrange
+    path = tmp_path / "snapshot"
+    snapshot = SnapshotFile(path)
+    await snapshot.write(batches([{"a": 1}], [{"b": 2}]))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    # Act & Assert
+    assert await read_all(snapshot) == [[{"a": 1}]]
@@ -0,0 +1,262 @@
+"""Tests for SqliteStorage."""
+
+import sqlite3
+
+import pytest
+
+from app.adapters.storage.sqlite_storage import MAX_PARAMS, SqliteStorage
+from app.domain import entities
+from app.infrastructure import schemas
+from tests.fixtures import (
+    CreateRepoInfoSchemaFactory,
+    TimeseriesDataPointFactory,
+    make_storage,
+)
+
+
+@pytest.fixture
+def temp_storage_path(tmp_path):
+    """Create a temporary storage path."""
+    return tmp_path / "test_storage.sqlite3"
+
+
+@pytest.fixture
+def storage(temp_storage_path):
+    """Create a storage instance."""
+    return make_storage("sqlite", temp_storage_path)
+
+
+@pytest.mark.asyncio
+async def test_create_and_get_one(storage: SqliteStorage):
+    """Test that a created entity round-trips through SQLite."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build(
+        open_prs=TimeseriesDataPointFactory.batch(size=2)
+    )
+
+    # Act
+    created = await storage.create_one(schema)
+    result = await storage.get_one(created.id)
+
+    # Assert
+    assert created.id == 1
+    assert result == created
+    assert result.open_prs == schema.open_prs
+
+
+@pytest.mark.asyncio
+async def test_get_one_non_existing(storage: SqliteStorage):
+    """Test getting a non-existing entity."""
+    # Act & Assert
+    assert await storage.get_one(999) is None
+
+
+@pytest.mark.asyncio
+async def test_get_many_with_filter_and_pagination(storage: SqliteStorage):
+    """Test filtering by an indexed column and paginating."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=5))
+
+    # Act
+    filtered = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=created[1].full_name)
+    )
+    page = await storage.get_many(None, skip=1, limit=2)
+
+    # Assert
+    assert filtered == [created[1]]
+    assert [entity.id for entity in page] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_get_many_with_empty_filter(storage: SqliteStorage):
+    """Test that a filter without values matches nothing, like PickleStorage."""
+    # Arrange
+    await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    result = await storage.get_many(schemas.FilterRepoInfoSchema())
+
+    # Assert
+    assert result == []
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_preserves_order(storage: SqliteStorage):
+    """Test getting entities by ids in the requested order."""
+    # Arrange
+    await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=3))
+
+    # Act
+    result = await storage.get_many_by_ids([3, 999, 1])
+
+    # Assert
+    assert [entity.id for entity in result] == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_binds_ids_in_chunks(storage: SqliteStorage):
+    """Test that batch reads over the SQLite parameter limit still find every ID."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=3))
+    missing = list(range(1000, 1000 + 2 * MAX_PARAMS))
+
+    # Act
+    result = await storage.get_many_by_ids([3, *missing, 1, 2], include={"owner"})
+
+    # Assert
+    assert [entity.id for entity in result] == [3, 1, 2]
+    assert result[0].owner == created[2].owner
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_replaces_in_place_keeping_id(storage: SqliteStorage):
+    """Test that upsert replaces the row sharing the key and keeps its id."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+    created = await storage.create_one(schema)
+    refreshed = schema.model_copy(update={"open_prs_count": 42})
+
+    # Act
+    result = await storage.upsert_one(refreshed, key="full_name")
+
+    # Assert
+    assert result.id == created.id
+    assert result.created_at == created.created_at
+    assert result.updated_at is not None
+    assert (await storage.get_one(created.id)).open_prs_count == 42
+    assert len(await storage.get_many(None)) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_one(storage: SqliteStorage):
+    """Test updating an existing and a missing entity."""
+    # Arrange
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    update_schema = schemas.UpdateRepoInfoSchema(open_prs_count=99)
+
+    # Act
+    result = await storage.update_one(created.id, update_schema)
+    missing = await storage.update_one(999, update_schema)
+
+    # Assert
+    assert result.open_prs_count == 99
+    assert result.updated_at is not None
+    assert (await storage.get_one(created.id)).open_prs_count == 99
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_delete_one(storage: SqliteStorage):
+    """Test deleting an existing and a missing entity."""
+    # Arrange
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act & Assert
+    assert await storage.delete_one(created.id) is True
+    assert await storage.delete_one(created.id) is False
+    assert await storage.get_one(created.id) is None
+
+
+@pytest.mark.asyncio
+async def test_persistence_across_instances(temp_storage_path):
+    """Test that data persists across storage instances."""
+    # Arrange
+    created = await make_storage("sqlite", temp_storage_path).create_one(
+        CreateRepoInfoSchemaFactory.build()
+    )
+
+    # Act
+    result = await make_storage("sqlite", temp_storage_path).get_one(created.id)
+
+    # Assert
+    assert result == created
+
+
+@pytest.mark.asyncio
+async def test_uses_wal_mode_and_indexes(storage: SqliteStorage, temp_storage_path):
+    """Test that the database is in WAL mode and full_name lookups use an index."""
+    # Arrange
+    await storage.get_many(None)
+    connection = sqlite3.connect(temp_storage_path)
+
+    # Act
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM repo_info WHERE full_name = ?", ["x"]
+    ).fetchall()
+
+    # Assert
+    assert journal_mode == "wal"
+    assert "ix_repo_info_full_name" in str(plan)
+
+
+@pytest.mark.asyncio
+async def test_projection_leaves_out_excluded_fields(storage):
+    """Test that include/exclude projections are applied on every read."""
+    # Arrange
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+    timeseries = {"open_prs", "closed_prs", "users"}
+
+    # Act
+    summary = await storage.get_one(created.id, exclude=timeseries)
+    [by_id] = await storage.get_many_by_ids([created.id], exclude=timeseries)
+    [named] = await storage.get_many(None, include={"provider", "owner", "repo"})
+
+    # Assert
+    assert summary.open_prs is None
+    assert summary.open_prs_count == created.open_prs_count
+    assert by_id.model_dump(exclude=timeseries) == created.model_dump(
+        exclude=timeseries
+    )
+    assert (named.id, named.full_name) == (created.id, created.full_name)
+    assert named.open_prs_count is None
+    assert named.open_prs is None
+
+
+@pytest.mark.asyncio
+async def test_trusted_hydration_reads_same_entities(temp_storage_path):
+    """Test that trusted hydration rebuilds entities equal to validated ones."""
+    # Arrange
+    created = await make_storage("sqlite", temp_storage_path).create_one(
+        CreateRepoInfoSchemaFactory.build(
+            open_prs=TimeseriesDataPointFactory.batch(size=2)
+        )
+    )
+
+    # Act
+    result = await make_storage(
+        "sqlite", temp_storage_path, trusted_hydration=True
+    ).get_one(created.id)
+
+    # Assert
+    assert result == created
+    assert isinstance(result.open_prs[0], entities.TimeseriesDataPoint)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_upsert_and_delete(storage: SqliteStorage):
+    """Test that bulk writes match the single entity ones."""
+    # Arrange
+    first, second, third = CreateRepoInfoSchemaFactory.batch(size=3)
+    created = await storage.create_many([first, second])
+
+    # Act
+    upserted = await storage.upsert_many(
+        [
+            second.model_copy(update={"users_count": 7}),
+            third,
+            third.model_copy(update={"users_count": 9}),
+        ],
+        key="full_name",
+    )
+    deleted = await storage.delete_many([created[0].id, created[0].id, 12345])
+
+    # Assert
+    assert len({entity.id for entity in created}) == 2
+    assert upserted[0].id == created[1].id
+    assert upserted[0].users_count == 7
+    assert upserted[1].id == upserted[2].id
+    assert (await storage.get_one(upserted[2].id)).users_count == 9
+    assert deleted == 1
+    assert await storage.get_one(created[0].id) is None
@@ -0,0 +1,81 @@
+"""Tests for the storage executor and loop-blocking measurements."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.adapters.storage.executor import (
+    LoopBlockingStats,
+    StorageExecutor,
+    measure_loop_blocking,
+)
+from app.adapters.storage.pickle_storage import PickleStorage
+from tests.fixtures import make_storage
+
+
+class SampleAdapter:
+    """Adapter measuring a blocking step followed by an await."""
+
+    def __init__(self) -> None:
+        self.loop_blocking_stats = LoopBlockingStats()
+
+    @measure_loop_blocking
+    async def operation(self) -> str:
+        time.sleep(0.02)
+        await asyncio.sleep(0.1)
+        return "done"
+
+
+@pytest.mark.asyncio
+async def test_measure_loop_blocking_excludes_awaits():
+    """Test that only the time spent on the loop is recorded."""
+    # Arrange
+    adapter = SampleAdapter()
+
+    # Act
+    result = await adapter.operation()
+
+    # Assert
+    stats = adapter.loop_blocking_stats.snapshot()["operation"]
+    assert result == "done"
+    assert stats["calls"] == 1
+    assert 0.02 <= stats["total_seconds"] < 0.1
+    assert stats["max_seconds"] == stats["total_seconds"]
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_off_the_loop_thread():
+    """Test that work submitted to the executor runs on its own thread."""
+    # Arrange
+    executor = StorageExecutor(name="test-storage")
+
+    # Act
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+    executor.shutdown()
+
+    # Assert
+    assert thread_name.startswith("test-storage")
+    assert thread_name != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_pickle_storage_loads_on_first_use(tmp_path, mocker):
+    """Test that the pickle file is not read by the constructor."""
+    # Arrange
+    path = tmp_path / "lazy.pickle"
+    path.write_bytes(b"")
+    load_spy = mocker.spy(PickleStorage, "_PickleStorage__load")
+
+    # Act
+    storage = make_storage("pickle", path)
+    calls_after_init = load_spy.call_count
+    path.unlink()
+    result = await storage.get_many(None)
+
+    # Assert
+    assert calls_after_init == 0
+    assert load_spy.call_count == 1
+    assert result == []
+    assert "get_many" in storage.loop_blocking_stats.snapshot()
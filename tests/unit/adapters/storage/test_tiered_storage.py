@@ -0,0 +1,167 @@
+"""Tests for TieredStorage."""
+
+import pytest
+
+from app.adapters.storage.tiered_storage import TieredStorage
+from app.infrastructure import schemas
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    """Create a storage instance demoting every entity not read since a rebalance."""
+    storage = make_storage("tiered", tmp_path / "tiers", cold_after_seconds=0)
+    yield storage
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_create_get_update_and_delete(storage: TieredStorage):
+    """Test that entities round-trip through the warm tier."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+
+    # Act
+    created = await storage.create_one(schema)
+    fetched = await storage.get_one(created.id, include={"repo"})
+    updated = await storage.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(open_prs_count=3)
+    )
+    deleted = await storage.delete_one(created.id)
+
+    # Assert
+    assert created.id == 1
+    assert fetched.repo == schema.repo
+    assert fetched.owner is None
+    assert updated.open_prs_count == 3
+    assert updated.closed_prs_count == schema.closed_prs_count
+    assert deleted is True
+    assert await storage.get_one(created.id) is None
+    assert storage.tier_stats.warm_entities == 0
+
+
+@pytest.mark.asyncio
+async def test_frequently_read_entities_are_served_from_memory(storage: TieredStorage):
+    """Test that entities read often enough are admitted to the hot tier."""
+    # Arrange
+    created = await storage.create_one(CreateRepoInfoSchemaFactory.build())
+
+    # Act
+    for _ in range(3):
+        await storage.get_one(created.id)
+    updated = await storage.update_one(
+        created.id, schemas.UpdateRepoInfoSchema(users_count=42)
+    )
+    fetched = await storage.get_one(created.id)
+
+    # Assert
+    stats = storage.tier_stats.snapshot()
+    assert stats["warm_reads"] == 2
+    assert stats["hot_reads"] == 2
+    assert stats["admissions"] == 1
+    assert stats["hot_entities"] == 1
+    # Writes refresh the hot copy
+    assert fetched == updated
+
+
+@pytest.mark.asyncio
+async def test_unread_entities_are_demoted_and_promoted_when_read(
+    storage: TieredStorage, tmp_path
+):
+    """Test that rebalances archive unread entities until they are read again."""
+    # Arrange
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=3))
+
+    # Act
+    demoted = await storage.rebalance()
+    scanned = await storage.get_many(None)
+    fetched = await storage.get_many(
+        schemas.FilterRepoInfoSchema(full_name=created[1].full_name)
+    )
+
+    # Assert
+    assert demoted == 3
+    assert len(list((tmp_path / "tiers" / "cold").iterdir())) == 1
+    # Scans read cold entities in place
+    assert scanned == created
+    assert fetched == [created[1]]
+    stats = storage.tier_stats.snapshot()
+    assert stats["cold_reads"] == 1
+    assert stats["promotions"] == 1
+    assert stats["warm_entities"] == 1
+    assert stats["cold_entities"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hot_entities_stay_warm(storage: TieredStorage):
+    """Test that entities held in memory are not demoted."""
+    # Arrange
+    hot, cold = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=2))
+    for _ in range(2):
+        await storage.get_many_by_ids([hot.id])
+
+    # Act
+    demoted = await storage.rebalance()
+
+    # Assert
+    assert demoted == 1
+    assert storage.tier_stats.warm_entities == 1
+    assert await storage.get_one(cold.id) == cold
+
+
+@pytest.mark.asyncio
+async def test_segments_are_deleted_once_emptied(storage: TieredStorage, tmp_path):
+    """Test that segments whose entities were all promoted or deleted are removed."""
+    # Arrange
+    schemas_ = CreateRepoInfoSchemaFactory.batch(size=2)
+    first, second = await storage.create_many(schemas_)
+    await storage.rebalance()
+
+    # Act
+    await storage.delete_one(first.id)
+    await storage.upsert_one(schemas_[1], key="full_name")
+    await storage.get_one(second.id)
+    await storage.rebalance()
+
+    # Assert
+    assert storage.tier_stats.cold_entities == 1
+    assert len(list((tmp_path / "tiers" / "cold").iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_upsert_keeps_the_id_of_cold_entities(storage: TieredStorage):
+    """Test that upserts find entities in every tier."""
+    # Arrange
+    schema = CreateRepoInfoSchemaFactory.build()
+    created = await storage.create_one(schema)
+    await storage.rebalance()
+
+    # Act
+    upserted = await storage.upsert_one(schema, key="full_name")
+
+    # Assert
+    assert upserted.id == created.id
+    assert upserted.created_at == created.created_at
+    assert storage.tier_stats.warm_entities == 1
+    assert storage.tier_stats.cold_entities == 0
+
+
+@pytest.mark.asyncio
+async def test_tiers_survive_restarts(tmp_path):
+    """Test that a new instance reads the catalog and segments of the previous one."""
+    # Arrange
+    path = tmp_path / "tiers"
+    storage = make_storage("tiered", path, cold_after_seconds=0)
+    created = await storage.create_many(CreateRepoInfoSchemaFactory.batch(size=2))
+    await storage.rebalance()
+    await storage.get_one(created[0].id)
+    await storage.close()
+
+    # Act
+    reopened = make_storage("tiered", path)
+    found = await reopened.get_many_by_ids([created[1].id, created[0].id])
+
+    # Assert
+    assert found == [created[1], created[0]]
+    assert reopened.tier_stats.snapshot()["cold_reads"] == 1
+    await reopened.close()
@@ -1,6 +1,18 @@
 """Tests for the dependency injection container."""
 
 import pytest
+
+from app.adapters.storage import (
+    CachedStorage,
+    ColumnarTimeseriesStorage,
+    ExpiringStorage,
+    LogStorage,
+    PickleStorage,
+    RemoteStorage,
+    SnapshotFile,
+    SqliteStorage,
+    TieredStorage,
+)
 from app.containers import Container
 
 
@@ -55,3 +67,94 @@ def test_container_provides_storage():
     # Check that we can get the storage
     storage = container.repo_info_storage()
     assert storage is not None
+
+
+def test_container_selects_storage_backend(tmp_path):
+    """Test that the storage backend is selected through settings."""
+    container = Container()
+    container.config.STORAGE_FOLDER.from_value(str(tmp_path))
+
+    container.config.STORAGE_BACKEND.from_value("pickle")
+    assert isinstance(container.repo_info_backend_storage(), PickleStorage)
+
+    container.config.STORAGE_BACKEND.from_value("sqlite")
+    assert isinstance(container.repo_info_backend_storage(), SqliteStorage)
+
+    container.config.STORAGE_BACKEND.from_value("log")
+    assert isinstance(container.repo_info_backend_storage(), LogStorage)
+
+    container.config.STORAGE_BACKEND.from_value("tiered")
+    assert isinstance(container.repo_info_backend_storage(), TieredStorage)
+
+    container.config.STORAGE_BACKEND.from_value("remote")
+    assert isinstance(container.repo_info_backend_storage(), RemoteStorage)
+
+
+def test_container_caches_reads_of_the_backend(tmp_path):
+    """Test that the storage used by the use cases caches the selected backend."""
+    container = Container()
+    container.config.STORAGE_FOLDER.from_value(str(tmp_path))
+    container.config.STORAGE_BACKEND.from_value("sqlite")
+
+    storage = container.repo_info_storage()
+
+    assert isinstance(storage, ExpiringStorage)
+    assert isinstance(storage.storage, CachedStorage)
+    assert isinstance(storage.storage.storage, SqliteStorage)
+
+
+@pytest.mark.parametrize(
+    "backend, storage_class",
+    [("pickle", PickleStorage), ("tiered", TieredStorage), ("remote", RemoteStorage)],
+)
+def test_container_does_not_cache_backends_reading_from_memory(
+    tmp_path, backend, storage_class
+):
+    """Test that backends serving fresh reads from memory are used directly."""
+    container = Container()
+    container.config.STORAGE_FOLDER.from_value(str(tmp_path))
+    container.config.STORAGE_BACKEND.from_value(backend)
+
+    storage = container.repo_info_storage()
+
+    assert isinstance(storage, ExpiringStorage)
+    assert isinstance(storage.storage, storage_class)
+
+
+def test_container_provides_snapshot_use_cases(tmp_path):
+    """Test that snapshot use cases share the snapshot file from settings."""
+    container = Container()
+    container.config.STORAGE_FOLDER.from_value(str(tmp_path))
+    container.config.STORAGE_SNAPSHOT_PATH.from_value(str(tmp_path / "snapshot"))
+
+    assert container.export_snapshot_use_case() is not None
+    assert container.import_snapshot_use_case() is not None
+    assert isinstance(container.repo_snapshot(), SnapshotFile)
+
+
+@pytest.mark.parametrize(
+    "backend, timeseries_class",
+    [("sqlite", ColumnarTimeseriesStorage), ("remote", type(None))],
+)
+def test_container_shares_the_timeseries_storage_of_the_backend(
+    tmp_path, backend, timeseries_class
+):
+    """Test that every timeseries reader and writer uses the same storage."""
+    container = Container()
+    container.config.STORAGE_FOLDER.from_value(str(tmp_path))
+    container.config.STORAGE_SNAPSHOT_PATH.from_value(str(tmp_path / "snapshot"))
+    container.config.STORAGE_BACKEND.from_value(backend)
+
+    users = [
+        container.repo_info_storage(),
+        container.get_repo_info_by_source_use_case(),
+        container.get_repo_timeseries_by_id_use_case(),
+        container.export_snapshot_use_case(),
+        container.import_snapshot_use_case(),
+    ]
+    timeseries = [
+        getattr(user, f"_{type(user).__name__}__timeseries") for user in users
+    ]
+
+    assert isinstance(timeseries[0], timeseries_class)
+    assert all(storage is timeseries[0] for storage in timeseries)
@@ -0,0 +1,73 @@
+"""Tests for the comparison page."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from dependency_injector import providers
+from nicegui.testing import User
+
+from app.containers import Container
+from app.domain import enums
+from app.domain.ports.repo_port import RepoPort
+from app.use_cases import GetRepoInfoBySourceUseCase
+from tests.fixtures import CreateRepoInfoSchemaFactory
+
+
+@pytest.fixture
+def failing_gateway(mocker):
+    """Create a gateway failing like a rate limited GitHub API."""
+    gateway = mocker.AsyncMock(spec=RepoPort)
+    gateway.get_open_pull_requests_count.side_effect = ConnectionError("Rate limit")
+    gateway.get_closed_pull_requests_count.side_effect = ConnectionError("Rate limit")
+    gateway.get_users_count.side_effect = ConnectionError("Rate limit")
+    return gateway
+
+
+@pytest.fixture
+def container(tmp_path, mocker, failing_gateway):
+    """Create the container used by the page, storing under a temporary folder."""
+    container = Container()
+    container.config.from_dict(
+        {"STORAGE_FOLDER": str(tmp_path), "CACHE_COUNTS_TTL_SECONDS": 0}
+    )
+    container.repo_gateway_selector.providers[enums.RepoProvider.GITHUB].override(
+        providers.Object(failing_gateway)
+    )
+    mocker.patch.object(Container, "default", return_value=container)
+    return container
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_renders_stored_repositories(
+    container, user: User, mocker, caplog
+):
+    """Test that the page shows the stored repositories when refreshing them fails."""
+    # Arrange
+    stored = await container.repo_info_storage().create_one(
+        CreateRepoInfoSchemaFactory.build(
+            expires_at=datetime.now() - timedelta(minutes=1)
+        )
+    )
+    mocker.patch.object(GetRepoInfoBySourceUseCase, "execute", return_value=stored)
+    await user.open("/")
+    await user.should_see(marker="owner_input")
+
+    # Act
+    user.find(marker="owner_input").type(stored.owner)
+    user.find(marker="repo_input").type(stored.repo)
+    user.find(marker="add_repository_button").click()
+
+    # Assert
+    await user.should_see(stored.repo)
+    for _ in range(100):
+        if "Cannot refresh expired repositories" in caplog.text:
+            break
+        await asyncio.sleep(0.01)
+    assert [record.message for record in caplog.records] == [
+        "Cannot refresh expired repositories"
+    ]
+    # The error is expected, so it does not fail the user simulation
+    caplog.clear()
+    await user.should_see(stored.repo)
+    await user.should_see(marker="add_repository_button")
@@ -0,0 +1,90 @@
+"""Tests for GetRepoInfoAsOfUseCase and GetRepoMetricTrendUseCase."""
+
+from datetime import datetime
+
+import pytest
+
+from app.adapters.storage import DeltaHistoryStorage
+from app.domain import dto, entities, enums
+from app.use_cases import GetRepoInfoAsOfUseCase, GetRepoMetricTrendUseCase
+
+SOURCE = dto.RepoSourceEntity(provider="github", owner="owner", repo="repo")
+
+
+def make_values(count: int, points: dict[str, int]) -> dict:
+    """Recorded values of a fetch."""
+    return {
+        "open_prs_count": count,
+        "closed_prs_count": 1,
+        "users_count": 1,
+        "oldest_pr": datetime(2023, 1, 1).isoformat(),
+        "open_prs": points,
+        "closed_prs": {},
+        "users": {},
+    }
+
+
+@pytest.fixture
+def history_storage(tmp_path):
+    """Create a history storage."""
+    return DeltaHistoryStorage(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_as_of_rebuilds_repo_info(history_storage):
+    """Test that a past fetch is rebuilt as a repository entity."""
+    # Arrange
+    await history_storage.record(
+        SOURCE.full_name,
+        make_values(1, {"2024-01-02": 2, "2024-01-01": 1}),
+        datetime(2024, 1, 2),
+    )
+    await history_storage.record(
+        SOURCE.full_name, make_values(5, {}), datetime(2024, 2, 1)
+    )
+    use_case = GetRepoInfoAsOfUseCase(history_storage=history_storage)
+
+    # Act
+    result = await use_case.execute(SOURCE, datetime(2024, 1, 15))
+    missing = await use_case.execute(SOURCE, datetime(2023, 1, 1))
+
+    # Assert
+    assert missing is None
+    assert result.full_name == SOURCE.full_name
+    assert result.id is None
+    assert result.open_prs_count == 1
+    assert result.oldest_pr == datetime(2023, 1, 1)
+    assert result.open_prs == [
+        entities.TimeseriesDataPoint(date="2024-01-01", value=1),
+        entities.TimeseriesDataPoint(date="2024-01-02", value=2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trend_lists_metric_changes(history_storage):
+    """Test that the trend of a count lists each of its changes."""
+    # Arrange
+    for day, count in [(1, 1), (2, 1), (3, 4)]:
+        await history_storage.record(
+            SOURCE.full_name, make_values(count, {}), datetime(2024, 1, day)
+        )
+    use_case = GetRepoMetricTrendUseCase(history_storage=history_storage)
+
+    # Act
+    trend = await use_case.execute(SOURCE, enums.RepoMetric.OPEN_PRS_COUNT)
+    oldest = await use_case.execute(SOURCE, enums.RepoMetric.OLDEST_PR)
+
+    # Assert
+    assert trend == [(datetime(2024, 1, 1), 1), (datetime(2024, 1, 3), 4)]
+    assert oldest == [(datetime(2024, 1, 1), datetime(2023, 1, 1))]
+
+
+@pytest.mark.asyncio
+async def test_trend_rejects_timeseries_metrics(history_storage):
+    """Test that timeseries metrics have no trend."""
+    # Arrange
+    use_case = GetRepoMetricTrendUseCase(history_storage=history_storage)
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        await use_case.execute(SOURCE, enums.RepoMetric.OPEN_PRS)
@@ -57,22 +57,17 @@ async def test_execute_returns_items_for_valid_ids(
         created_at=datetime.now(),
     )
 
-    async def get_one_side_effect(id):
-        if id == 1:
-            return entity1
-        elif id == 2:
-            return entity2
-        return None
-
-    mock_storage.get_one.side_effect = get_one_side_effect
+    mock_storage.get_many_by_ids.return_value = [entity1, entity2]
 
     # Act
     result = await use_case.execute([1, 2])
 
     # Assert
-    assert len(result) == 2
-    assert entity1 in result
-    assert entity2 in result
+    assert result == [entity1, entity2]
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [1, 2], include=None, exclude=None
+    )
+    mock_storage.get_one.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -96,12 +91,10 @@ async def test_execute_filters_out_none_results(
         created_at=datetime.now(),
     )
 
-    async def get_one_side_effect(id):
-        if id == 1:
-            return entity1
-        return None
+    async def get_many_by_ids_side_effect(ids, **projection):
+        return [entity1 for id in ids if id == 1]
 
-    mock_storage.get_one.side_effect = get_one_side_effect
+    mock_storage.get_many_by_ids.side_effect = get_many_by_ids_side_effect
 
     # Act
     result = await use_case.execute([1, 999])
@@ -121,7 +114,7 @@ async def test_execute_handles_empty_list(
 
     # Assert
     assert result == []
-    mock_storage.get_one.assert_not_called()
+    mock_storage.get_many_by_ids.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -145,14 +138,30 @@ async def test_execute_handles_duplicate_ids(
         created_at=datetime.now(),
     )
 
-    mock_storage.get_one.return_value = entity1
+    mock_storage.get_many_by_ids.return_value = [entity1]
 
     # Act
     result = await use_case.execute([1, 1, 1])
 
     # Assert
     assert len(result) == 1
-    mock_storage.get_one.assert_called_once_with(1)
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [1], include=None, exclude=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_preserves_request_order(
+    use_case: GetRepoInfoByIdUseCase, mock_storage: MockerFixture
+):
+    """Test that execute deduplicates IDs while keeping the caller's order."""
+    # Act
+    await use_case.execute([3, 1, 3, 2, 1])
+
+    # Assert
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [3, 1, 2], include=None, exclude=None
+    )
 
 
 def test_execute_sync_calls_execute(
@@ -174,10 +183,24 @@ def test_execute_sync_calls_execute(
         users=[],
         created_at=datetime.now(),
     )
-    mock_storage.get_one.return_value = entity1
+    mock_storage.get_many_by_ids.return_value = [entity1]
 
     # Act
     result = use_case.execute_sync([1])
 
     # Assert
     assert len(result) == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_passes_projection_to_storage(
+    use_case: GetRepoInfoByIdUseCase, mock_storage: MockerFixture
+):
+    """Test that execute pushes the projection down to the storage."""
+    # Act
+    await use_case.execute([1], exclude={"open_prs"})
+
+    # Assert
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [1], include=None, exclude={"open_prs"}
+    )
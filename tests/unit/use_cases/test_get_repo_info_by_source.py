@@ -38,7 +38,7 @@ def mock_storage(mocker: MockerFixture):
     """Mock storage."""
     storage = mocker.AsyncMock()
     storage.get_many.return_value = []
-    storage.create_one.return_value = entities.RepoInfoEntity(
+    storage.upsert_one.return_value = entities.RepoInfoEntity(
         id=1,
         provider="github",
         owner="test_owner",
@@ -93,7 +93,7 @@ async def test_execute_fetches_from_gateway_when_not_in_storage(
     mock_gateway.get_users_count.assert_called_once_with(
         owner="test_owner", repo="test_repo"
     )
-    mock_storage.create_one.assert_called_once()
+    mock_storage.upsert_one.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -131,7 +131,7 @@ async def test_execute_returns_from_storage_when_cache_valid(
     assert result == cached_entity
     mock_storage.get_many.assert_called_once()
     mock_gateway.get_open_pull_requests_count.assert_not_called()
-    mock_storage.create_one.assert_not_called()
+    mock_storage.upsert_one.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -158,7 +158,7 @@ def test_execute_sync_calls_execute(
     # Arrange
     mock_storage = mocker.AsyncMock()
     mock_storage.get_many.return_value = []
-    mock_storage.create_one.return_value = entities.RepoInfoEntity(
+    mock_storage.upsert_one.return_value = entities.RepoInfoEntity(
         id=1,
         provider="github",
         owner="test_owner",
@@ -188,3 +188,108 @@ def test_execute_sync_calls_execute(
 
     # Assert
     assert result is not None
+
+
+@pytest.mark.asyncio
+async def test_execute_moves_timeseries_to_timeseries_storage(
+    mocker: MockerFixture,
+    mock_gateway_selector,
+    mock_gateway: AsyncMock,
+    mock_storage: AsyncMock,
+):
+    """Test that timeseries are written apart and entities keep empty lists."""
+    # Arrange
+    timeseries_storage = mocker.AsyncMock()
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=mock_storage,
+        timeseries_storage=timeseries_storage,
+    )
+    mock_gateway.get_timeseries_users.return_value = {datetime(2024, 1, 1): 4}
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+
+    # Act
+    await use_case.execute(source)
+
+    # Assert
+    created = mock_storage.upsert_one.call_args.args[0]
+    assert created.users == []
+    timeseries_storage.write.assert_called_once_with(
+        1,
+        {
+            "open_prs": [],
+            "closed_prs": [],
+            "users": [entities.TimeseriesDataPoint(date="2024-01-01", value=4)],
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_records_fetch_in_history(
+    mocker: MockerFixture,
+    mock_gateway_selector,
+    mock_gateway: AsyncMock,
+    mock_storage: AsyncMock,
+):
+    """Test that fetched values are recorded as a new version of the repository."""
+    # Arrange
+    history_storage = mocker.AsyncMock()
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=mock_storage,
+        timeseries_storage=mocker.AsyncMock(),
+        history_storage=history_storage,
+    )
+    mock_gateway.get_timeseries_users.return_value = {datetime(2024, 1, 1): 4}
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+
+    # Act
+    await use_case.execute(source)
+
+    # Assert
+    key, values, _ = history_storage.record.call_args.args
+    assert key == source.full_name
+    assert values == {
+        "open_prs_count": 10,
+        "closed_prs_count": 20,
+        "users_count": 5,
+        "oldest_pr": "2024-01-01T00:00:00",
+        "open_prs": {},
+        "closed_prs": {},
+        "users": {"2024-01-01": 4},
+    }
+
+
+@pytest.mark.asyncio
+async def test_execute_many_stores_fetched_repositories_at_once(
+    mocker: MockerFixture,
+    mock_gateway_selector,
+    mock_gateway: AsyncMock,
+    pickle_storage,
+):
+    """Test that fetched repositories are written with one bulk upsert."""
+    # Arrange
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=pickle_storage,
+        time_to_live_seconds=3600,
+    )
+    first = dto.RepoSourceEntity(provider="github", owner="o", repo="first")
+    second = dto.RepoSourceEntity(provider="github", owner="o", repo="second")
+    cached = await use_case.execute(first)
+    upsert_many = mocker.spy(pickle_storage, "upsert_many")
+
+    # Act
+    result = await use_case.execute_many([second, first, second])
+
+    # Assert
+    assert [item.repo for item in result] == ["second", "first", "second"]
+    assert result[1].id == cached.id
+    assert result[0].id == result[2].id
+    upsert_many.assert_called_once()
+    assert len(upsert_many.call_args.args[0]) == 1
+    assert mock_gateway.get_open_pull_requests_count.call_count == 2
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import pytest
 from pytest_mock import MockerFixture
 
-from app.domain import dto, entities
+from app.domain import dto, entities, enums
 from app.use_cases.get_repo_info_by_source import GetRepoInfoBySourceUseCase
 
 
@@ -46,8 +46,7 @@ def mock_storage(mocker: MockerFixture):
     """Mock storage."""
     storage = mocker.AsyncMock()
     storage.get_many.return_value = []
-    storage.delete_one.return_value = True
-    storage.create_one.return_value = entities.RepoInfoEntity(
+    storage.upsert_one.return_value = entities.RepoInfoEntity(
         id=1,
         provider="github",
         owner="test_owner",
@@ -87,12 +86,9 @@ async def test_execute_refreshes_stale_cache(
     )
 
     # Create a stale cached entity (TTL is 3600 seconds = 1 hour)
-    # To make it stale: (updated_at or now()) - created_at >= 3600
-    # We set created_at 2 hours ago and updated_at 1 minute ago
-    # This means: 1 minute since last update - no, wait that's wrong
-    # Actually: (updated_at) - created_at = 2 hours - 1 min ≈ 7140 seconds > 3600
-    old_created = datetime.now() - timedelta(hours=2)
-    recent_updated = datetime.now() - timedelta(minutes=1)
+    # Freshness is measured from the last update: now - updated_at ≈ 2 hours > 3600
+    old_created = datetime.now() - timedelta(days=2)
+    stale_updated = datetime.now() - timedelta(hours=2)
     stale_entity = entities.RepoInfoEntity(
         id=1,
         provider="github",
@@ -106,7 +102,7 @@ async def test_execute_refreshes_stale_cache(
         closed_prs=[],
         users=[],
         created_at=old_created,
-        updated_at=recent_updated,
+        updated_at=stale_updated,
     )
     mock_storage.get_many.return_value = [stale_entity]
 
@@ -114,9 +110,211 @@ async def test_execute_refreshes_stale_cache(
     result = await use_case.execute(source)
 
     # Assert
-    mock_storage.delete_one.assert_called_once_with(stale_entity.id)
     mock_gateway.get_open_pull_requests_count.assert_called_once()
-    mock_storage.create_one.assert_called_once()
+    mock_storage.update_one.assert_called_once()
+    mock_storage.delete_one.assert_not_called()
+    mock_storage.create_one.assert_not_called()
+    entity_id, update_item = mock_storage.update_one.call_args.args
+    assert entity_id == stale_entity.id
+    assert update_item.open_prs_count == 10
+    assert set(update_item.metrics_updated_at) == set(enums.RepoMetric)
+
+
+@pytest.mark.asyncio
+async def test_execute_keeps_cache_fresh_after_recent_refresh(
+    use_case: GetRepoInfoBySourceUseCase,
+    mock_gateway,
+    mock_storage,
+):
+    """Test that a refreshed entity is fresh again, regardless of its creation."""
+    # Arrange
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+    refreshed_entity = entities.RepoInfoEntity(
+        id=1,
+        provider="github",
+        owner="test_owner",
+        repo="test_repo",
+        open_prs_count=5,
+        closed_prs_count=10,
+        oldest_pr=datetime(2024, 1, 1),
+        users_count=3,
+        open_prs=[],
+        closed_prs=[],
+        users=[],
+        created_at=datetime.now() - timedelta(days=2),
+        updated_at=datetime.now() - timedelta(minutes=1),
+    )
+    mock_storage.get_many.return_value = [refreshed_entity]
+
+    # Act
+    result = await use_case.execute(source)
+
+    # Assert
+    assert result == refreshed_entity
+    mock_gateway.get_open_pull_requests_count.assert_not_called()
+    mock_storage.upsert_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_refreshes_only_stale_metrics(
+    mock_gateway_selector,
+    mock_gateway,
+    mock_storage,
+):
+    """Test that only metrics past their own TTL are fetched again."""
+    # Arrange
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=mock_storage,
+        time_to_live_seconds=60 * 60 * 24,
+        metric_ttl_seconds={
+            enums.RepoMetric.OPEN_PRS_COUNT: 300,
+            enums.RepoMetric.CLOSED_PRS_COUNT: 300,
+            enums.RepoMetric.USERS_COUNT: 300,
+            enums.RepoMetric.OLDEST_PR: None,
+        },
+    )
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+    ten_minutes_ago = datetime.now() - timedelta(minutes=10)
+    cached_entity = entities.RepoInfoEntity(
+        id=1,
+        provider="github",
+        owner="test_owner",
+        repo="test_repo",
+        open_prs_count=5,
+        closed_prs_count=10,
+        oldest_pr=datetime(2024, 1, 1),
+        users_count=3,
+        open_prs=[],
+        closed_prs=[],
+        users=[],
+        created_at=datetime.now() - timedelta(days=30),
+        updated_at=ten_minutes_ago,
+        metrics_updated_at={metric: ten_minutes_ago for metric in enums.RepoMetric},
+    )
+    mock_storage.get_many.return_value = [cached_entity]
+
+    # Act
+    await use_case.execute(source)
+
+    # Assert
+    mock_gateway.get_open_pull_requests_count.assert_called_once()
+    mock_gateway.get_closed_pull_requests_count.assert_called_once()
+    mock_gateway.get_users_count.assert_called_once()
+    mock_gateway.get_oldest_pull_request_date.assert_not_called()
+    mock_gateway.get_timeseries_open_pull_requests.assert_not_called()
+    mock_gateway.get_timeseries_closed_pull_requests.assert_not_called()
+    mock_gateway.get_timeseries_users.assert_not_called()
+
+    _, update_item = mock_storage.update_one.call_args.args
+    assert update_item.model_dump(exclude_unset=True).keys() == {
+        "open_prs_count",
+        "closed_prs_count",
+        "users_count",
+        "metrics_updated_at",
+        "expires_at",
+        "updated_at",
+    }
+    assert update_item.metrics_updated_at["open_prs"] == ten_minutes_ago
+    assert update_item.metrics_updated_at["users_count"] > ten_minutes_ago
+    # The refreshed counts expire first, before the 24-hour metrics
+    assert update_item.expires_at == update_item.metrics_updated_at[
+        "users_count"
+    ] + timedelta(seconds=300)
+
+
+@pytest.mark.asyncio
+async def test_execute_skips_metric_checks_before_expiry(
+    mock_gateway_selector,
+    mock_gateway,
+    mock_storage,
+):
+    """Test that an entity is returned as is until its stored expiry."""
+    # Arrange
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=mock_storage,
+        time_to_live_seconds=3600,
+    )
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+    long_ago = datetime.now() - timedelta(days=30)
+    cached_entity = entities.RepoInfoEntity(
+        id=1,
+        provider="github",
+        owner="test_owner",
+        repo="test_repo",
+        open_prs_count=5,
+        closed_prs_count=10,
+        oldest_pr=datetime(2024, 1, 1),
+        users_count=3,
+        open_prs=[],
+        closed_prs=[],
+        users=[],
+        created_at=long_ago,
+        metrics_updated_at={metric: long_ago for metric in enums.RepoMetric},
+        expires_at=datetime.now() + timedelta(minutes=1),
+    )
+    mock_storage.get_many.return_value = [cached_entity]
+
+    # Act
+    result = await use_case.execute(source)
+
+    # Assert
+    assert result == cached_entity
+    mock_gateway.get_open_pull_requests_count.assert_not_called()
+    mock_storage.update_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_refetches_unknown_immutable_metric(
+    mock_gateway_selector,
+    mock_gateway,
+    mock_storage,
+):
+    """Test that an immutable metric is fetched again while it is still unknown."""
+    # Arrange
+    use_case = GetRepoInfoBySourceUseCase(
+        gateway_selector=mock_gateway_selector,
+        storage=mock_storage,
+        time_to_live_seconds=3600,
+        metric_ttl_seconds={enums.RepoMetric.OLDEST_PR: None},
+    )
+    source = dto.RepoSourceEntity(
+        provider="github", owner="test_owner", repo="test_repo"
+    )
+    two_hours_ago = datetime.now() - timedelta(hours=2)
+    cached_entity = entities.RepoInfoEntity(
+        id=1,
+        provider="github",
+        owner="test_owner",
+        repo="test_repo",
+        open_prs_count=5,
+        closed_prs_count=10,
+        oldest_pr=None,
+        users_count=3,
+        open_prs=[],
+        closed_prs=[],
+        users=[],
+        created_at=two_hours_ago,
+        metrics_updated_at={
+            **{metric: datetime.now() for metric in enums.RepoMetric},
+            enums.RepoMetric.OLDEST_PR: two_hours_ago,
+        },
+    )
+    mock_storage.get_many.return_value = [cached_entity]
+
+    # Act
+    await use_case.execute(source)
+
+    # Assert
+    mock_gateway.get_oldest_pull_request_date.assert_called_once()
+    mock_gateway.get_open_pull_requests_count.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,103 @@
+"""Tests for GetRepoTimeseriesByIdUseCase."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.domain import entities
+from app.use_cases import GetRepoTimeseriesByIdUseCase
+
+
+@pytest.fixture
+def mock_timeseries_storage(mocker: MockerFixture):
+    """Mock timeseries storage."""
+    storage = mocker.AsyncMock()
+    storage.read_many.return_value = {}
+    return storage
+
+
+@pytest.fixture
+def use_case(mock_storage, mock_timeseries_storage):
+    """Create use case instance."""
+    return GetRepoTimeseriesByIdUseCase(
+        storage=mock_storage, timeseries_storage=mock_timeseries_storage
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_reads_stored_timeseries(
+    use_case: GetRepoTimeseriesByIdUseCase,
+    mock_storage: AsyncMock,
+    mock_timeseries_storage: AsyncMock,
+    repo_info_entity_factory,
+):
+    """Test that stored timeseries replace the embedded ones."""
+    # Arrange
+    mock_storage.get_many_by_ids.side_effect = None
+    mock_storage.get_many_by_ids.return_value = [repo_info_entity_factory.build(id=1)]
+    points = [entities.TimeseriesDataPoint(date="2024-01-01", value=3)]
+    mock_timeseries_storage.read_many.return_value = {
+        1: {"open_prs": points, "closed_prs": [], "users": points}
+    }
+
+    # Act
+    [result] = await use_case.execute([1, 1])
+
+    # Assert
+    assert result.open_prs == points
+    assert result.users == points
+    mock_timeseries_storage.read_many.assert_called_once_with(
+        [1], ["open_prs", "closed_prs", "users"]
+    )
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [1], include={"id", "provider", "owner", "repo"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_falls_back_to_embedded_timeseries(
+    use_case: GetRepoTimeseriesByIdUseCase, mock_storage: AsyncMock
+):
+    """Test that repositories cached before the timeseries storage still load."""
+    # Act
+    await use_case.execute([2])
+
+    # Assert
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [2],
+        include={"id", "provider", "owner", "repo", "open_prs", "closed_prs", "users"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_returns_empty_list_without_ids(
+    use_case: GetRepoTimeseriesByIdUseCase, mock_timeseries_storage: AsyncMock
+):
+    """Test that no storage is read without ids."""
+    # Act
+    result = await use_case.execute([])
+
+    # Assert
+    assert result == []
+    mock_timeseries_storage.read_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_reads_embedded_timeseries_without_timeseries_storage(
+    mock_storage: AsyncMock,
+):
+    """Test that shared backends read the timeseries embedded in the repositories."""
+    # Arrange
+    use_case = GetRepoTimeseriesByIdUseCase(
+        storage=mock_storage, timeseries_storage=None
+    )
+
+    # Act
+    await use_case.execute([2])
+
+    # Assert
+    mock_storage.get_many_by_ids.assert_called_once_with(
+        [2],
+        include={"id", "provider", "owner", "repo", "open_prs", "closed_prs", "users"},
+    )
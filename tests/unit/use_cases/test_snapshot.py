@@ -0,0 +1,86 @@
+"""Tests for ExportSnapshotUseCase and ImportSnapshotUseCase."""
+
+from datetime import datetime
+
+import pytest
+
+from app.adapters.storage import ColumnarTimeseriesStorage, SnapshotFile
+from app.domain import entities
+from app.use_cases import ExportSnapshotUseCase, ImportSnapshotUseCase
+from tests.fixtures import CreateRepoInfoSchemaFactory, make_storage
+
+
+def make_node(path):
+    """Create the storages of a node under a folder."""
+    storage = make_storage("sqlite", path / "repo_info.sqlite3")
+    return storage, ColumnarTimeseriesStorage(path / "timeseries")
+
+
+@pytest.mark.asyncio
+async def test_snapshot_warm_starts_another_node(tmp_path):
+    """Test that a node imports the repositories and timeseries it lacks."""
+    # Arrange
+    source_storage, source_timeseries = make_node(tmp_path / "source")
+    schemas = [
+        CreateRepoInfoSchemaFactory.build(
+            repo=f"repo{i}",
+            metrics_updated_at={"users_count": datetime(2024, 2, 1)},
+            expires_at=datetime(2024, 2, 2),
+        )
+        for i in range(5)
+    ]
+    created = await source_storage.create_many(schemas)
+    points = [entities.TimeseriesDataPoint(date="2024-01-01", value=3)]
+    await source_timeseries.write(created[1].id, {"users": points})
+    snapshot = SnapshotFile(tmp_path / "snapshot")
+
+    target_storage, target_timeseries = make_node(tmp_path / "target")
+    local = await target_storage.create_one(
+        schemas[0].model_copy(update={"users_count": 99})
+    )
+
+    # Act
+    exported = await ExportSnapshotUseCase(
+        source_storage, source_timeseries, snapshot, batch_size=2
+    ).execute()
+    imported = await ImportSnapshotUseCase(
+        target_storage, target_timeseries, snapshot
+    ).execute()
+
+    # Assert
+    assert exported == 5
+    assert imported == 4
+    repos = await target_storage.get_many(None)
+    by_repo = {repo.repo: repo for repo in repos}
+    assert by_repo["repo0"].id == local.id
+    assert by_repo["repo0"].users_count == 99
+    assert by_repo["repo1"].expires_at == datetime(2024, 2, 2)
+    assert by_repo["repo1"].metrics_updated_at == {"users_count": datetime(2024, 2, 1)}
+    stored = await target_timeseries.read_many([by_repo["repo1"].id], ["users"])
+    assert stored == {by_repo["repo1"].id: {"users": points}}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_keeps_timeseries_embedded_without_timeseries_storage(
+    tmp_path,
+):
+    """Test that nodes of a shared backend export and import embedded timeseries."""
+    # Arrange
+    points = [entities.TimeseriesDataPoint(date="2024-01-01", value=3)]
+    source_storage = make_storage("sqlite", tmp_path / "source.sqlite3")
+    created = await source_storage.create_one(
+        CreateRepoInfoSchemaFactory.build(users=points)
+    )
+    snapshot = SnapshotFile(tmp_path / "snapshot")
+    target_storage = make_storage("sqlite", tmp_path / "target.sqlite3")
+
+    # Act
+    await ExportSnapshotUseCase(source_storage, None, snapshot).execute()
+    imported = await ImportSnapshotUseCase(target_storage, None, snapshot).execute()
+
+    # Assert
+    assert imported == 1
+    [repo] = await target_storage.get_many(None)
+    assert repo.full_name == created.full_name
+    assert repo.users == points
+    assert repo.open_prs == created.open_prs